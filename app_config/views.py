@@ -1,10 +1,12 @@
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import mixins
+from rest_framework import mixins, status
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from app_config.models import Version
 from app_config.serializers import VersionSerializer
+from reference_cache import ReferenceCache
 
 
 class VersionViewSet(
@@ -21,4 +23,4 @@ class VersionViewSet(
         responses={200: VersionSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return super(VersionViewSet, self).list(request, *args, **kwargs)
+        return Response(self.get_serializer(ReferenceCache.version.get().object_list, many=True).data, status=status.HTTP_200_OK)
@@ -3,7 +3,8 @@ from django.contrib.gis.geos import Point
 from django.utils.html import format_html
 
 from cafe.models import Cafe, Brand, District, OpeningHour, CafeFloor, CafeImage, OccupancyRatePrediction, \
-    OccupancyRateUpdateLog, CongestionArea, CafeVIP, DailyActivityStack, Location, CATI
+    OccupancyRateUpdateLog, CongestionArea, CafeVIP, DailyActivityStack, Location, CATI, CafeFloorLiveState, \
+    CATISummary, OccupancyHourlyRollup, OccupancyProfile
 from data.admin import OpeningHoursUpdateAdmin
 from utils import ImageModelAdmin, replace_image_domain
 
@@ -77,6 +78,19 @@ class CATIAdmin(admin.ModelAdmin):
     nickname.short_description = "닉네임"
 
 
+@admin.register(CATISummary)
+class CATISummaryAdmin(admin.ModelAdmin):
+    list_display = ("id", "cafe_name", "count", "openness_sum", "coffee_sum", "workspace_sum", "acidity_sum",)
+    search_fields = ("cafe__name",)
+    ordering = ("cafe__name",)
+    list_select_related = ["cafe"]
+    preserve_filters = True
+
+    def cafe_name(self, cati_summary): return cati_summary.cafe.name
+
+    cafe_name.short_description = "카페"
+
+
 class OpeningHourInline(admin.TabularInline):
     model = OpeningHour
 
@@ -203,6 +217,56 @@ class OccupancyRateUpdateLogAdmin(admin.ModelAdmin):
     cafe_name_floor.short_description = "카페/층"
 
 
+@admin.register(CafeFloorLiveState)
+class CafeFloorLiveStateAdmin(admin.ModelAdmin):
+    list_display = ("id", "cafe_name_floor", "latest_occupancy_rate", "last_update", "user_log_count")
+    date_hierarchy = "last_update"
+    search_fields = ("cafe_floor__cafe__name",)
+    ordering = ("-last_update",)
+    list_select_related = ["cafe_floor__cafe"]
+    preserve_filters = True
+
+    def cafe_name_floor(self, live_state):
+        return f"{live_state.cafe_floor.cafe.name} {live_state.cafe_floor.floor}층"
+
+    cafe_name_floor.short_description = "카페/층"
+
+
+@admin.register(OccupancyHourlyRollup)
+class OccupancyHourlyRollupAdmin(admin.ModelAdmin):
+    list_display = ("id", "cafe_name_floor", "date", "hour", "log_count", "average_occupancy_rate", "user_count", "congestion")
+    date_hierarchy = "date"
+    search_fields = ("cafe_floor__cafe__name",)
+    ordering = ("-date", "-hour")
+    list_select_related = ["cafe_floor__cafe"]
+    preserve_filters = True
+
+    def cafe_name_floor(self, rollup):
+        return f"{rollup.cafe_floor.cafe.name} {rollup.cafe_floor.floor}층"
+
+    def average_occupancy_rate(self, rollup):
+        return round(rollup.occupancy_rate_sum / rollup.log_count, 2) if rollup.log_count else None
+
+    cafe_name_floor.short_description = "카페/층"
+    average_occupancy_rate.short_description = "평균 혼잡도"
+
+
+@admin.register(OccupancyProfile)
+class OccupancyProfileAdmin(admin.ModelAdmin):
+    list_display = ("id", "cafe_name_floor", "log_count", "updated_at")
+    exclude = ("data",)
+    date_hierarchy = "updated_at"
+    search_fields = ("cafe_floor__cafe__name",)
+    ordering = ("-updated_at",)
+    list_select_related = ["cafe_floor__cafe"]
+    preserve_filters = True
+
+    def cafe_name_floor(self, profile):
+        return f"{profile.cafe_floor.cafe.name} {profile.cafe_floor.floor}층"
+
+    cafe_name_floor.short_description = "카페/층"
+
+
 @admin.register(DailyActivityStack)
 class DailyActivityStackAdmin(admin.ModelAdmin):
     list_display = ("id", "cafe_name_floor", "nickname", "update")
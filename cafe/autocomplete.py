@@ -0,0 +1,199 @@
+import bisect
+import sys
+import threading
+import time
+from array import array
+
+from cafe.models import Cafe, Brand
+from cafejari.settings import AUTOCOMPLETE_MAX_ENTRIES, AUTOCOMPLETE_SCAN_LIMIT, AUTOCOMPLETE_VERSION_CHECK_INTERVAL
+from utils import SharedVersion
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ",
+             "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ", "ㅁ",
+             "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 입력 중인 겹모음, 겹받침 낱자도 풀어서 비교
+COMPATIBILITY_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ",
+    "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ",
+    "ㅢ": "ㅡㅣ",
+}
+
+# 접미사 배열 원소는 (entry index << OFFSET_BITS) | 문자열 내 위치 하나의 32bit 정수
+OFFSET_BITS = 10
+MAX_TEXT_LENGTH = (1 << OFFSET_BITS) - 1
+CAFE, BRAND = 0, 1
+
+
+def normalize(text):
+    # 공백 제거, 소문자, 한글 음절은 자모 단위로 분해("스탑" -> "ㅅㅡㅌㅏㅂ"이 "스타벅스"에 매칭됨)
+    normalized = []
+    for char in text.lower():
+        if char.isspace():
+            continue
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            normalized.append(CHOSEONG[code // 588])
+            normalized.append(JUNGSEONG[code % 588 // 28])
+            normalized.append(JONGSEONG[code % 28])
+        else:
+            normalized.append(COMPATIBILITY_JAMO.get(char, char))
+    return "".join(normalized)[:MAX_TEXT_LENGTH]
+
+
+# 카페(공개, 영업중), 브랜드 이름의 워커별 자동완성 인덱스
+# 정규화된 이름들의 모든 접미사를 정렬해 둔 접미사 배열에서 이진 탐색하므로 중간 글자(infix)도 매칭됨
+# 모델 인스턴스 대신 array, str 리스트로만 보관하고, 변경은 signal에서 증분 반영 + 공유 버전으로 다른 워커에 알림
+class CafeAutocomplete:
+    version = SharedVersion("cafe_autocomplete")
+    lock = threading.RLock()
+
+    entry_kinds = bytearray()
+    entry_ids = array("I")
+    entry_names = []
+    entry_texts = []
+    entry_alive = bytearray()
+    entry_index_dict = {}
+    suffixes = array("I")
+    dead_count = 0
+
+    built_version = None
+    last_version_check = 0.0
+
+    @classmethod
+    def suffix_text(cls, suffix):
+        return cls.entry_texts[suffix >> OFFSET_BITS][suffix & MAX_TEXT_LENGTH:]
+
+    @classmethod
+    def build(cls):
+        version = cls.version.get()
+        entry_list = [
+            (BRAND, brand_id, name) for brand_id, name in Brand.objects.values_list("id", "name")
+        ] + [
+            (CAFE, cafe_id, name) for cafe_id, name in Cafe.objects.filter(
+                is_visible=True, is_closed=False
+            ).values_list("id", "name")
+        ]
+        cls.load(entry_list[:AUTOCOMPLETE_MAX_ENTRIES])
+        cls.built_version = version
+
+    @classmethod
+    def load(cls, entry_list):
+        entry_texts = [normalize(name) for _, _, name in entry_list]
+        suffixes = array("I", (
+            (entry_index << OFFSET_BITS) | offset
+            for entry_index, text in enumerate(entry_texts)
+            for offset in range(len(text))
+        ))
+        suffixes = array("I", sorted(
+            suffixes, key=lambda suffix: entry_texts[suffix >> OFFSET_BITS][suffix & MAX_TEXT_LENGTH:]
+        ))
+        with cls.lock:
+            cls.entry_kinds = bytearray(kind for kind, _, _ in entry_list)
+            cls.entry_ids = array("I", (entry_id for _, entry_id, _ in entry_list))
+            cls.entry_names = [name for _, _, name in entry_list]
+            cls.entry_texts = entry_texts
+            cls.entry_alive = bytearray(b"\x01" * len(entry_list))
+            cls.entry_index_dict = {(kind, entry_id): index for index, (kind, entry_id, _) in enumerate(entry_list)}
+            cls.suffixes = suffixes
+            cls.dead_count = 0
+
+    @classmethod
+    def ensure_fresh(cls):
+        # 공유 캐시 확인은 일정 간격으로만 하고, 다른 워커에서 바뀐 경우 다시 만듦
+        now = time.monotonic()
+        if cls.built_version is not None and now - cls.last_version_check < AUTOCOMPLETE_VERSION_CHECK_INTERVAL:
+            return
+        cls.last_version_check = now
+        if cls.built_version is None or cls.version.get() != cls.built_version:
+            cls.build()
+
+    @classmethod
+    def search(cls, query, limit=10):
+        cls.ensure_fresh()
+        normalized_query = normalize(query)
+        if not normalized_query:
+            return []
+        with cls.lock:
+            query_length = len(normalized_query)
+            key = lambda suffix: cls.suffix_text(suffix)[:query_length]
+            start = bisect.bisect_left(cls.suffixes, normalized_query, key=key)
+            end = bisect.bisect_right(cls.suffixes, normalized_query, lo=start, key=key)
+
+            # 앞부분 일치, 짧은 이름 순으로 정렬(매칭이 너무 많으면 AUTOCOMPLETE_SCAN_LIMIT개까지만 확인)
+            matched_dict = {}
+            for suffix in cls.suffixes[start:min(end, start + AUTOCOMPLETE_SCAN_LIMIT)]:
+                entry_index = suffix >> OFFSET_BITS
+                if cls.entry_alive[entry_index]:
+                    offset = suffix & MAX_TEXT_LENGTH
+                    matched_dict[entry_index] = min(offset, matched_dict.get(entry_index, offset))
+            ranked_list = sorted(matched_dict.items(), key=lambda item: (
+                item[1] > 0, cls.entry_kinds[item[0]] != BRAND, len(cls.entry_texts[item[0]]), cls.entry_names[item[0]]
+            ))[:limit]
+            return [{
+                "type": "brand" if cls.entry_kinds[entry_index] == BRAND else "cafe",
+                "id": cls.entry_ids[entry_index],
+                "name": cls.entry_names[entry_index],
+            } for entry_index, _ in ranked_list]
+
+    @classmethod
+    def add_entry(cls, kind, entry_id, name):
+        entry_index = len(cls.entry_ids)
+        text = normalize(name)
+        cls.entry_kinds.append(kind)
+        cls.entry_ids.append(entry_id)
+        cls.entry_names.append(name)
+        cls.entry_texts.append(text)
+        cls.entry_alive.append(1)
+        cls.entry_index_dict[(kind, entry_id)] = entry_index
+        for offset in range(len(text)):
+            suffix = (entry_index << OFFSET_BITS) | offset
+            cls.suffixes.insert(bisect.bisect_left(cls.suffixes, text[offset:], key=cls.suffix_text), suffix)
+
+    @classmethod
+    def remove_entry(cls, kind, entry_id):
+        entry_index = cls.entry_index_dict.pop((kind, entry_id), None)
+        if entry_index is not None:
+            cls.entry_alive[entry_index] = 0
+            cls.dead_count += 1
+
+    @classmethod
+    def update(cls, kind, entry_id, name=None):
+        # name이 None이면 삭제(비공개, 폐업 포함), 아니면 추가 또는 이름 변경
+        if cls.built_version is None:
+            return
+        with cls.lock:
+            entry_index = cls.entry_index_dict.get((kind, entry_id))
+            if entry_index is not None and cls.entry_names[entry_index] == name:
+                return
+            cls.remove_entry(kind, entry_id)
+            if name is not None and len(cls.entry_index_dict) < AUTOCOMPLETE_MAX_ENTRIES:
+                cls.add_entry(kind, entry_id, name)
+            # 지워진 항목이 많아지면 살아있는 항목만으로 다시 정렬
+            if cls.dead_count > len(cls.entry_index_dict) // 4:
+                cls.load([
+                    (cls.entry_kinds[index], cls.entry_ids[index], cls.entry_names[index])
+                    for index in sorted(cls.entry_index_dict.values())
+                ])
+
+    @classmethod
+    def on_changed(cls, kind, entry_id, name=None):
+        # 이 워커는 증분 반영, 다른 워커는 공유 버전이 바뀐 것을 보고 다시 만듦
+        cls.update(kind, entry_id, name)
+        version = cls.version.bump()
+        if cls.built_version is not None and version == cls.built_version + 1:
+            cls.built_version = version
+
+    @classmethod
+    def get_memory_usage(cls):
+        # 인덱스가 차지하는 메모리(byte)
+        return sum((
+            sys.getsizeof(cls.entry_kinds),
+            sys.getsizeof(cls.entry_ids),
+            sys.getsizeof(cls.entry_alive),
+            sys.getsizeof(cls.suffixes),
+            sys.getsizeof(cls.entry_names) + sum(sys.getsizeof(name) for name in cls.entry_names),
+            sys.getsizeof(cls.entry_texts) + sum(sys.getsizeof(text) for text in cls.entry_texts),
+            sys.getsizeof(cls.entry_index_dict),
+        ))
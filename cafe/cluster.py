@@ -0,0 +1,68 @@
+import datetime
+
+from django.contrib.gis.geos import Polygon
+from django.db.models import F, Q, Avg, Count, Value, FloatField
+from django.db.models.functions import Floor
+
+from cafe.models import Cafe, CafeFloor
+from cafejari.settings import RECENT_HOUR
+
+
+# 넓은 지도 화면에서 카페들을 격자(cell) 단위로 묶어 SQL에서 집계
+# 격자는 전역 좌표 기준(floor(위경도 / cell_size))이라 화면을 옮겨도 같은 카페는 같은 cluster에 남음
+class CafeCluster:
+
+    @staticmethod
+    def annotate_cell(queryset, cell_size, latitude_field, longitude_field):
+        cell_size = Value(cell_size, output_field=FloatField())
+        return queryset.annotate(
+            cell_y=Floor(F(latitude_field) / cell_size),
+            cell_x=Floor(F(longitude_field) / cell_size),
+        )
+
+    @classmethod
+    def get_cluster_list(cls, south, west, north, east, cell_size):
+        bound = Polygon.from_bbox((west, south, east, north))
+
+        # 1. 격자별 카페 수, 중심 좌표
+        cafe_queryset = Cafe.objects.filter(is_visible=True, is_closed=False, point__bboverlaps=bound)
+        cafe_cell_list = cls.annotate_cell(
+            cafe_queryset, cell_size, "latitude", "longitude"
+        ).order_by().values("cell_y", "cell_x").annotate(
+            cafe_count=Count("id"),
+            latitude=Avg("latitude"),
+            longitude=Avg("longitude"),
+        )
+
+        # 2. 격자별 최근 혼잡도 평균, 예측 혼잡도 평균, 최근 데이터가 있는 카페 수
+        recent_datetime = datetime.datetime.now() - datetime.timedelta(hours=RECENT_HOUR)
+        is_fresh = Q(cafe__is_opened=True, live_state__last_update__gte=recent_datetime)
+        cafe_floor_queryset = CafeFloor.objects.filter(
+            cafe__is_visible=True, cafe__is_closed=False, cafe__point__bboverlaps=bound
+        )
+        cafe_floor_cell_dict = {
+            (cafe_floor_cell["cell_y"], cafe_floor_cell["cell_x"]): cafe_floor_cell
+            for cafe_floor_cell in cls.annotate_cell(
+                cafe_floor_queryset, cell_size, "cafe__latitude", "cafe__longitude"
+            ).order_by().values("cell_y", "cell_x").annotate(
+                occupancy_rate=Avg("live_state__latest_occupancy_rate", filter=is_fresh),
+                occupancy_rate_prediction=Avg("occupancy_rate_prediction__occupancy_rate"),
+                fresh_cafe_count=Count("cafe", filter=is_fresh, distinct=True),
+            )
+        }
+
+        cluster_list = []
+        for cafe_cell in cafe_cell_list:
+            cafe_floor_cell = cafe_floor_cell_dict.get((cafe_cell["cell_y"], cafe_cell["cell_x"]), {})
+            occupancy_rate = cafe_floor_cell.get("occupancy_rate")
+            occupancy_rate_prediction = cafe_floor_cell.get("occupancy_rate_prediction")
+            cluster_list.append({
+                "latitude": cafe_cell["latitude"],
+                "longitude": cafe_cell["longitude"],
+                "cafe_count": cafe_cell["cafe_count"],
+                "occupancy_rate": round(float(occupancy_rate), 2) if occupancy_rate is not None else None,
+                "occupancy_rate_prediction": round(float(occupancy_rate_prediction), 2)
+                if occupancy_rate_prediction is not None else None,
+                "fresh_cafe_count": cafe_floor_cell.get("fresh_cafe_count", 0),
+            })
+        return cluster_list
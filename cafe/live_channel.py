@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import threading
+
+import redis
+from django.utils.module_loading import import_string
+
+from cafe.models import CafeFloor
+from cafejari.settings import LIVE_CHANNEL_BROKER, LIVE_CHANNEL_QUEUE_SIZE, REDIS_URL, LOCAL, TESTING
+
+
+# 실시간 혼잡도 구독 정보(지도 범위 또는 카페 id 목록)와 전달받을 queue
+class LiveSubscription:
+
+    def __init__(self, bound=None, cafe_id_set=None):
+        self.bound = bound  # (south, west, north, east)
+        self.cafe_id_set = cafe_id_set
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=LIVE_CHANNEL_QUEUE_SIZE)
+
+    def is_matched(self, message):
+        if self.cafe_id_set is not None and message["cafe"] in self.cafe_id_set:
+            return True
+        if self.bound is not None:
+            south, west, north, east = self.bound
+            return south <= message["latitude"] <= north and west <= message["longitude"] <= east
+        return False
+
+    def put(self, message):
+        # 느린 클라이언트 때문에 전체 전달이 막히지 않도록 queue가 차면 버림
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+
+# 프로세스 안의 구독자들에게 메시지를 나눠주는 pub/sub, publish 방식만 broker마다 다름
+# LocalBroker 자체는 같은 프로세스의 publish만 전달하므로 테스트, 로컬용
+class LocalBroker:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def subscribe(self, subscription):
+        if type(self) is LocalBroker and not (LOCAL or TESTING):
+            logging.getLogger('my').error("LocalBroker 구독은 다른 프로세스의 혼잡도 변경을 받지 못함(REDIS_URL 필요)")
+        with self.lock:
+            self.subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def dispatch(self, message):
+        # 동기 코드(signal, cron)에서 호출되므로 각 구독자의 event loop로 넘겨서 queue에 넣음
+        with self.lock:
+            subscription_list = [subscription for subscription in self.subscriptions if subscription.is_matched(message)]
+        for subscription in subscription_list:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # 이미 닫힌 event loop
+                self.unsubscribe(subscription)
+
+    def publish(self, message):
+        self.dispatch(message)
+
+
+# WSGI 워커, cron 등 다른 프로세스의 publish를 Redis 채널로 받아 이 프로세스의 구독자에게 나눠줌
+class RedisBroker(LocalBroker):
+    CHANNEL = "cafe_live_occupancy"
+
+    def __init__(self):
+        super(RedisBroker, self).__init__()
+        self.redis = redis.Redis.from_url(REDIS_URL)
+        self.listener_thread = None
+
+    def subscribe(self, subscription):
+        super(RedisBroker, self).subscribe(subscription)
+        with self.lock:
+            if self.listener_thread is None:
+                self.listener_thread = threading.Thread(target=self.listen, daemon=True)
+                self.listener_thread.start()
+
+    def listen(self):
+        # 프로세스당 하나의 Redis 구독만 유지
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.CHANNEL)
+        for redis_message in pubsub.listen():
+            try:
+                self.dispatch(json.loads(redis_message["data"]))
+            except Exception as e:
+                logging.getLogger('my').error(e)
+
+    def publish(self, message):
+        self.redis.publish(self.CHANNEL, json.dumps(message))
+
+
+# 혼잡도 로그 작성, 예측 갱신 시 층 단위의 짧은 변경분(delta)을 만들어 broker로 보냄
+class LiveOccupancyChannel:
+    broker = None
+
+    @classmethod
+    def get_broker(cls):
+        if cls.broker is None:
+            cls.broker = import_string(LIVE_CHANNEL_BROKER)()
+        return cls.broker
+
+    @classmethod
+    def publish_cafe_floors(cls, cafe_floor_id_list, message_type):
+        if not cafe_floor_id_list:
+            return
+        cafe_floor_queryset = CafeFloor.objects.filter(id__in=cafe_floor_id_list).select_related(
+            "cafe", "live_state", "occupancy_rate_prediction"
+        )
+        broker = cls.get_broker()
+        for cafe_floor in cafe_floor_queryset:
+            live_state = getattr(cafe_floor, "live_state", None)
+            prediction = getattr(cafe_floor, "occupancy_rate_prediction", None)
+            broker.publish({
+                "type": message_type,
+                "cafe": cafe_floor.cafe_id,
+                "cafe_floor": cafe_floor.id,
+                "floor": cafe_floor.floor,
+                "latitude": cafe_floor.cafe.latitude,
+                "longitude": cafe_floor.cafe.longitude,
+                "occupancy_rate": float(live_state.latest_occupancy_rate)
+                if live_state and live_state.latest_occupancy_rate is not None else None,
+                "update": live_state.last_update.isoformat() if live_state and live_state.last_update else None,
+                "occupancy_rate_prediction": float(prediction.occupancy_rate) if prediction else None,
+            })
@@ -0,0 +1,48 @@
+from django.db import transaction
+
+from cafe.models import CafeFloorLiveState, OccupancyRateUpdateLog, CafeFloor
+from cafe.serializers import OccupancyRateUpdateLogSerializer
+from cafejari.settings import RECENT_LOG_LIMIT
+
+
+# 층별 실시간 상태(최근 로그, 최근 혼잡도, 유저 로그 수)를 로그 작성 시점에 갱신
+class LiveFloorState:
+
+    @staticmethod
+    def serialize_log(log_object):
+        # 유저는 id만 저장하고 닉네임, 등급 등은 응답 시점에 붙임(CafeFloorCafeRepresentationSerializer)
+        return OccupancyRateUpdateLogSerializer(log_object, read_only=True).data
+
+    @staticmethod
+    def push_log(log_object):
+        # 로그 저장과 같은 transaction 안에서 호출
+        with transaction.atomic():
+            live_state, _ = CafeFloorLiveState.objects.select_for_update().get_or_create(
+                cafe_floor_id=log_object.cafe_floor_id
+            )
+            live_state.recent_log = [LiveFloorState.serialize_log(log_object)] + \
+                live_state.recent_log[:RECENT_LOG_LIMIT - 1]
+            live_state.latest_occupancy_rate = log_object.occupancy_rate
+            live_state.last_update = log_object.update
+            if log_object.user_id is not None:
+                live_state.user_log_count += 1
+            live_state.save()
+        log_object._is_live_state_updated = True
+        return live_state
+
+    @staticmethod
+    def rebuild(cafe_floor_id_list=None):
+        # 로그 테이블로부터 층별 상태를 다시 만듦(None이면 전체 층)
+        cafe_floor_queryset = CafeFloor.objects.all()
+        if cafe_floor_id_list is not None:
+            cafe_floor_queryset = cafe_floor_queryset.filter(id__in=cafe_floor_id_list)
+        for cafe_floor_id in cafe_floor_queryset.values_list("id", flat=True):
+            log_queryset = OccupancyRateUpdateLog.objects.filter(cafe_floor__id=cafe_floor_id)
+            recent_logs = list(log_queryset.order_by("-update")[:RECENT_LOG_LIMIT])
+            with transaction.atomic():
+                live_state, _ = CafeFloorLiveState.objects.select_for_update().get_or_create(cafe_floor_id=cafe_floor_id)
+                live_state.recent_log = [LiveFloorState.serialize_log(log) for log in recent_logs]
+                live_state.latest_occupancy_rate = recent_logs[0].occupancy_rate if recent_logs else None
+                live_state.last_update = recent_logs[0].update if recent_logs else None
+                live_state.user_log_count = log_queryset.filter(user__isnull=False).count()
+                live_state.save()
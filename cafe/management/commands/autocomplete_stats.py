@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cafe.autocomplete import CafeAutocomplete
+
+
+class Command(BaseCommand):
+    help = '카페 자동완성 인덱스를 만들어 항목 수, 메모리 사용량, 검색 시간을 확인함'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', type=str, nargs='*', default=["스", "스타", "스탑", "신촌", "커피"], help='검색 시간을 잴 검색어')
+        parser.add_argument('--repeat', type=int, default=1000, help='검색어별 반복 횟수')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        CafeAutocomplete.build()
+        self.stdout.write(f"build {(time.perf_counter() - start) * 1000:.1f}ms, "
+                          f"항목 {len(CafeAutocomplete.entry_ids):,}개, 접미사 {len(CafeAutocomplete.suffixes):,}개, "
+                          f"메모리 {CafeAutocomplete.get_memory_usage() / 1024 / 1024:.2f}MB")
+        for query in options['query']:
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                result = CafeAutocomplete.search(query)
+            elapsed = (time.perf_counter() - start) / options['repeat'] * 1000 * 1000
+            self.stdout.write(self.style.SUCCESS(f"[{query}] 평균 {elapsed:.1f}us, {len(result)}개"))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Case, When, Value, Max, Min
+from django.db.models.functions import ExtractHour, ExtractMinute
+
+from cafe.models import OccupancyRateUpdateLog
+
+
+class Command(BaseCommand):
+    help = '평일/주말, 분 컬럼이 비어있는 혼잡도 로그를 id 구간별로 나눠 채움(중간에 멈춰도 다시 실행하면 이어서 채움)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch_size', type=int, default=10000, help='한번에 갱신할 id 구간 크기')
+        parser.add_argument('--sleep', type=float, default=0.1, help='구간 사이 대기 시간(초)')
+
+    def handle(self, *args, **options):
+        id_range = OccupancyRateUpdateLog.objects.filter(day_class__isnull=True).aggregate(
+            min_id=Min("id"), max_id=Max("id")
+        )
+        if id_range["min_id"] is None:
+            self.stdout.write(self.style.SUCCESS('채울 로그 없음'))
+            return
+
+        total_count = 0
+        start_id = id_range["min_id"]
+        while start_id <= id_range["max_id"]:
+            end_id = start_id + options['batch_size']
+            # update는 Asia/Seoul 기준 naive 시각(USE_TZ=False)이라 그대로 평일/주말, 분을 계산
+            total_count += OccupancyRateUpdateLog.objects.filter(
+                id__gte=start_id, id__lt=end_id, day_class__isnull=True
+            ).update(
+                day_class=Case(When(update__week_day__in=[1, 7], then=Value(1)), default=Value(0)),
+                minute_of_day=ExtractHour("update") * 60 + ExtractMinute("update")
+            )
+            self.stdout.write(f'id {end_id - 1}까지, 누적 {total_count}개')
+            start_id = end_id
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'로그 {total_count}개 채움'))
@@ -0,0 +1,97 @@
+import datetime
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cafe.models import OccupancyRateUpdateLog
+from cafe.predictors import BaselinePredictor, EwmaPredictor, ProfilePredictor
+from cafejari.settings import UPDATE_POSSIBLE_TIME_FROM, UPDATE_POSSIBLE_TIME_TO
+
+
+class Command(BaseCommand):
+    help = '과거 혼잡도 로그를 시간순으로 되짚으며 예측 방식별로 이후 실제 등록값 대비 MAE, 실행당 CPU 시간, 메모리, 쿼리 수를 비교함 ' \
+           '(각 시점의 예측은 그 이전 로그만 사용, 지역 혼잡도와 영업 여부는 현재 값 기준)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, help='시작 날짜(YYYY-MM-DD), default=4주 전')
+        parser.add_argument('--end', type=str, help='끝 날짜(YYYY-MM-DD, 포함 안 함), default=오늘')
+        parser.add_argument('--step', type=int, default=60, help='예측 간격(분)')
+        parser.add_argument('--horizon', type=int, default=30, help='예측 시점 이후 평가에 쓸 실제 등록 범위(분)')
+        parser.add_argument('--predictors', type=str, default='baseline,baseline_no_noise,ewma,profile',
+                            help='비교할 방식(쉼표 구분)')
+
+    @staticmethod
+    def get_predictor_dict():
+        return {
+            "baseline": BaselinePredictor(),
+            "baseline_no_noise": BaselinePredictor(noise=False),
+            "ewma": EwmaPredictor(),
+            "profile": ProfilePredictor(is_replay=True),
+        }
+
+    def handle(self, *args, **options):
+        today = datetime.date.today()
+        try:
+            start_date = datetime.datetime.strptime(options['start'], '%Y-%m-%d').date() \
+                if options['start'] else today - datetime.timedelta(days=28)
+            end_date = datetime.datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else today
+        except ValueError:
+            raise CommandError('YYYY-MM-DD 형식이 아님')
+        predictor_dict = self.get_predictor_dict()
+        name_list = [name.strip() for name in options['predictors'].split(',')]
+        if any(name not in predictor_dict for name in name_list):
+            raise CommandError(f"방식은 {', '.join(predictor_dict)} 중에서 선택")
+        step = datetime.timedelta(minutes=options['step'])
+        horizon = datetime.timedelta(minutes=options['horizon'])
+
+        # 방식별 (오차 합, 평가한 실제 등록 수, 예측 없는 실제 등록 수, 실행 수, CPU 시간 합, 최대 메모리, 쿼리 수 합)
+        result_dict = {name: [0.0, 0, 0, 0, 0.0, 0, 0] for name in name_list}
+        tracemalloc.start()
+        now = datetime.datetime.combine(start_date, datetime.time(UPDATE_POSSIBLE_TIME_FROM))
+        end = datetime.datetime.combine(end_date, datetime.time())
+        while now < end:
+            if not UPDATE_POSSIBLE_TIME_FROM <= now.hour < UPDATE_POSSIBLE_TIME_TO:
+                now += step
+                continue
+            # 예측 시점 이후 실제 등록값
+            actual_list = list(OccupancyRateUpdateLog.objects.filter(
+                update__gte=now, update__lt=now + horizon, cafe_floor__isnull=False
+            ).values_list("cafe_floor_id", "occupancy_rate"))
+            cafe_floor_id_list = list({cafe_floor_id for cafe_floor_id, _ in actual_list})
+            if not actual_list:
+                now += step
+                continue
+            for name in name_list:
+                result = result_dict[name]
+                tracemalloc.reset_peak()
+                memory_start = tracemalloc.get_traced_memory()[0]
+                cpu_start = time.process_time()
+                with CaptureQueriesContext(connection) as context:
+                    prediction_dict = predictor_dict[name].predict(now, cafe_floor_id_list)
+                result[4] += time.process_time() - cpu_start
+                result[5] = max(result[5], tracemalloc.get_traced_memory()[1] - memory_start)
+                result[6] += len(context.captured_queries)
+                result[3] += 1
+                for cafe_floor_id, occupancy_rate in actual_list:
+                    if cafe_floor_id in prediction_dict:
+                        result[0] += abs(prediction_dict[cafe_floor_id] - float(occupancy_rate))
+                        result[1] += 1
+                    else:
+                        result[2] += 1
+            now += step
+        tracemalloc.stop()
+
+        for name in name_list:
+            error_sum, count, missing_count, run_count, cpu_time, peak_memory, query_count = result_dict[name]
+            if not run_count:
+                self.stdout.write(self.style.WARNING(f"{name}: 평가할 실제 등록 없음"))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: MAE {error_sum / count if count else float('nan'):.4f}, "
+                f"예측 범위 {count / (count + missing_count) * 100:.1f}%, 실행 {run_count}회, "
+                f"실행당 CPU {cpu_time / run_count * 1000:.1f}ms, 최대 메모리 {peak_memory / 1024 / 1024:.2f}MB, "
+                f"실행당 쿼리 {query_count / run_count:.1f}개"
+            ))
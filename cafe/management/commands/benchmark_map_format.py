@@ -0,0 +1,38 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from cafe.models import Cafe
+from cafe.renderers import CompactJSONRenderer, CompactMessagePackRenderer
+from cafe.serializers import CafeResponseSerializer
+
+
+class Command(BaseCommand):
+    help = '지도 응답을 기존 JSON과 압축(columnar) JSON, MessagePack으로 렌더링해 크기와 시간을 비교함'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=300, help='응답에 담을 카페 수')
+        parser.add_argument('--repeat', type=int, default=20, help='렌더링 반복 횟수')
+
+    def handle(self, *args, **options):
+        cafe_queryset = CafeResponseSerializer.optimize_queryset(
+            Cafe.objects.filter(is_visible=True, is_closed=False)
+        )[:options['count']]
+        cafe_list = CafeResponseSerializer(cafe_queryset, many=True).data
+        self.stdout.write(f"카페 {len(cafe_list)}개")
+
+        for name, renderer in (
+            ("json", JSONRenderer()),
+            ("compact", CompactJSONRenderer()),
+            ("msgpack", CompactMessagePackRenderer()),
+        ):
+            rendered = renderer.render(cafe_list)
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                renderer.render(cafe_list)
+            elapsed = (time.perf_counter() - start) / options['repeat'] * 1000
+            self.stdout.write(self.style.SUCCESS(
+                f"[{name}] {len(rendered):,} bytes (gzip {len(gzip.compress(rendered)):,} bytes), 평균 {elapsed:.2f}ms"
+            ))
@@ -0,0 +1,187 @@
+import datetime
+import math
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q, Count
+from django.test.utils import CaptureQueriesContext
+
+from cafe.models import OccupancyRateUpdateLog, CafeFloor, OccupancyRatePrediction, Congestion
+from cafe.prediction import OccupancyPredictionEngine
+from cafe.serializers import OccupancyRatePredictionSerializer
+
+
+def delete_occupancy_prediction(cafe_floor_id):
+    try:
+        prediction_object = OccupancyRatePrediction.objects.get(cafe_floor__id=cafe_floor_id)
+        prediction_object.delete()
+    except OccupancyRatePrediction.DoesNotExist:
+        pass
+
+
+# 비교용 기존 층별 계산(층마다 로그 조회, 지역 혼잡도 조회, serializer 저장)
+def predict_occupancy_per_floor(limit):
+    # 혼잡도 로그가 하나라도 있는 + 해당 층에 자리가 있는 cafe floor만 불러옴
+    filtered_cafe_floors = CafeFloor.objects.annotate(
+        num_occupancy_updates=Count('occupancy_rate_update_log')
+    ).filter(
+        num_occupancy_updates__gte=1,
+        has_seat=True
+    )
+    for cafe_floor_object in filtered_cafe_floors[:limit]:
+        # 카페가 열려 있는지 확인 하고, 닫혀 있다면 기존 예상 혼잡도 제거
+        if not cafe_floor_object.cafe.is_opened:
+            delete_occupancy_prediction(cafe_floor_object.id)
+            continue
+        # 현재 시각, 전후 80분 씩 설정, 평일 / 주말 구분
+        now = datetime.datetime.now()
+        start_datetime = now - datetime.timedelta(minutes=80)
+        end_datetime = now + datetime.timedelta(minutes=80)
+        start_time = datetime.time(start_datetime.hour, start_datetime.minute, 0)
+        if end_datetime.hour == 0 or end_datetime.hour == 1:
+            end_time = datetime.time(23, 59, 59)
+        else:
+            end_time = datetime.time(end_datetime.hour, end_datetime.minute, 0)
+        if now.weekday() < 5:
+            weekday_range = [2, 3, 4, 5, 6]
+        else:
+            weekday_range = [1, 7]
+        # 평일/주말에 해당하는 전후 80분 내 로그 선 및 근접 시간순 정렬
+        after_logs = OccupancyRateUpdateLog.objects.filter(
+            Q(update__time__range=(now.time(), end_time)),
+            update__week_day__in=weekday_range,
+            cafe_floor__id=cafe_floor_object.id
+        ).order_by('update__time')
+        before_logs = OccupancyRateUpdateLog.objects.filter(
+            Q(update__time__range=(start_time, now.time())),
+            update__week_day__in=weekday_range,
+            cafe_floor__id=cafe_floor_object.id
+        ).order_by('-update__time')
+        # 전, 후 로그 모두 존재하는 경우
+        if after_logs.exists() and before_logs.exists():
+            closest_future_log = after_logs.first()
+            closest_past_log = before_logs.first()
+            past_future_timedelta = closest_future_log.update - closest_past_log.update
+            past_now_timedelta = now.replace(tzinfo=None) - closest_past_log.update
+            x = past_now_timedelta.seconds
+            x1 = past_future_timedelta.seconds
+            y0 = closest_past_log.occupancy_rate
+            y1 = closest_future_log.occupancy_rate
+            # 혼잡도가 증가한 케이스
+            if closest_future_log.occupancy_rate >= closest_past_log.occupancy_rate:
+                y_delta = math.pow(math.pow(y1 - y0, 2) * x / x1, 0.5)
+                average_occupancy_rate = float(y0) + y_delta
+            # 혼잡도가 감소한 케이스
+            else:
+                y_delta = math.pow(math.pow(y1 - y0, 2) * (x1 - x) / x1, 0.5)
+                average_occupancy_rate = float(y1) + y_delta
+            # 가장 가까운 로그의 지역 혼잡도 산출
+            if x < x1 / 2:
+                closest_congestion = closest_past_log.congestion
+            else:
+                closest_congestion = closest_future_log.congestion
+        # 후 로그만 있는 경우
+        elif after_logs.exists():
+            average_occupancy_rate = float(after_logs.first().occupancy_rate)
+            closest_congestion = after_logs.first().congestion
+        # 전 로그만 있는 경우
+        elif before_logs.exists():
+            average_occupancy_rate = float(before_logs.first().occupancy_rate)
+            closest_congestion = before_logs.first().congestion
+        # 전, 후 로그 모두 없는 경우 - 기존 예측 삭제
+        else:
+            delete_occupancy_prediction(cafe_floor_object.id)
+            continue
+
+        # 혼잡도 산출
+        # 지역 혼잡도 factor 적용
+        if cafe_floor_object.cafe.congestion_area and closest_congestion is not None:
+            lookup_congestion_areas = cafe_floor_object.cafe.congestion_area.all()
+            # 현재 해당 지역 혼잡도 index 설정
+            current_congestion_index = 0
+            for lookup_congestion_area in lookup_congestion_areas:
+                temp_congestion_index = list(Congestion).index(Congestion(lookup_congestion_area.current_congestion))
+                if current_congestion_index < temp_congestion_index:
+                    current_congestion_index = temp_congestion_index
+            # 현재 지역 혼잡도와 로그 지역 혼잡도 차이만큼 가감
+            log_congestion_index = list(Congestion).index(Congestion(closest_congestion))
+            congestion_index_diff = current_congestion_index - log_congestion_index
+            average_occupancy_rate += 0.05 * congestion_index_diff
+        # 랜덤 5% 적용
+        average_occupancy_rate += random.uniform(-0.05, 0.05)
+        # 음수 혼잡도, 1 이상 혼잡도 조정
+        if average_occupancy_rate < 0:
+            average_occupancy_rate = 0.0
+        elif average_occupancy_rate > 1.0:
+            average_occupancy_rate = 1.0
+        # 예상 혼잡도 저장
+        final_occupancy_rate = round(average_occupancy_rate, 2)
+        try:
+            prediction_object = OccupancyRatePrediction.objects.get(cafe_floor__id=cafe_floor_object.id)
+            serializer = OccupancyRatePredictionSerializer(
+                prediction_object,
+                partial=True,
+                data={"occupancy_rate": final_occupancy_rate, "update": now}
+            )
+        except OccupancyRatePrediction.DoesNotExist:
+            serializer = OccupancyRatePredictionSerializer(
+                data={"cafe_floor": cafe_floor_object.id, "occupancy_rate": final_occupancy_rate, "update": now}
+            )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+
+class Command(BaseCommand):
+    help = '예상 혼잡도 계산을 기존 층별 반복과 일괄 계산으로 각각 실행해 시간, 쿼리 수를 비교함 ' \
+           '(실제 DB에서 실행 후 rollback, 층별 반복은 --limit 층만 돌려 층 수만큼 환산)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='층별 반복으로 실제 계산할 층 수')
+        parser.add_argument('--floors', type=int, default=10000, help='환산, 배열 계산 벤치마크 층 수')
+        parser.add_argument('--logs', type=int, default=30, help='배열 계산 벤치마크의 층별 시간대 내 로그 수')
+
+    def measure(self, function):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                function()
+                elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed, len(context.captured_queries)
+
+    def handle(self, *args, **options):
+        floor_count = CafeFloor.objects.filter(has_seat=True).count()
+        loop_floor_count = min(options['limit'], floor_count)
+
+        loop_elapsed, loop_query_count = self.measure(lambda: predict_occupancy_per_floor(options['limit']))
+        engine_elapsed, engine_query_count = self.measure(OccupancyPredictionEngine.run)
+        if loop_floor_count:
+            per_floor = loop_elapsed / loop_floor_count
+            self.stdout.write(
+                f"층별 반복: {loop_floor_count}층 {loop_elapsed:.2f}초, 쿼리 {loop_query_count}개 "
+                f"(층당 {per_floor * 1000:.1f}ms, {loop_query_count / loop_floor_count:.1f}개), "
+                f"{options['floors']}층 환산 {per_floor * options['floors']:.1f}초"
+            )
+        self.stdout.write(f"일괄 계산: 전체 {floor_count}층 {engine_elapsed:.2f}초, 쿼리 {engine_query_count}개")
+
+        # DB 없이 배열 계산만 --floors 층 규모로 측정
+        now = datetime.datetime.now()
+        start_time, end_time, _ = OccupancyPredictionEngine.get_window(now)
+        start_seconds = OccupancyPredictionEngine.get_seconds(start_time)
+        end_seconds = OccupancyPredictionEngine.get_seconds(end_time)
+        size = options['floors'] * options['logs']
+        floor_ids = np.repeat(np.arange(options['floors'], dtype=np.int64), options['logs'])
+        seconds = np.random.uniform(start_seconds, end_seconds, size)
+        occupancy_rates = np.round(np.random.uniform(0, 1, size), 2)
+        congestion_indexes = np.random.randint(-1, len(Congestion), size)
+        start = time.perf_counter()
+        OccupancyPredictionEngine.compute(
+            floor_ids, seconds, occupancy_rates, congestion_indexes,
+            OccupancyPredictionEngine.get_seconds(now.time()), start_seconds, end_seconds
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"배열 계산: {options['floors']}층, 로그 {size}개 {time.perf_counter() - start:.3f}초"
+        ))
@@ -0,0 +1,96 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from cafe.models import Cafe, CafeFloor, OccupancyRateUpdateLog, OccupancyRatePrediction
+from cafe.quota import SharingQuota
+from cafe.signals import publish_live_occupancy
+from cafe.views import OccupancyRateUpdateLogViewSet
+from cron.occupancy_prediction import is_occupancy_update_possible
+from user.models import User, Profile
+
+
+class Command(BaseCommand):
+    help = '벤치마크용 유저와 카페 층을 만들어 혼잡도를 연속으로 등록하고 처리량, 요청당 쿼리 수, 포인트 유실 여부를 확인함 ' \
+           '(업데이트 가능 시간에 실행, 하나의 transaction 안에서 실행 후 rollback하므로 DB에 남는 데이터 없음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--floors', type=int, default=40, help='등록할 층 수')
+
+    def handle(self, *args, **options):
+        if not is_occupancy_update_possible():
+            raise CommandError('혼잡도 업데이트 가능 시간이 아님')
+
+        # rollback될 로그가 실시간 혼잡도 구독자에게 전달되지 않도록 전달 receiver를 끊어둠
+        # (나머지 receiver는 commit 후에 실행되므로 rollback하면 실행되지 않음)
+        post_save.disconnect(publish_live_occupancy, sender=OccupancyRateUpdateLog)
+        post_save.disconnect(publish_live_occupancy, sender=OccupancyRatePrediction)
+        try:
+            with transaction.atomic():
+                user, cafe_floor_id_list = self.create_benchmark_data(options['floors'])
+                try:
+                    self.run_benchmark(user, cafe_floor_id_list)
+                finally:
+                    # Redis의 쿨타임, 하루 제한 기록은 rollback되지 않으므로 직접 지움
+                    SharingQuota.clear(user.id, cafe_floor_id_list)
+                transaction.set_rollback(True)
+        finally:
+            post_save.connect(publish_live_occupancy, sender=OccupancyRateUpdateLog)
+            post_save.connect(publish_live_occupancy, sender=OccupancyRatePrediction)
+
+    @staticmethod
+    def create_benchmark_data(floor_count):
+        # 실제 유저, 층의 쿨타임, 하루 제한, 실시간 상태에 영향을 주지 않도록 새로 만듦
+        name = uuid.uuid4().hex[:9]
+        user = User.objects.create(username=f"bench_{name}")
+        Profile.objects.create(user=user, nickname=f"벤치{name}")
+        cafe_floor_id_list = []
+        for index in range(floor_count):
+            cafe = Cafe.objects.create(
+                name=f"벤치마크카페{index}", address="벤치마크", latitude=37.55649747287372, longitude=126.93710302643744
+            )
+            cafe_floor_id_list.append(CafeFloor.objects.create(cafe=cafe, floor=1).id)
+        return user, cafe_floor_id_list
+
+    def run_benchmark(self, user, cafe_floor_id_list):
+        view = OccupancyRateUpdateLogViewSet.as_view({"post": "user_registration"})
+        factory = APIRequestFactory()
+
+        result_list = []
+        start = time.perf_counter()
+        for cafe_floor_id in cafe_floor_id_list:
+            request = factory.post(
+                "/cafe/occupancy_update_log/user_registration/",
+                {"occupancy_rate": 0.5, "cafe_floor_id": cafe_floor_id},
+                format="json"
+            )
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as context:
+                response = view(request)
+            result_list.append((response.status_code, len(context.captured_queries)))
+        elapsed = time.perf_counter() - start
+
+        created_count = sum(1 for status_code, _ in result_list if status_code == 201)
+        query_count_list = [query_count for status_code, query_count in result_list if status_code == 201]
+        logged_point = OccupancyRateUpdateLog.objects.filter(
+            user__id=user.id
+        ).aggregate(total=Sum("point"))["total"] or 0
+        gained_point = Profile.objects.get(user__id=user.id).point
+
+        self.stdout.write(f"요청 {len(result_list)}개, 성공 {created_count}개, {elapsed:.2f}초")
+        if created_count:
+            self.stdout.write(self.style.SUCCESS(
+                f"처리량 {created_count / elapsed:.1f}건/초, "
+                f"요청당 쿼리 평균 {sum(query_count_list) / len(query_count_list):.1f}개(최대 {max(query_count_list)}개)"
+            ))
+        # 회색 마커 이벤트 중에는 로그에 남지 않는 추가 포인트만큼 차이가 날 수 있음
+        if gained_point == logged_point:
+            self.stdout.write(self.style.SUCCESS(f"포인트 유실 없음(로그 합계 {logged_point}P, 지급 {gained_point}P)"))
+        else:
+            self.stdout.write(self.style.ERROR(f"포인트 불일치(로그 합계 {logged_point}P, 지급 {gained_point}P)"))
@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point, Polygon
+from django.core.management.base import BaseCommand
+from django.db import transaction, connection
+from django.db.models import Q
+
+from cafe.models import Cafe
+from cafe.utils import KNNDistance
+
+
+class Command(BaseCommand):
+    help = '가상 카페 데이터로 기존(위경도 범위, Distance 정렬)과 GiST(&&, <->) 공간 쿼리 실행 계획을 비교함, 데이터는 rollback'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='생성할 가상 카페 수')
+        parser.add_argument('--repeat', type=int, default=20, help='쿼리별 반복 실행 횟수')
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        latitude, longitude = 37.55649747287372, 126.93710302643744
+        # 서울 밖으로 확장한 상황을 가정해 한반도 전체 범위에 흩뿌림
+        cafe_list = []
+        for index in range(options['count']):
+            cafe_latitude = random.uniform(33.0, 38.6)
+            cafe_longitude = random.uniform(124.6, 131.0)
+            cafe_list.append(Cafe(
+                name=f"benchmark_{index}",
+                address="benchmark",
+                latitude=cafe_latitude,
+                longitude=cafe_longitude,
+                point=Point(cafe_longitude, cafe_latitude, srid=4326),
+            ))
+
+        south, west, north, east = latitude - 0.01, longitude - 0.01, latitude + 0.01, longitude + 0.01
+        user_location = Point(longitude, latitude, srid=4326)
+        base_queryset = Cafe.objects.filter(is_visible=True, is_closed=False)
+        query_dict = {
+            "viewport(latitude/longitude btree)": base_queryset.filter(
+                latitude__gte=south, latitude__lt=north, longitude__gte=west, longitude__lt=east
+            ),
+            "viewport(point &&)": base_queryset.filter(
+                point__bboverlaps=Polygon.from_bbox((west, south, east, north))
+            ),
+            "nearest 20(Distance)": base_queryset.filter(is_opened=True).annotate(
+                distance=Distance("point", user_location)
+            ).order_by("distance")[:20],
+            "nearest 20(point <->)": base_queryset.filter(is_opened=True).order_by(
+                KNNDistance("point", longitude=longitude, latitude=latitude)
+            )[:20],
+            "search nearest 300(Distance)": base_queryset.filter(
+                Q(name__icontains="benchmark_1") | Q(address__icontains="benchmark_1")
+            ).annotate(distance=Distance("point", user_location)).order_by("distance")[:300],
+            "search nearest 300(point <->)": base_queryset.filter(
+                Q(name__icontains="benchmark_1") | Q(address__icontains="benchmark_1")
+            ).order_by(KNNDistance("point", longitude=longitude, latitude=latitude))[:300],
+        }
+
+        with transaction.atomic():
+            Cafe.objects.bulk_create(cafe_list, batch_size=5000)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Cafe._meta.db_table}")
+
+            for name, queryset in query_dict.items():
+                list(queryset)
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    list(queryset.all())
+                elapsed = (time.perf_counter() - start) / options['repeat'] * 1000
+                self.stdout.write(self.style.SUCCESS(f"[{name}] 평균 {elapsed:.2f}ms"))
+                self.stdout.write(queryset.explain(analyze=True))
+                self.stdout.write("")
+
+            # 가상 데이터는 남기지 않음
+            transaction.set_rollback(True)
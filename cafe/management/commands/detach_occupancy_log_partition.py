@@ -0,0 +1,22 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cafe.partition import OccupancyLogPartition
+
+
+class Command(BaseCommand):
+    help = '혼잡도 로그의 특정 달 partition을 테이블에서 떼어냄(지우지는 않음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=str, help='떼어낼 달(YYYY-MM)')
+
+    def handle(self, *args, **options):
+        try:
+            month_start = datetime.datetime.strptime(options['month'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('YYYY-MM 형식이 아님')
+        if OccupancyLogPartition.detach(month_start):
+            self.stdout.write(self.style.SUCCESS(f'{OccupancyLogPartition.get_partition_name(month_start)} 분리 완료'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{OccupancyLogPartition.get_partition_name(month_start)} partition 없음'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cafe.live_state import LiveFloorState
+
+
+class Command(BaseCommand):
+    help = '혼잡도 로그로부터 카페 층별 실시간 상태를 다시 만듦'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cafe_floor_id', type=int, nargs='*', default=None, help='특정 층만 다시 만들 때 사용')
+
+    def handle(self, *args, **options):
+        LiveFloorState.rebuild(cafe_floor_id_list=options['cafe_floor_id'])
+        self.stdout.write(self.style.SUCCESS('카페 층별 실시간 상태 갱신 완료'))
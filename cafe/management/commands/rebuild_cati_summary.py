@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cafe.utils import CATICalculator
+
+
+class Command(BaseCommand):
+    help = 'CATI 투표로부터 카페별 CATI 합계를 다시 만듦'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cafe_id', type=int, nargs='*', default=None, help='특정 카페만 다시 만들 때 사용')
+
+    def handle(self, *args, **options):
+        CATICalculator.rebuild(cafe_id_list=options['cafe_id'])
+        self.stdout.write(self.style.SUCCESS('카페별 CATI 합계 갱신 완료'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from cafe.occupancy_profile import OccupancyProfiler
+
+
+class Command(BaseCommand):
+    help = '층별 시간대 혼잡도 분포를 비우고 전체 혼잡도 로그로 다시 만듦'
+
+    def handle(self, *args, **options):
+        count = OccupancyProfiler.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'로그 {count}개 반영 완료'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from cafe.rollup import OccupancyRollup
+
+
+class Command(BaseCommand):
+    help = '시간별 혼잡도 집계를 비우고 전체 혼잡도 로그로 다시 만듦'
+
+    def handle(self, *args, **options):
+        count = OccupancyRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'로그 {count}개 집계 완료'))
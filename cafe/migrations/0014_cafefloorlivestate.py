@@ -0,0 +1,66 @@
+# Generated by Django 4.2.1 on 2026-10-18 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# 기존 로그로 층별 실시간 상태를 채움(cafe.live_state.LiveFloorState.rebuild와 같은 내용)
+# 로그 응답 형식은 OccupancyRateUpdateLogSerializer와 같게 만듦(유저는 id만)
+def serialize_log(log):
+    return {
+        "id": log.id,
+        "occupancy_rate": str(log.occupancy_rate),
+        "update": log.update.isoformat(),
+        "point": log.point,
+        "is_notified": log.is_notified,
+        "is_google_map_prediction": log.is_google_map_prediction,
+        "congestion": log.congestion,
+        "cafe_floor": log.cafe_floor_id,
+        "user": log.user_id,
+    }
+
+
+def backfill_live_state(apps, schema_editor):
+    CafeFloor = apps.get_model('cafe', 'CafeFloor')
+    CafeFloorLiveState = apps.get_model('cafe', 'CafeFloorLiveState')
+    OccupancyRateUpdateLog = apps.get_model('cafe', 'OccupancyRateUpdateLog')
+    live_state_list = []
+    for cafe_floor_id in CafeFloor.objects.values_list("id", flat=True).iterator():
+        log_queryset = OccupancyRateUpdateLog.objects.filter(cafe_floor_id=cafe_floor_id)
+        recent_logs = list(log_queryset.order_by("-update")[:settings.RECENT_LOG_LIMIT])
+        live_state_list.append(CafeFloorLiveState(
+            cafe_floor_id=cafe_floor_id,
+            recent_log=[serialize_log(log) for log in recent_logs],
+            latest_occupancy_rate=recent_logs[0].occupancy_rate if recent_logs else None,
+            last_update=recent_logs[0].update if recent_logs else None,
+            user_log_count=log_queryset.filter(user__isnull=False).count(),
+        ))
+    CafeFloorLiveState.objects.bulk_create(live_state_list, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0013_alter_cafe_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CafeFloorLiveState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recent_log', models.JSONField(default=list)),
+                ('latest_occupancy_rate', models.DecimalField(blank=True, decimal_places=2, default=None, max_digits=3, null=True)),
+                ('last_update', models.DateTimeField(blank=True, default=None, null=True)),
+                ('user_log_count', models.IntegerField(default=0)),
+                ('cafe_floor', models.OneToOneField(db_column='cafe_floor', on_delete=django.db.models.deletion.CASCADE, related_name='live_state', to='cafe.cafefloor')),
+            ],
+            options={
+                'db_table': 'cafe_cafe_floor_live_state',
+                'db_table_comment': '카페 층별 실시간 혼잡도 상태',
+                'ordering': ['-last_update'],
+            },
+        ),
+        migrations.RunPython(backfill_live_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.1 on 2026-10-18 11:03
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+# 기존 CATI 투표로 카페별 합계를 채움(cafe.utils.CATICalculator.rebuild와 같은 내용)
+def backfill_cati_summary(apps, schema_editor):
+    CATI = apps.get_model('cafe', 'CATI')
+    CATISummary = apps.get_model('cafe', 'CATISummary')
+    aggregated_list = CATI.objects.order_by().values("cafe").annotate(
+        count=Count("id"),
+        openness_sum=Sum("openness"),
+        coffee_sum=Sum("coffee"),
+        workspace_sum=Sum("workspace"),
+        acidity_sum=Sum("acidity"),
+    )
+    CATISummary.objects.bulk_create([
+        CATISummary(
+            cafe_id=aggregated["cafe"],
+            count=aggregated["count"],
+            openness_sum=aggregated["openness_sum"],
+            coffee_sum=aggregated["coffee_sum"],
+            workspace_sum=aggregated["workspace_sum"],
+            acidity_sum=aggregated["acidity_sum"],
+        ) for aggregated in aggregated_list
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0014_cafefloorlivestate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CATISummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('openness_sum', models.IntegerField(default=0)),
+                ('coffee_sum', models.IntegerField(default=0)),
+                ('workspace_sum', models.IntegerField(default=0)),
+                ('acidity_sum', models.IntegerField(default=0)),
+                ('cafe', models.OneToOneField(db_column='cafe', on_delete=django.db.models.deletion.CASCADE, related_name='cati_summary', to='cafe.cafe')),
+            ],
+            options={
+                'db_table': 'cafe_cati_summary',
+                'db_table_comment': '카페별 CATI 투표 합계',
+                'ordering': ['cafe__name'],
+            },
+        ),
+        migrations.RunPython(backfill_cati_summary, migrations.RunPython.noop),
+    ]
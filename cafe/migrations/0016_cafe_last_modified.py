@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0015_catisummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cafe',
+            name='last_modified',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
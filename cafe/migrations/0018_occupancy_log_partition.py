@@ -0,0 +1,129 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# 혼잡도 로그 테이블을 update 기준 월별 range partition 테이블로 바꿈
+# partition key가 primary key에 포함되어야 하므로 DB의 primary key는 (id, update)
+PARTITION_SQL = """
+ALTER TABLE "cafe_occupancy_rate_update_log" RENAME TO "cafe_occupancy_rate_update_log_old";
+
+CREATE TABLE "cafe_occupancy_rate_update_log" (
+    "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+    "occupancy_rate" numeric(3, 2) NOT NULL,
+    "update" timestamp with time zone NOT NULL,
+    "point" integer NOT NULL,
+    "is_notified" boolean NOT NULL,
+    "is_google_map_prediction" boolean NOT NULL,
+    "congestion" varchar NULL,
+    "cafe_floor" bigint NULL REFERENCES "cafe_cafe_floor" ("id") DEFERRABLE INITIALLY DEFERRED,
+    "user" bigint NULL REFERENCES "user_user" ("id") DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY ("id", "update")
+) PARTITION BY RANGE ("update");
+COMMENT ON TABLE "cafe_occupancy_rate_update_log" IS '좌석 점유율 업데이트 로그';
+
+-- 미리 만든 partition 범위를 벗어난 로그를 받아두는 partition(평소에는 비어 있음)
+CREATE TABLE "cafe_occupancy_rate_update_log_default" PARTITION OF "cafe_occupancy_rate_update_log" DEFAULT;
+
+DO $$
+DECLARE
+    month_start date := date_trunc(
+        'month', COALESCE((SELECT MIN("update") FROM "cafe_occupancy_rate_update_log_old"), now())
+    )::date;
+BEGIN
+    WHILE month_start <= (date_trunc('month', now()) + interval '3 months')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "cafe_occupancy_rate_update_log" FOR VALUES FROM (%L) TO (%L)',
+            'cafe_occupancy_rate_update_log_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+            month_start,
+            (month_start + interval '1 month')::date
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO "cafe_occupancy_rate_update_log" (
+    "id", "occupancy_rate", "update", "point", "is_notified", "is_google_map_prediction", "congestion", "cafe_floor", "user"
+)
+SELECT "id", "occupancy_rate", "update", "point", "is_notified", "is_google_map_prediction", "congestion", "cafe_floor", "user"
+FROM "cafe_occupancy_rate_update_log_old";
+
+SELECT setval(
+    pg_get_serial_sequence('"cafe_occupancy_rate_update_log"', 'id'), COALESCE(MAX("id"), 0) + 1, false
+) FROM "cafe_occupancy_rate_update_log";
+
+DROP TABLE "cafe_occupancy_rate_update_log_old";
+"""
+
+REVERSE_PARTITION_SQL = """
+ALTER TABLE "cafe_occupancy_rate_update_log" RENAME TO "cafe_occupancy_rate_update_log_partitioned";
+
+CREATE TABLE "cafe_occupancy_rate_update_log" (
+    "id" bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    "occupancy_rate" numeric(3, 2) NOT NULL,
+    "update" timestamp with time zone NOT NULL,
+    "point" integer NOT NULL,
+    "is_notified" boolean NOT NULL,
+    "is_google_map_prediction" boolean NOT NULL,
+    "congestion" varchar NULL,
+    "cafe_floor" bigint NULL REFERENCES "cafe_cafe_floor" ("id") DEFERRABLE INITIALLY DEFERRED,
+    "user" bigint NULL REFERENCES "user_user" ("id") DEFERRABLE INITIALLY DEFERRED
+);
+COMMENT ON TABLE "cafe_occupancy_rate_update_log" IS '좌석 점유율 업데이트 로그';
+CREATE INDEX ON "cafe_occupancy_rate_update_log" ("cafe_floor");
+CREATE INDEX ON "cafe_occupancy_rate_update_log" ("user");
+
+INSERT INTO "cafe_occupancy_rate_update_log" (
+    "id", "occupancy_rate", "update", "point", "is_notified", "is_google_map_prediction", "congestion", "cafe_floor", "user"
+)
+SELECT "id", "occupancy_rate", "update", "point", "is_notified", "is_google_map_prediction", "congestion", "cafe_floor", "user"
+FROM "cafe_occupancy_rate_update_log_partitioned";
+
+SELECT setval(
+    pg_get_serial_sequence('"cafe_occupancy_rate_update_log"', 'id'), COALESCE(MAX("id"), 0) + 1, false
+) FROM "cafe_occupancy_rate_update_log";
+
+DROP TABLE "cafe_occupancy_rate_update_log_partitioned";
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cafe', '0017_cafe_trigram_index'),
+    ]
+
+    # 새 테이블에는 cafe_floor, user 단독 인덱스가 없으므로(아래 (cafe_floor, -update), (user, -update) 인덱스로 조회)
+    # Django 상태에서도 두 FK의 인덱스를 없앰
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(PARTITION_SQL, reverse_sql=REVERSE_PARTITION_SQL)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='occupancyrateupdatelog',
+                    name='cafe_floor',
+                    field=models.ForeignKey(blank=True, db_column='cafe_floor', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupancy_rate_update_log', to='cafe.cafefloor'),
+                ),
+                migrations.AlterField(
+                    model_name='occupancyrateupdatelog',
+                    name='user',
+                    field=models.ForeignKey(blank=True, db_column='user', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupancy_rate_update_log', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='occupancyrateupdatelog',
+            index=models.Index(fields=['cafe_floor', '-update'], name='occupancy_log_floor_update_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='occupancyrateupdatelog',
+            index=models.Index(fields=['user', '-update'], name='occupancy_log_user_update_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='occupancyrateupdatelog',
+            index=models.Index(condition=models.Q(('is_notified', False), ('user__isnull', False)), fields=['update'], name='occupancy_log_unnotified_idx'),
+        ),
+    ]
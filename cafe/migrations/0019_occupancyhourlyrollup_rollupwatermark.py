@@ -0,0 +1,54 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0018_occupancy_log_partition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=31, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'cafe_rollup_watermark',
+                'db_table_comment': '증분 집계 진행 위치',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OccupancyHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.SmallIntegerField()),
+                ('log_count', models.IntegerField(default=0)),
+                ('occupancy_rate_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('occupancy_rate_min', models.DecimalField(blank=True, decimal_places=2, default=None, max_digits=3, null=True)),
+                ('occupancy_rate_max', models.DecimalField(blank=True, decimal_places=2, default=None, max_digits=3, null=True)),
+                ('user_count', models.IntegerField(default=0)),
+                ('user_id_list', models.JSONField(default=list)),
+                ('congestion_count', models.JSONField(default=dict)),
+                ('congestion', models.CharField(blank=True, choices=[('여유', '여유'), ('보통', '보통'), ('약간 붐빔', '약간 붐빔'), ('붐빔', '붐빔')], default=None, null=True)),
+                ('cafe_floor', models.ForeignKey(db_column='cafe_floor', on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_hourly_rollup', to='cafe.cafefloor')),
+            ],
+            options={
+                'db_table': 'cafe_occupancy_hourly_rollup',
+                'db_table_comment': '카페 층별 시간대 혼잡도 로그 집계',
+                'ordering': ['date', 'hour'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupancyhourlyrollup',
+            constraint=models.UniqueConstraint(fields=('cafe_floor', 'date', 'hour'), name='occupancy_hourly_rollup_unique'),
+        ),
+    ]
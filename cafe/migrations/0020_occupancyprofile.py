@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 16:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0019_occupancyhourlyrollup_rollupwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('log_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cafe_floor', models.OneToOneField(db_column='cafe_floor', on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_profile', to='cafe.cafefloor')),
+            ],
+            options={
+                'db_table': 'cafe_occupancy_profile',
+                'db_table_comment': '카페 층별 요일 구분, 시간대별 혼잡도 분포',
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
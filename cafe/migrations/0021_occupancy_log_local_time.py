@@ -0,0 +1,52 @@
+# Generated by Django 4.2.1 on 2026-10-18 16:47
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, When, Value, Max, Min
+from django.db.models.functions import ExtractHour, ExtractMinute
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+# 기존 로그의 평일/주말, 분을 id 구간별로 채움(backfill_occupancy_log_local_time 명령과 같은 내용)
+# 구간마다 commit해서 큰 로그 테이블을 한번에 잠그지 않도록 migration은 atomic=False로 실행
+def backfill_local_time(apps, schema_editor):
+    OccupancyRateUpdateLog = apps.get_model('cafe', 'OccupancyRateUpdateLog')
+    id_range = OccupancyRateUpdateLog.objects.filter(day_class__isnull=True).aggregate(
+        min_id=Min("id"), max_id=Max("id")
+    )
+    if id_range["min_id"] is None:
+        return
+    for start_id in range(id_range["min_id"], id_range["max_id"] + 1, BACKFILL_BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            OccupancyRateUpdateLog.objects.filter(
+                id__gte=start_id, id__lt=start_id + BACKFILL_BATCH_SIZE, day_class__isnull=True
+            ).update(
+                day_class=Case(When(update__week_day__in=[1, 7], then=Value(1)), default=Value(0)),
+                minute_of_day=ExtractHour("update") * 60 + ExtractMinute("update")
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('cafe', '0020_occupancyprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='occupancyrateupdatelog',
+            name='day_class',
+            field=models.SmallIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='occupancyrateupdatelog',
+            name='minute_of_day',
+            field=models.SmallIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.RunPython(backfill_local_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='occupancyrateupdatelog',
+            index=models.Index(fields=['cafe_floor', 'day_class', 'minute_of_day'], name='occupancy_log_floor_minute_idx'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from enum import Enum
 
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 from utils import CATIScore
@@ -143,6 +145,26 @@ class CATI(models.Model):
         ordering = ['cafe__name']
 
 
+class CATISummary(models.Model):
+    count = models.IntegerField(default=0)  # 투표 수
+    openness_sum = models.IntegerField(default=0)
+    coffee_sum = models.IntegerField(default=0)
+    workspace_sum = models.IntegerField(default=0)
+    acidity_sum = models.IntegerField(default=0)
+    cafe = models.OneToOneField(
+        'Cafe',
+        on_delete=models.CASCADE,
+        related_name="cati_summary",
+        db_column="cafe"
+    )
+
+    class Meta:
+        db_table = 'cafe_cati_summary'
+        db_table_comment = '카페별 CATI 투표 합계'
+        app_label = 'cafe'
+        ordering = ['cafe__name']
+
+
 class Cafe(models.Model):
     is_visible = models.BooleanField(default=True)
     is_closed = models.BooleanField(default=False)
@@ -152,6 +174,7 @@ class Cafe(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
     point = models.PointField(blank=True, null=True, default=Point(0, 0, srid=4326), srid=4326)
+    last_modified = models.DateTimeField(default=timezone.now, db_index=True)  # 카페 및 하위 정보가 마지막으로 바뀐 시각
     google_place_id = models.CharField(max_length=255, default=None, null=True, blank=True)
     district = models.ForeignKey(
         'District',
@@ -187,6 +210,9 @@ class Cafe(models.Model):
             models.Index(fields=["name"], name="cafe_name_index"),
             models.Index(fields=["address"], name="cafe_address_index"),
             models.Index(fields=["latitude", "longitude"], name="cafe_coordinate_index"),
+            # icontains(UPPER(...) LIKE UPPER(...)) 검색용 trigram 인덱스
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="cafe_name_trgm_index"),
+            GinIndex(OpClass(Upper("address"), name="gin_trgm_ops"), name="cafe_address_trgm_index"),
         ]
 
 
@@ -314,17 +340,22 @@ class OccupancyRateUpdateLog(models.Model):
     point = models.IntegerField(default=0)
     is_notified = models.BooleanField(default=False)
     is_google_map_prediction = models.BooleanField(default=False)
+    # update(Asia/Seoul)에서 계산해 저장(pre_save signal), 시간대 조회가 함수 계산 없이 인덱스를 타도록 함
+    day_class = models.SmallIntegerField(null=True, blank=True, default=None)  # 0: 평일, 1: 주말
+    minute_of_day = models.SmallIntegerField(null=True, blank=True, default=None)  # 0 ~ 1439
     congestion = models.CharField(
         default=None,
         null=True,
         blank=True,
         choices=((congestion.value, congestion.value) for congestion in Congestion)
     )
+    # FK 단독 인덱스 대신 아래 (cafe_floor, -update), (user, -update) 인덱스로 조회
     cafe_floor = models.ForeignKey(
         'CafeFloor',
         on_delete=models.SET_NULL,
         related_name="occupancy_rate_update_log",
         db_column="cafe_floor",
+        db_index=False,
         blank=True,
         null=True
     )
@@ -333,6 +364,7 @@ class OccupancyRateUpdateLog(models.Model):
         on_delete=models.SET_NULL,
         related_name="occupancy_rate_update_log",
         db_column="user",
+        db_index=False,
         blank=True,
         null=True
     )
@@ -342,6 +374,100 @@ class OccupancyRateUpdateLog(models.Model):
         db_table_comment = '좌석 점유율 업데이트 로그'
         app_label = 'cafe'
         ordering = ["-update"]
+        # update 기준 월별 range partition 테이블(0018 migration, cafe.partition 참고)
+        indexes = [
+            models.Index(fields=["cafe_floor", "-update"], name="occupancy_log_floor_update_idx"),
+            models.Index(fields=["user", "-update"], name="occupancy_log_user_update_idx"),
+            models.Index(
+                fields=["update"], condition=models.Q(is_notified=False, user__isnull=False), name="occupancy_log_unnotified_idx"
+            ),
+            models.Index(fields=["cafe_floor", "day_class", "minute_of_day"], name="occupancy_log_floor_minute_idx"),
+        ]
+
+
+class CafeFloorLiveState(models.Model):
+    recent_log = models.JSONField(default=list)  # 최근 로그들(유저는 id만, 최신순)
+    latest_occupancy_rate = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, default=None)
+    last_update = models.DateTimeField(null=True, blank=True, default=None)
+    user_log_count = models.IntegerField(default=0)  # 유저가 남긴 전체 로그 수
+    cafe_floor = models.OneToOneField(
+        "CafeFloor",
+        on_delete=models.CASCADE,
+        related_name="live_state",
+        db_column="cafe_floor"
+    )
+
+    class Meta:
+        db_table = 'cafe_cafe_floor_live_state'
+        db_table_comment = '카페 층별 실시간 혼잡도 상태'
+        app_label = 'cafe'
+        ordering = ["-last_update"]
+
+
+# 층별 시간대(날짜, 시) 혼잡도 로그 집계, 로그 id 기준 high-water mark부터 증분으로 갱신(cafe.rollup)
+class OccupancyHourlyRollup(models.Model):
+    date = models.DateField()
+    hour = models.SmallIntegerField()
+    log_count = models.IntegerField(default=0)
+    occupancy_rate_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    occupancy_rate_min = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, default=None)
+    occupancy_rate_max = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, default=None)
+    user_count = models.IntegerField(default=0)  # 로그를 남긴 서로 다른 유저 수
+    user_id_list = models.JSONField(default=list)  # user_count 증분 계산용
+    congestion_count = models.JSONField(default=dict)  # {지역 혼잡도: 로그 수}
+    congestion = models.CharField(  # 가장 많았던 지역 혼잡도
+        default=None,
+        null=True,
+        blank=True,
+        choices=((congestion.value, congestion.value) for congestion in Congestion)
+    )
+    cafe_floor = models.ForeignKey(
+        "CafeFloor",
+        on_delete=models.CASCADE,
+        related_name="occupancy_hourly_rollup",
+        db_column="cafe_floor"
+    )
+
+    class Meta:
+        db_table = 'cafe_occupancy_hourly_rollup'
+        db_table_comment = '카페 층별 시간대 혼잡도 로그 집계'
+        app_label = 'cafe'
+        ordering = ["date", "hour"]
+        constraints = [
+            models.UniqueConstraint(fields=["cafe_floor", "date", "hour"], name="occupancy_hourly_rollup_unique")
+        ]
+
+
+# 층별 평일/주말 x 10분 시간대 혼잡도 분포(로그 수, 평균, 편차 제곱합)를 float64 배열 하나로 묶어 저장(cafe.occupancy_profile)
+class OccupancyProfile(models.Model):
+    data = models.BinaryField()
+    log_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    cafe_floor = models.OneToOneField(
+        "CafeFloor",
+        on_delete=models.CASCADE,
+        related_name="occupancy_profile",
+        db_column="cafe_floor"
+    )
+
+    class Meta:
+        db_table = 'cafe_occupancy_profile'
+        db_table_comment = '카페 층별 요일 구분, 시간대별 혼잡도 분포'
+        app_label = 'cafe'
+        ordering = ["-updated_at"]
+
+
+# 증분 집계가 어느 로그 id까지 반영했는지 기록
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=31, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'cafe_rollup_watermark'
+        db_table_comment = '증분 집계 진행 위치'
+        app_label = 'cafe'
+        ordering = ["name"]
 
 
 class DailyActivityStack(models.Model):
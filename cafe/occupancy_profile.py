@@ -0,0 +1,176 @@
+import datetime
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from cafe.models import OccupancyProfile, RollupWatermark
+from cafe.rollup import get_log_batch
+from cafejari.settings import OCCUPANCY_ROLLUP_BATCH_SIZE, OCCUPANCY_PROFILE_SMOOTHING_RADIUS
+
+WEEKDAY, WEEKEND = 0, 1
+BUCKET_MINUTES = 10
+BUCKET_COUNT = 24 * 60 // BUCKET_MINUTES
+# 배열 마지막 축: 로그 수, 평균, 편차 제곱합(M2)
+COUNT, MEAN, M2 = 0, 1, 2
+SHAPE = (2, BUCKET_COUNT, 3)
+
+
+# 층별 평일/주말 x 10분 시간대의 혼잡도 분포를 로그가 쌓일 때마다 증분(Welford/Chan 병합)으로 갱신
+# 예측, "평소 이 시간" 조회는 시간대 범위 스캔 대신 층별 배열 하나를 읽어 주변 시간대와 가중 평균
+class OccupancyProfiler:
+    NAME = "occupancy_profile"
+
+    @staticmethod
+    def get_day_class(date):
+        return WEEKDAY if date.weekday() < 5 else WEEKEND
+
+    @staticmethod
+    def get_bucket(time):
+        return (time.hour * 60 + time.minute) // BUCKET_MINUTES
+
+    @staticmethod
+    def get_bucket_time(bucket):
+        minutes = bucket * BUCKET_MINUTES
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    @staticmethod
+    def empty():
+        return np.zeros(SHAPE, dtype=np.float64)
+
+    @staticmethod
+    def load(data):
+        return np.frombuffer(bytes(data), dtype=np.float64).reshape(SHAPE).copy()
+
+    @staticmethod
+    def dump(profile):
+        return profile.astype(np.float64).tobytes()
+
+    @staticmethod
+    def merge(profile, day_classes, buckets, occupancy_rates):
+        # 새 로그들을 시간대별 (수, 평균, M2)로 묶은 뒤 기존 값과 병합
+        index = day_classes * BUCKET_COUNT + buckets
+        size = 2 * BUCKET_COUNT
+        count = np.bincount(index, minlength=size).astype(np.float64)
+        mean = np.divide(np.bincount(index, weights=occupancy_rates, minlength=size), count,
+                         out=np.zeros(size), where=count > 0)
+        m2 = np.bincount(index, weights=np.square(occupancy_rates - mean[index]), minlength=size)
+
+        flat = profile.reshape(size, 3)
+        total = flat[:, COUNT] + count
+        delta = mean - flat[:, MEAN]
+        ratio = np.divide(count, total, out=np.zeros(size), where=total > 0)
+        flat[:, M2] += m2 + np.square(delta) * flat[:, COUNT] * ratio
+        flat[:, MEAN] += delta * ratio
+        flat[:, COUNT] = total
+        return profile
+
+    @staticmethod
+    def get_weights(radius):
+        # 가운데 시간대에 가장 큰 가중치를 주는 삼각형 가중치
+        return radius + 1 - np.abs(np.arange(-radius, radius + 1))
+
+    @classmethod
+    def get_curve(cls, profile, day_class, radius=OCCUPANCY_PROFILE_SMOOTHING_RADIUS):
+        # 시간대별 (평균, 표준편차, 주변 포함 로그 수) 배열, 로그가 없는 시간대 평균은 nan
+        day = profile[day_class]
+        weighted_count = np.zeros(BUCKET_COUNT)
+        weighted_sum = np.zeros(BUCKET_COUNT)
+        weighted_square_sum = np.zeros(BUCKET_COUNT)
+        count = np.zeros(BUCKET_COUNT)
+        for offset, weight in zip(range(-radius, radius + 1), cls.get_weights(radius)):
+            # 하루 경계 밖은 없는 시간대로 봄
+            source = slice(max(offset, 0), BUCKET_COUNT + min(offset, 0))
+            target = slice(max(-offset, 0), BUCKET_COUNT + min(-offset, 0))
+            n = day[source, COUNT]
+            weighted_count[target] += weight * n
+            weighted_sum[target] += weight * n * day[source, MEAN]
+            weighted_square_sum[target] += weight * (day[source, M2] + n * np.square(day[source, MEAN]))
+            count[target] += n
+        has_log = weighted_count > 0
+        mean = np.divide(weighted_sum, weighted_count, out=np.full(BUCKET_COUNT, np.nan), where=has_log)
+        variance = np.divide(weighted_square_sum, weighted_count, out=np.zeros(BUCKET_COUNT), where=has_log) \
+            - np.where(has_log, np.square(mean), 0.0)
+        return mean, np.sqrt(np.maximum(variance, 0.0)), count
+
+    @classmethod
+    def get_typical(cls, profile, day_class, bucket, radius=OCCUPANCY_PROFILE_SMOOTHING_RADIUS):
+        # 한 시간대의 (평균, 표준편차, 로그 수), 주변 시간대까지 로그가 없으면 None
+        day = profile[day_class, max(bucket - radius, 0):bucket + radius + 1]
+        weights = cls.get_weights(radius)[max(radius - bucket, 0):][:len(day)]
+        weighted_count = float(np.dot(weights, day[:, COUNT]))
+        if weighted_count == 0:
+            return None
+        mean = float(np.dot(weights, day[:, COUNT] * day[:, MEAN])) / weighted_count
+        variance = float(np.dot(weights, day[:, M2] + day[:, COUNT] * np.square(day[:, MEAN]))) / weighted_count \
+            - mean * mean
+        return mean, max(variance, 0.0) ** 0.5, int(day[:, COUNT].sum())
+
+    @classmethod
+    def get_profile_dict(cls, cafe_floor_id_list):
+        return {
+            cafe_floor_id: cls.load(data) for cafe_floor_id, data in OccupancyProfile.objects.filter(
+                cafe_floor_id__in=cafe_floor_id_list
+            ).values_list("cafe_floor_id", "data")
+        }
+
+    @classmethod
+    def update(cls, batch_size=OCCUPANCY_ROLLUP_BATCH_SIZE):
+        # 로그 한 묶음을 반영하고 반영한 로그 수를 돌려줌
+        with transaction.atomic():
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=cls.NAME)
+            row_list = get_log_batch(watermark, batch_size, "occupancy_rate", "cafe_floor_id")
+            if not row_list:
+                return 0
+
+            log_list_dict = defaultdict(list)
+            for _, update, occupancy_rate, cafe_floor_id in row_list:
+                if cafe_floor_id is not None:
+                    log_list_dict[cafe_floor_id].append(
+                        (cls.get_day_class(update.date()), cls.get_bucket(update.time()), float(occupancy_rate))
+                    )
+            profile_object_dict = {
+                profile_object.cafe_floor_id: profile_object
+                for profile_object in OccupancyProfile.objects.filter(cafe_floor_id__in=list(log_list_dict))
+            }
+            now = datetime.datetime.now()
+            created_list, updated_list = [], []
+            for cafe_floor_id, log_list in log_list_dict.items():
+                profile_object = profile_object_dict.get(cafe_floor_id)
+                if profile_object is None:
+                    profile_object = OccupancyProfile(cafe_floor_id=cafe_floor_id)
+                    profile = cls.empty()
+                    created_list.append(profile_object)
+                else:
+                    profile = cls.load(profile_object.data)
+                    updated_list.append(profile_object)
+                log_array = np.array(log_list)
+                cls.merge(
+                    profile, log_array[:, 0].astype(np.int64), log_array[:, 1].astype(np.int64), log_array[:, 2]
+                )
+                profile_object.data = cls.dump(profile)
+                profile_object.log_count += len(log_list)
+                profile_object.updated_at = now
+            OccupancyProfile.objects.bulk_create(created_list)
+            OccupancyProfile.objects.bulk_update(updated_list, ["data", "log_count", "updated_at"])
+
+            watermark.last_id = row_list[-1][0]
+            watermark.save()
+        return len(row_list)
+
+    @classmethod
+    def update_all(cls):
+        total_count = 0
+        while True:
+            count = cls.update()
+            total_count += count
+            if count < OCCUPANCY_ROLLUP_BATCH_SIZE:
+                return total_count
+
+    @classmethod
+    def rebuild(cls):
+        # 분포를 비우고 처음 로그부터 다시 만듦
+        with transaction.atomic():
+            OccupancyProfile.objects.all().delete()
+            RollupWatermark.objects.filter(name=cls.NAME).delete()
+        return cls.update_all()
@@ -0,0 +1,61 @@
+import datetime
+
+from django.db import connection
+
+from cafe.models import OccupancyRateUpdateLog
+
+
+# 혼잡도 로그 테이블의 월별 partition 관리, 최근 구간 조회는 최신 partition만 읽음
+# 새 달의 partition은 cron으로 미리 만들고, 오래된 partition은 detach로 테이블에서 바로 떼어낼 수 있음
+class OccupancyLogPartition:
+    table = OccupancyRateUpdateLog._meta.db_table
+
+    @staticmethod
+    def get_month_start(date):
+        return datetime.date(date.year, date.month, 1)
+
+    @staticmethod
+    def get_next_month_start(month_start):
+        return (month_start + datetime.timedelta(days=32)).replace(day=1)
+
+    @classmethod
+    def get_partition_name(cls, month_start):
+        return f"{cls.table}_y{month_start.year}m{month_start.month:02d}"
+
+    @classmethod
+    def get_partition_name_list(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "WHERE parent.relname = %s ORDER BY child.relname",
+                [cls.table]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @classmethod
+    def create(cls, month_start):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{cls.get_partition_name(month_start)}" PARTITION OF "{cls.table}" '
+                f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{cls.get_next_month_start(month_start).isoformat()}')"
+            )
+
+    @classmethod
+    def create_future(cls, months_ahead, today=None):
+        # 이번 달부터 months_ahead달 뒤까지의 partition을 만듦(이미 있으면 건너뜀)
+        month_start = cls.get_month_start(today or datetime.date.today())
+        for _ in range(months_ahead + 1):
+            cls.create(month_start)
+            month_start = cls.get_next_month_start(month_start)
+
+    @classmethod
+    def detach(cls, month_start):
+        # 테이블에서 떼어내기만 하고 지우지는 않음(보관, 백업 후 직접 삭제)
+        name = cls.get_partition_name(month_start)
+        if name not in cls.get_partition_name_list():
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{cls.table}" DETACH PARTITION "{name}"')
+        return True
@@ -0,0 +1,200 @@
+import datetime
+import logging
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from cafe.live_channel import LiveOccupancyChannel
+from cafe.models import OccupancyRateUpdateLog, CafeFloor, OccupancyRatePrediction, Congestion, Cafe
+from cafe.occupancy_profile import OccupancyProfiler
+from cafe.sync import CafeSync
+from cafe.tile_cache import CafeTileCache
+from cafejari.settings import OCCUPANCY_PREDICTOR
+
+CONGESTION_INDEX_DICT = {congestion.value: index for index, congestion in enumerate(Congestion)}
+WINDOW_MINUTES = 80
+
+
+# 모든 층의 예상 혼잡도를 한번에 계산(기본 predictor, 다른 방식은 cafe.predictors)
+# 평일/주말별 전후 80분 시간대의 로그를 쿼리 하나로 NumPy 배열에 불러와 층별 가장 가까운 과거/미래 로그로 보간하고
+# 지역 혼잡도 차이만큼 가감한 뒤 한번의 upsert로 저장
+# bulk 저장은 signal이 없으므로 타일 캐시, 지도 delta, 실시간 채널은 commit 후 직접 갱신
+class OccupancyPredictionEngine:
+    predictor = None
+
+    @staticmethod
+    def get_window(now):
+        # 기존 계산과 같은 시간대 범위(분 단위 절삭, 자정 직전은 23:59:59까지)와 평일/주말
+        start_datetime = now - datetime.timedelta(minutes=WINDOW_MINUTES)
+        end_datetime = now + datetime.timedelta(minutes=WINDOW_MINUTES)
+        start_time = datetime.time(start_datetime.hour, start_datetime.minute, 0)
+        if end_datetime.hour == 0 or end_datetime.hour == 1:
+            end_time = datetime.time(23, 59, 59)
+        else:
+            end_time = datetime.time(end_datetime.hour, end_datetime.minute, 0)
+        return start_time, end_time, OccupancyProfiler.get_day_class(now.date())
+
+    @staticmethod
+    def get_seconds(time):
+        return time.hour * 3600 + time.minute * 60 + time.second + time.microsecond / 1000000
+
+    @classmethod
+    def get_window_filter(cls, now):
+        # 로그에 저장된 평일/주말, 분 컬럼으로 거르는 시간대 조건((층, 평일/주말, 분) 인덱스 사용)
+        # 분 단위라 경계의 초는 걸러지지 않으므로 정확한 범위는 불러온 뒤 배열 계산에서 다시 확인
+        start_time, end_time, day_class = cls.get_window(now)
+        start_minute = start_time.hour * 60 + start_time.minute
+        now_minute = now.hour * 60 + now.minute
+        end_minute = end_time.hour * 60 + end_time.minute
+        return Q(day_class=day_class) & (
+            Q(minute_of_day__range=(start_minute, now_minute)) | Q(minute_of_day__range=(now_minute, end_minute))
+        )
+
+    @staticmethod
+    def get_target_filter(cafe_floor_id_list=None):
+        # 예측 대상 층의 로그 조건(층 목록이 없으면 자리가 있는 영업중 카페 층 전체)
+        if cafe_floor_id_list is not None:
+            return Q(cafe_floor_id__in=cafe_floor_id_list)
+        return Q(cafe_floor__has_seat=True, cafe_floor__cafe__is_opened=True)
+
+    @classmethod
+    def load_logs(cls, now, cafe_floor_id_list=None):
+        # now 이전의 시간대 내 로그를 (층 id, 시각(초), 혼잡도, 지역 혼잡도 index(없으면 -1)) 배열로
+        row_list = list(OccupancyRateUpdateLog.objects.filter(
+            cls.get_window_filter(now),
+            cls.get_target_filter(cafe_floor_id_list),
+            update__lt=now
+        ).order_by().values_list("cafe_floor_id", "update", "occupancy_rate", "congestion"))
+        return (
+            np.array([row[0] for row in row_list], dtype=np.int64),
+            np.array([cls.get_seconds(row[1].time()) for row in row_list], dtype=np.float64),
+            np.array([row[2] for row in row_list], dtype=np.float64),
+            np.array([CONGESTION_INDEX_DICT.get(row[3], -1) for row in row_list], dtype=np.int64),
+        )
+
+    @staticmethod
+    def get_closest(floor_ids, seconds, mask, is_future):
+        # mask 안의 로그 중 층별로 가장 가까운 로그의 위치(미래는 가장 이른, 과거는 가장 늦은 시각)
+        index_array = np.flatnonzero(mask)
+        order = np.lexsort((seconds[index_array] if is_future else -seconds[index_array], floor_ids[index_array]))
+        index_array = index_array[order]
+        closest_floor_ids, first_index = np.unique(floor_ids[index_array], return_index=True)
+        return closest_floor_ids, index_array[first_index]
+
+    @classmethod
+    def compute(cls, floor_ids, seconds, occupancy_rates, congestion_indexes, now_seconds, start_seconds, end_seconds):
+        # (층 id, 보간한 혼잡도, 가장 가까운 로그의 지역 혼잡도 index(없으면 -1)) 배열을 돌려줌
+        future_floor_ids, future_index = cls.get_closest(
+            floor_ids, seconds, (seconds >= now_seconds) & (seconds <= end_seconds), True
+        )
+        past_floor_ids, past_index = cls.get_closest(
+            floor_ids, seconds, (seconds >= start_seconds) & (seconds <= now_seconds), False
+        )
+        result_floor_ids = np.union1d(future_floor_ids, past_floor_ids)
+        count = len(result_floor_ids)
+
+        has_future = np.isin(result_floor_ids, future_floor_ids)
+        has_past = np.isin(result_floor_ids, past_floor_ids)
+        future = np.zeros(count, dtype=np.int64)
+        past = np.zeros(count, dtype=np.int64)
+        future[has_future] = future_index
+        past[has_past] = past_index
+
+        # 전, 후 로그 모두 있으면 시각 차이로 보간(증가/감소 방향에 따라 기준 로그가 다름)
+        x = np.floor(now_seconds - seconds[past])
+        x1 = np.floor(seconds[future] - seconds[past])
+        y0 = occupancy_rates[past]
+        y1 = occupancy_rates[future]
+        is_increased = y1 >= y0
+        # 한쪽 로그만 있는 층은 아래에서 덮어쓰므로 계산 범위만 맞춰둠
+        ratio = np.clip(np.divide(np.where(is_increased, x, x1 - x), x1, out=np.zeros(count), where=x1 > 0), 0.0, 1.0)
+        occupancy_rate = np.where(is_increased, y0, y1) + np.sqrt(np.square(y1 - y0) * ratio)
+        is_future_closer = x >= x1 / 2
+
+        # 한쪽 로그만 있으면 그 로그 그대로
+        occupancy_rate = np.where(~has_past, y1, np.where(~has_future, y0, occupancy_rate))
+        is_future_closer = np.where(~has_past, True, np.where(~has_future, False, is_future_closer))
+        congestion = np.where(is_future_closer, congestion_indexes[future], congestion_indexes[past])
+        return result_floor_ids, occupancy_rate, congestion
+
+    @staticmethod
+    def get_area_congestion_index_dict(cafe_id_list):
+        # 카페별 연결된 지역 중 가장 높은 현재 혼잡도 index(지역이 없으면 0)
+        area_congestion_index_dict = {}
+        for cafe_id, current_congestion in Cafe.objects.filter(
+            id__in=cafe_id_list, congestion_area__isnull=False
+        ).values_list("id", "congestion_area__current_congestion"):
+            area_congestion_index_dict[cafe_id] = max(
+                area_congestion_index_dict.get(cafe_id, 0), CONGESTION_INDEX_DICT[current_congestion]
+            )
+        return area_congestion_index_dict
+
+    @classmethod
+    def predict(cls, now, cafe_floor_id_list=None, noise=True):
+        # {층 id: 예상 혼잡도}
+        floor_ids, seconds, occupancy_rates, congestion_indexes = cls.load_logs(now, cafe_floor_id_list)
+        if not len(floor_ids):
+            return {}
+        cafe_id_dict = dict(CafeFloor.objects.filter(id__in=np.unique(floor_ids).tolist()).values_list("id", "cafe_id"))
+        start_time, end_time, _ = cls.get_window(now)
+        result_floor_ids, occupancy_rates, congestion_indexes = cls.compute(
+            floor_ids, seconds, occupancy_rates, congestion_indexes,
+            cls.get_seconds(now.time()), cls.get_seconds(start_time), cls.get_seconds(end_time)
+        )
+        # 현재 지역 혼잡도와 로그 지역 혼잡도 차이만큼 가감(로그 지역 혼잡도가 없으면 그대로)
+        area_congestion_index_dict = cls.get_area_congestion_index_dict(set(cafe_id_dict.values()))
+        area_congestion_indexes = np.array([
+            area_congestion_index_dict.get(cafe_id_dict[floor_id], 0) for floor_id in result_floor_ids.tolist()
+        ], dtype=np.int64)
+        occupancy_rates = occupancy_rates + np.where(
+            congestion_indexes >= 0, 0.05 * (area_congestion_indexes - congestion_indexes), 0.0
+        )
+        # 랜덤 5% 적용 및 0~1 범위 조정
+        if noise:
+            occupancy_rates = occupancy_rates + np.random.uniform(-0.05, 0.05, len(occupancy_rates))
+        occupancy_rates = np.clip(occupancy_rates, 0.0, 1.0)
+        return dict(zip(result_floor_ids.tolist(), np.round(occupancy_rates, 2).tolist()))
+
+    @classmethod
+    def get_predictor(cls):
+        if cls.predictor is None:
+            cls.predictor = import_string(OCCUPANCY_PREDICTOR)()
+        return cls.predictor
+
+    @classmethod
+    def run(cls, now=None):
+        # 설정된 predictor로 예측을 계산해 저장하고, 예측 대상이 아닌(닫힌 카페, 시간대 로그 없음) 자리 있는 층의 예측은 지움
+        now = now or datetime.datetime.now()
+        return cls.save(cls.get_predictor().predict(now), now)
+
+    @classmethod
+    def save(cls, prediction_dict, now, cafe_floor_id_list=None):
+        # 예측을 한번의 upsert로 저장하고 대상 층(없으면 자리 있는 층 전체) 중 결과가 없는 층의 예측은 지움
+        with transaction.atomic():
+            OccupancyRatePrediction.objects.bulk_create([
+                OccupancyRatePrediction(
+                    cafe_floor_id=cafe_floor_id, occupancy_rate=Decimal(f"{occupancy_rate:.2f}"), update=now
+                )
+                for cafe_floor_id, occupancy_rate in prediction_dict.items()
+            ], update_conflicts=True, unique_fields=["cafe_floor"], update_fields=["occupancy_rate", "update"])
+            predicted_id_list = list(prediction_dict)
+            # 삭제는 queryset delete의 signal로 층별 캐시가 갱신됨
+            if cafe_floor_id_list is None:
+                prediction_queryset = OccupancyRatePrediction.objects.filter(cafe_floor__has_seat=True)
+            else:
+                prediction_queryset = OccupancyRatePrediction.objects.filter(cafe_floor_id__in=cafe_floor_id_list)
+            prediction_queryset.exclude(cafe_floor_id__in=predicted_id_list).delete()
+            transaction.on_commit(lambda: cls.on_predictions_saved(predicted_id_list))
+        return len(prediction_dict)
+
+    @staticmethod
+    def on_predictions_saved(cafe_floor_id_list):
+        CafeTileCache.evict_cafe_floors(cafe_floor_id_list)
+        CafeSync.mark_cafe_floors_changed(cafe_floor_id_list)
+        try:
+            LiveOccupancyChannel.publish_cafe_floors(cafe_floor_id_list, "prediction")
+        except Exception as e:
+            logging.getLogger('my').error(e)
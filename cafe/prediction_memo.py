@@ -0,0 +1,72 @@
+import datetime
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from cafe.models import CafeFloor, OccupancyRatePrediction, OccupancyHourlyRollup
+from cafe.prediction import OccupancyPredictionEngine
+from cafejari.settings import OCCUPANCY_PREDICTION_ON_READ, OCCUPANCY_PREDICTION_INTERVAL, \
+    OCCUPANCY_PREDICTION_WARM_CAFE_COUNT, OCCUPANCY_PREDICTION_WARM_DAYS, UPDATE_POSSIBLE_TIME_FROM, \
+    UPDATE_POSSIBLE_TIME_TO
+
+
+# 예상 혼잡도를 cron이 전체 층에 대해 미리 계산하는 대신, 카페 정보를 응답할 때 필요한 카페만 계산(OCCUPANCY_PREDICTION_ON_READ)
+# 카페별로 10분 단위 시간대(slot)마다 한번만 계산하도록 공유 캐시에 slot 끝까지 기록하고, 결과는 기존처럼 예측 테이블에 저장
+# cron은 많이 조회되는 카페(warm set)만 미리 계산하고, 이번 slot에 갱신되지 않은 예측은 지워 다음 조회 때 다시 계산되게 함
+class OccupancyPredictionMemo:
+
+    @staticmethod
+    def get_slot_start(now):
+        return now.replace(minute=now.minute - now.minute % OCCUPANCY_PREDICTION_INTERVAL, second=0, microsecond=0)
+
+    @classmethod
+    def get_key(cls, slot_start, cafe_id):
+        return f"prediction_memo:{slot_start:%Y%m%d%H%M}:{cafe_id}"
+
+    @classmethod
+    def refresh_cafes(cls, cafe_id_list, now=None):
+        # 이번 slot에 아직 계산하지 않은 카페의 예측을 한번에 계산해 저장, 새로 계산했으면 True
+        if not OCCUPANCY_PREDICTION_ON_READ:
+            return False
+        now = now or datetime.datetime.now()
+        if not UPDATE_POSSIBLE_TIME_FROM <= now.hour < UPDATE_POSSIBLE_TIME_TO:
+            return False
+        slot_start = cls.get_slot_start(now)
+        key_dict = {cls.get_key(slot_start, cafe_id): cafe_id for cafe_id in set(cafe_id_list)}
+        if not key_dict:
+            return False
+        memo_dict = cache.get_many(list(key_dict))
+        missing_key_list = [key for key in key_dict if key not in memo_dict]
+        if not missing_key_list:
+            return False
+
+        # 영업중이 아닌 카페 층은 예측 없이 기존 예측만 지움
+        cafe_floor_list = list(CafeFloor.objects.filter(
+            cafe_id__in=[key_dict[key] for key in missing_key_list], has_seat=True
+        ).values_list("id", "cafe__is_opened"))
+        opened_cafe_floor_id_list = [cafe_floor_id for cafe_floor_id, is_opened in cafe_floor_list if is_opened]
+        prediction_dict = OccupancyPredictionEngine.get_predictor().predict(now, opened_cafe_floor_id_list) \
+            if opened_cafe_floor_id_list else {}
+        OccupancyPredictionEngine.save(prediction_dict, now, [cafe_floor_id for cafe_floor_id, _ in cafe_floor_list])
+
+        slot_end = slot_start + datetime.timedelta(minutes=OCCUPANCY_PREDICTION_INTERVAL)
+        cache.set_many({key: True for key in missing_key_list}, timeout=max(int((slot_end - now).total_seconds()), 1))
+        return True
+
+    @staticmethod
+    def get_warm_cafe_id_list(now):
+        # 최근 며칠간 혼잡도 로그가 많았던 카페
+        return [row["cafe_floor__cafe_id"] for row in OccupancyHourlyRollup.objects.filter(
+            date__gte=now.date() - datetime.timedelta(days=OCCUPANCY_PREDICTION_WARM_DAYS),
+            cafe_floor__has_seat=True,
+            cafe_floor__cafe__is_opened=True
+        ).values("cafe_floor__cafe_id").annotate(
+            log_count=Sum("log_count")
+        ).order_by("-log_count")[:OCCUPANCY_PREDICTION_WARM_CAFE_COUNT]]
+
+    @classmethod
+    def run(cls, now=None):
+        # cron용: warm set을 이번 slot으로 미리 계산하고 이전 slot의 예측은 지움(삭제 signal로 타일 캐시도 비워짐)
+        now = now or datetime.datetime.now()
+        cls.refresh_cafes(cls.get_warm_cafe_id_list(now), now)
+        OccupancyRatePrediction.objects.filter(update__lt=cls.get_slot_start(now)).delete()
@@ -0,0 +1,117 @@
+import datetime
+
+import numpy as np
+
+from cafe.models import OccupancyRateUpdateLog, CafeFloor
+from cafe.occupancy_profile import OccupancyProfiler
+from cafe.prediction import OccupancyPredictionEngine
+
+
+# 예상 혼잡도 계산 방식, predict는 now 이전 데이터만으로 {층 id: 예상 혼잡도(0~1)}를 돌려줌
+# cafe_floor_id_list가 없으면 자리가 있는 영업중 카페 층 전체가 대상(backtest는 평가할 층만 넘김)
+# 사용할 방식은 settings.OCCUPANCY_PREDICTOR, 비교는 backtest_occupancy_predictor
+class OccupancyPredictor:
+    name = ""
+
+    def predict(self, now, cafe_floor_id_list=None):
+        raise NotImplementedError
+
+    @staticmethod
+    def get_cafe_floor_id_list(cafe_floor_id_list=None):
+        if cafe_floor_id_list is not None:
+            return list(cafe_floor_id_list)
+        return list(CafeFloor.objects.filter(has_seat=True, cafe__is_opened=True).values_list("id", flat=True))
+
+
+# 기존 방식: 평일/주말 전후 80분 중 가장 가까운 과거/미래 로그 보간 + 지역 혼잡도 가감 + 랜덤 5%
+class BaselinePredictor(OccupancyPredictor):
+    name = "baseline"
+
+    def __init__(self, noise=True):
+        self.noise = noise
+
+    def predict(self, now, cafe_floor_id_list=None):
+        return OccupancyPredictionEngine.predict(now, cafe_floor_id_list=cafe_floor_id_list, noise=self.noise)
+
+
+# 같은 평일/주말, 전후 80분 시간대 로그를 오래될수록 작은 가중치(반감기 half_life일)로 평균
+class EwmaPredictor(OccupancyPredictor):
+    name = "ewma"
+
+    def __init__(self, half_life=14, lookback=56):
+        self.half_life = half_life
+        self.lookback = lookback
+
+    def predict(self, now, cafe_floor_id_list=None):
+        # 분 단위로 거른 로그 중 시간대 경계 밖(초 단위)은 제외
+        start_time, end_time, _ = OccupancyPredictionEngine.get_window(now)
+        now_time = now.time()
+        row_list = [row for row in OccupancyRateUpdateLog.objects.filter(
+            OccupancyPredictionEngine.get_window_filter(now),
+            OccupancyPredictionEngine.get_target_filter(cafe_floor_id_list),
+            update__gte=now - datetime.timedelta(days=self.lookback),
+            update__lt=now
+        ).order_by().values_list("cafe_floor_id", "update", "occupancy_rate")
+            if start_time <= row[1].time() <= now_time or now_time <= row[1].time() <= end_time]
+        if not row_list:
+            return {}
+        floor_ids = np.array([row[0] for row in row_list], dtype=np.int64)
+        ages = np.array([(now - row[1]).total_seconds() / 86400 for row in row_list], dtype=np.float64)
+        occupancy_rates = np.array([row[2] for row in row_list], dtype=np.float64)
+
+        result_floor_ids, index = np.unique(floor_ids, return_inverse=True)
+        weights = np.power(0.5, ages / self.half_life)
+        mean = np.bincount(index, weights=weights * occupancy_rates) / np.bincount(index, weights=weights)
+        return dict(zip(result_floor_ids.tolist(), np.round(np.clip(mean, 0.0, 1.0), 2).tolist()))
+
+
+# 층별 평일/주말 x 10분 시간대 분포(OccupancyProfile)의 현재 시간대 평균, 층마다 배열 하나만 읽음
+# is_replay면 저장된 분포 대신 predict가 호출될 때마다 이전 호출 이후의 로그만 메모리의 분포에 더함(backtest용)
+class ProfilePredictor(OccupancyPredictor):
+    name = "profile"
+
+    def __init__(self, is_replay=False):
+        self.is_replay = is_replay
+        self.profile_dict = {}
+        self.last_update = None
+
+    def replay(self, now):
+        log_queryset = OccupancyRateUpdateLog.objects.filter(update__lt=now, cafe_floor__isnull=False)
+        if self.last_update is not None:
+            log_queryset = log_queryset.filter(update__gte=self.last_update)
+        row_list = list(log_queryset.order_by().values_list("cafe_floor_id", "update", "occupancy_rate"))
+        self.last_update = now
+        if not row_list:
+            return
+        floor_ids = np.array([row[0] for row in row_list], dtype=np.int64)
+        day_classes = np.array([OccupancyProfiler.get_day_class(row[1].date()) for row in row_list], dtype=np.int64)
+        buckets = np.array([OccupancyProfiler.get_bucket(row[1].time()) for row in row_list], dtype=np.int64)
+        occupancy_rates = np.array([row[2] for row in row_list], dtype=np.float64)
+        # 층별로 묶어서 병합
+        order = np.argsort(floor_ids, kind="stable")
+        unique_floor_ids, start_index = np.unique(floor_ids[order], return_index=True)
+        for cafe_floor_id, index in zip(unique_floor_ids.tolist(), np.split(order, start_index[1:])):
+            if cafe_floor_id not in self.profile_dict:
+                self.profile_dict[cafe_floor_id] = OccupancyProfiler.empty()
+            OccupancyProfiler.merge(
+                self.profile_dict[cafe_floor_id], day_classes[index], buckets[index], occupancy_rates[index]
+            )
+
+    def predict(self, now, cafe_floor_id_list=None):
+        if self.is_replay:
+            self.replay(now)
+            cafe_floor_id_list = self.profile_dict if cafe_floor_id_list is None else cafe_floor_id_list
+            profile_dict = {
+                cafe_floor_id: self.profile_dict[cafe_floor_id]
+                for cafe_floor_id in cafe_floor_id_list if cafe_floor_id in self.profile_dict
+            }
+        else:
+            profile_dict = OccupancyProfiler.get_profile_dict(self.get_cafe_floor_id_list(cafe_floor_id_list))
+        day_class = OccupancyProfiler.get_day_class(now.date())
+        bucket = OccupancyProfiler.get_bucket(now.time())
+        prediction_dict = {}
+        for cafe_floor_id, profile in profile_dict.items():
+            typical = OccupancyProfiler.get_typical(profile, day_class, bucket)
+            if typical is not None:
+                prediction_dict[cafe_floor_id] = round(min(max(typical[0], 0.0), 1.0), 2)
+        return prediction_dict
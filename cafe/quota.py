@@ -0,0 +1,173 @@
+import datetime
+import threading
+
+import redis
+from django.utils.module_loading import import_string
+
+from cafejari.settings import SHARING_QUOTA_STORE, REDIS_URL, UPDATE_COOLTIME
+
+# 혼잡도 등록 가능 여부(쿨타임 중, 포인트 없이 등록, 포인트 받으며 등록)
+COOLDOWN, NO_REWARD, REWARD = -1, 0, 1
+
+# KEYS: 쿨타임, 오늘 이 층 등록 수, 오늘 이 층 stack 여부, 오늘 stack 수
+# ARGV: 쿨타임(초), 하루 key 유지 시간(초), 층별 하루 등록 제한, 하루 stack 제한
+ACQUIRE_SCRIPT = """
+if not redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) then
+    return -1
+end
+local floor_count = redis.call('INCR', KEYS[2])
+if floor_count == 1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+else
+    if floor_count > tonumber(ARGV[3]) or redis.call('EXISTS', KEYS[3]) == 0 then
+        return 0
+    end
+    return 1
+end
+if tonumber(redis.call('GET', KEYS[4]) or '0') >= tonumber(ARGV[4]) then
+    return 0
+end
+redis.call('INCR', KEYS[4])
+redis.call('EXPIRE', KEYS[4], ARGV[2])
+redis.call('SET', KEYS[3], 1, 'EX', ARGV[2])
+return 1
+"""
+
+# acquire를 되돌림(등록 저장 실패 시), 오늘 이 층의 첫 등록이었으면 그때 쌓은 stack도 되돌림
+RELEASE_SCRIPT = """
+redis.call('DEL', KEYS[1])
+if redis.call('DECR', KEYS[2]) <= 0 then
+    redis.call('DEL', KEYS[2])
+    if redis.call('DEL', KEYS[3]) == 1 then
+        redis.call('DECR', KEYS[4])
+    end
+end
+"""
+
+
+# 저장소 key, 하루 단위 key는 날짜를 포함하고 다음 자정이 지나면 사라짐
+class QuotaStore:
+
+    @staticmethod
+    def get_keys(user_id, cafe_floor_id, now):
+        date = now.date().isoformat()
+        return [
+            f"quota:cooldown:{user_id}:{cafe_floor_id}",
+            f"quota:floor_count:{date}:{user_id}:{cafe_floor_id}",
+            f"quota:floor_stacked:{date}:{user_id}:{cafe_floor_id}",
+            f"quota:stack_count:{date}:{user_id}",
+        ]
+
+    @staticmethod
+    def get_day_ttl(now):
+        # 다음 자정까지 + 여유 1분
+        tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        return int((tomorrow - now).total_seconds()) + 60
+
+
+# 여러 워커, 서버가 함께 쓰는 Redis 저장소, 확인과 증가를 Lua script 하나로 원자적으로 처리
+# 등록 transaction과 따로 기록되므로 저장에 실패하면 release로 되돌려야 함
+class RedisQuotaStore(QuotaStore):
+
+    def __init__(self):
+        self.redis = redis.Redis.from_url(REDIS_URL)
+        self.acquire_script = self.redis.register_script(ACQUIRE_SCRIPT)
+        self.release_script = self.redis.register_script(RELEASE_SCRIPT)
+
+    def acquire(self, user_id, cafe_floor_id, grade, now):
+        return int(self.acquire_script(keys=self.get_keys(user_id, cafe_floor_id, now), args=[
+            UPDATE_COOLTIME * 60,
+            self.get_day_ttl(now),
+            grade.sharing_restriction_per_cafe,
+            grade.activity_stack_restriction_per_day
+        ]))
+
+    def release(self, user_id, cafe_floor_id, now):
+        self.release_script(keys=self.get_keys(user_id, cafe_floor_id, now))
+
+    def clear(self, user_id, cafe_floor_id_list, now):
+        keys = [key for cafe_floor_id in cafe_floor_id_list for key in self.get_keys(user_id, cafe_floor_id, now)]
+        if keys:
+            self.redis.delete(*dict.fromkeys(keys))
+
+
+# 로컬 개발, 테스트용 저장소, ACQUIRE_SCRIPT, RELEASE_SCRIPT와 같은 규칙을 lock 안에서 처리(프로세스 안에서만 공유)
+class MemoryQuotaStore(QuotaStore):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}  # key: (값, 만료 시각)
+
+    def get(self, key, now):
+        value = self.data.get(key)
+        if value is None or value[1] <= now:
+            self.data.pop(key, None)
+            return None
+        return value[0]
+
+    def acquire(self, user_id, cafe_floor_id, grade, now):
+        cooldown_key, floor_count_key, floor_stacked_key, stack_count_key = self.get_keys(user_id, cafe_floor_id, now)
+        day_expire = now + datetime.timedelta(seconds=self.get_day_ttl(now))
+        with self.lock:
+            if self.get(cooldown_key, now) is not None:
+                return COOLDOWN
+            self.data[cooldown_key] = (1, now + datetime.timedelta(minutes=UPDATE_COOLTIME))
+            floor_count = self.get(floor_count_key, now)
+            if floor_count is not None:
+                self.data[floor_count_key] = (floor_count + 1, self.data[floor_count_key][1])
+                if floor_count + 1 > grade.sharing_restriction_per_cafe or self.get(floor_stacked_key, now) is None:
+                    return NO_REWARD
+                return REWARD
+            self.data[floor_count_key] = (1, day_expire)
+            stack_count = self.get(stack_count_key, now) or 0
+            if stack_count >= grade.activity_stack_restriction_per_day:
+                return NO_REWARD
+            self.data[stack_count_key] = (stack_count + 1, day_expire)
+            self.data[floor_stacked_key] = (1, day_expire)
+            return REWARD
+
+    def release(self, user_id, cafe_floor_id, now):
+        cooldown_key, floor_count_key, floor_stacked_key, stack_count_key = self.get_keys(user_id, cafe_floor_id, now)
+        with self.lock:
+            self.data.pop(cooldown_key, None)
+            floor_count = self.get(floor_count_key, now)
+            if floor_count is not None and floor_count > 1:
+                self.data[floor_count_key] = (floor_count - 1, self.data[floor_count_key][1])
+                return
+            self.data.pop(floor_count_key, None)
+            stack_count = self.get(stack_count_key, now)
+            if self.data.pop(floor_stacked_key, None) is not None and stack_count:
+                self.data[stack_count_key] = (stack_count - 1, self.data[stack_count_key][1])
+
+    def clear(self, user_id, cafe_floor_id_list, now):
+        with self.lock:
+            for cafe_floor_id in cafe_floor_id_list:
+                for key in self.get_keys(user_id, cafe_floor_id, now):
+                    self.data.pop(key, None)
+
+
+# 혼잡도 등록 쿨타임, 층별 하루 등록 제한, 하루 stack(포인트 받는 카페 수) 제한을 공유 저장소의 key로 관리
+# 로그, stack 테이블을 조회하지 않고 한번의 원자적 호출로 판단하며, 하루 단위 key는 날짜가 바뀌면 TTL로 사라짐
+class SharingQuota:
+    store = None
+
+    @classmethod
+    def get_store(cls):
+        if cls.store is None:
+            cls.store = import_string(SHARING_QUOTA_STORE)()
+        return cls.store
+
+    @classmethod
+    def acquire(cls, user_id, cafe_floor_id, grade, now=None):
+        # 이번 등록을 기록하고 COOLDOWN, NO_REWARD, REWARD 중 하나를 돌려줌
+        return cls.get_store().acquire(user_id, cafe_floor_id, grade, now or datetime.datetime.now())
+
+    @classmethod
+    def release(cls, user_id, cafe_floor_id, now):
+        # acquire 이후 등록 저장에 실패한 경우 이번 등록으로 쓴 쿨타임, 하루 제한을 되돌림(acquire와 같은 now)
+        cls.get_store().release(user_id, cafe_floor_id, now)
+
+    @classmethod
+    def clear(cls, user_id, cafe_floor_id_list, now=None):
+        # 특정 유저의 오늘 기록을 지움(벤치마크, 운영 중 수동 초기화용)
+        cls.get_store().clear(user_id, list(cafe_floor_id_list), now or datetime.datetime.now())
@@ -0,0 +1,63 @@
+import math
+
+from django.core.cache import cache
+
+from cafe.spatial_index import CafeSpatialIndex
+from cafejari.settings import RECOMMENDATION_CELL_SIZE, RECOMMENDATION_CACHE_TIMEOUT
+
+
+# 가까운 영업중 카페 추천을 작은 격자(cell) 단위로 미리 계산해 공유 캐시에 저장
+# 격자 중심에서 k번째로 가까운 카페까지의 거리 R, 격자 대각선 길이 D에 대해 중심에서 R + D 안의 카페를 후보로 두면
+# 격자 안 어느 위치 p에서든 k번째 이웃까지 거리는 R + D/2 이하이므로 실제 가까운 k개는 후보 안에 있음
+# 요청 위치 기준으로 후보만 다시 정렬하면 정확한 결과
+# 후보는 워커별 공간 인덱스에서 고르므로 캐시 key에 그 인덱스가 반영한 공유 버전을 넣음
+# 영업 여부/공개/폐업/좌표가 바뀌면 버전이 올라 모든 격자의 캐시가 한번에 무효화되고,
+# 아직 이전 버전 인덱스를 가진 워커가 고른 후보는 이전 버전 key에만 저장되어 최신 워커가 읽지 않음
+class CafeRecommendation:
+
+    @staticmethod
+    def get_cell(latitude, longitude):
+        return math.floor(latitude / RECOMMENDATION_CELL_SIZE), math.floor(longitude / RECOMMENDATION_CELL_SIZE)
+
+    @staticmethod
+    def build_candidate_list(cell, k):
+        center_latitude = (cell[0] + 0.5) * RECOMMENDATION_CELL_SIZE
+        center_longitude = (cell[1] + 0.5) * RECOMMENDATION_CELL_SIZE
+        longitude_scale = math.cos(math.radians(center_latitude))
+        nearest_id_list = CafeSpatialIndex.get_nearest_ids(center_latitude, center_longitude, k, require_opened=True)
+        location_dict = CafeSpatialIndex.get_location_dict(nearest_id_list[-1:])
+        if len(nearest_id_list) < k or not location_dict:
+            # 전체 영업중 카페가 k개 이하면 모두 후보
+            return [
+                (cafe_id, *location) for cafe_id, location in CafeSpatialIndex.get_location_dict(nearest_id_list).items()
+            ]
+        farthest_latitude, farthest_longitude = location_dict[nearest_id_list[-1]]
+        diagonal = math.hypot(RECOMMENDATION_CELL_SIZE, RECOMMENDATION_CELL_SIZE * longitude_scale)
+        radius = math.hypot(
+            farthest_latitude - center_latitude, (farthest_longitude - center_longitude) * longitude_scale
+        ) + diagonal
+        return CafeSpatialIndex.get_ids_within_distance(center_latitude, center_longitude, radius, require_opened=True)
+
+    @classmethod
+    def get_candidate_list(cls, cell, k):
+        CafeSpatialIndex.ensure_fresh()
+        index_version = CafeSpatialIndex.built_version
+        # 이 워커에서 방금 바뀐 변경으로 인덱스를 다시 만들어야 하는 경우는 캐시하지 않음
+        if index_version is None:
+            return cls.build_candidate_list(cell, k)
+        key = f"recommendation:{RECOMMENDATION_CELL_SIZE}:{k}:{index_version}:{cell[0]}:{cell[1]}"
+        candidate_list = cache.get(key)
+        if candidate_list is None:
+            candidate_list = cls.build_candidate_list(cell, k)
+            cache.set(key, candidate_list, timeout=RECOMMENDATION_CACHE_TIMEOUT)
+        return candidate_list
+
+    @classmethod
+    def get_nearest_ids(cls, latitude, longitude, k):
+        cell = cls.get_cell(latitude, longitude)
+        # 후보를 고른 것과 같은 거리 기준(격자 중심 위도의 경도 보정)으로 다시 정렬
+        longitude_scale = math.cos(math.radians((cell[0] + 0.5) * RECOMMENDATION_CELL_SIZE))
+        candidate_list = sorted(cls.get_candidate_list(cell, k), key=lambda candidate: math.hypot(
+            candidate[1] - latitude, (candidate[2] - longitude) * longitude_scale
+        ))
+        return [candidate[0] for candidate in candidate_list[:k]]
@@ -0,0 +1,123 @@
+import msgpack
+from rest_framework.renderers import JSONRenderer, BaseRenderer
+
+
+# 지도/검색 응답의 압축(columnar) 표현
+# - 반복되는 user, grade, profile_image, brand는 공유 사전(dictionaries)에 한번만 담고 index로 참조
+# - cafe, floor, log, vip는 각각 {컬럼명: 값 배열} 형태의 표로 펼침(floor.cafe, log.floor, vip.cafe는 상위 표의 index)
+# - point는 latitude, longitude와 중복이라 제외, 혼잡도(문자열 decimal)는 float로 보냄
+# - 검색, cluster 같은 평평한 리스트(빈 리스트 포함)는 {"rows": {컬럼명: 값 배열}}
+# ?format=compact 또는 Accept: application/vnd.cafejari.compact+json(msgpack은 +msgpack)으로 요청
+class CompactEncoder:
+    DICTIONARY_NAMES = ("users", "grades", "profile_images", "brands")
+
+    def __init__(self):
+        self.dictionaries = {name: [] for name in self.DICTIONARY_NAMES}
+        self.dictionary_indexes = {name: {} for name in self.DICTIONARY_NAMES}
+
+    @staticmethod
+    def to_columns(row_list):
+        columns = {}
+        for row in row_list:
+            for key in row:
+                columns.setdefault(key, None)
+        return {key: [row.get(key) for row in row_list] for key in columns}
+
+    @staticmethod
+    def to_float(value):
+        return float(value) if value is not None else None
+
+    def reference(self, name, obj, encode=None):
+        if obj is None:
+            return None
+        index_dict = self.dictionary_indexes[name]
+        if obj["id"] not in index_dict:
+            index_dict[obj["id"]] = len(self.dictionaries[name])
+            self.dictionaries[name].append(encode(obj) if encode else obj)
+        return index_dict[obj["id"]]
+
+    def reference_user(self, user):
+        def encode_user(user_obj):
+            profile = user_obj.get("profile") or {}
+            return {
+                "id": user_obj["id"],
+                "date_joined": user_obj.get("date_joined"),
+                "nickname": profile.get("nickname"),
+                "grade": self.reference("grades", profile.get("grade")),
+                "profile_image": self.reference("profile_images", profile.get("profile_image")),
+            }
+        return self.reference("users", user, encode_user)
+
+    def encode_cafe_list(self, cafe_list):
+        cafe_rows, floor_rows, log_rows, vip_rows = [], [], [], []
+        for cafe_index, cafe in enumerate(cafe_list):
+            cafe_row = {key: value for key, value in cafe.items() if key not in ("point", "cafe_floor", "cafe_vip")}
+            if "brand" in cafe_row:
+                cafe_row["brand"] = self.reference("brands", cafe["brand"])
+            cafe_rows.append(cafe_row)
+            for floor in cafe.get("cafe_floor", []):
+                floor_row = {key: value for key, value in floor.items() if key not in (
+                    "recent_updated_log", "occupancy_rate_prediction", "cafe")}
+                prediction = floor.get("occupancy_rate_prediction")
+                floor_row["cafe"] = cafe_index
+                floor_row["occupancy_rate_prediction"] = self.to_float(prediction["occupancy_rate"]) if prediction else None
+                floor_row["wall_socket_rate"] = self.to_float(floor.get("wall_socket_rate"))
+                for log in floor.get("recent_updated_log", []):
+                    log_row = {key: value for key, value in log.items() if key != "cafe_floor"}
+                    log_row["floor"] = len(floor_rows)
+                    log_row["occupancy_rate"] = self.to_float(log.get("occupancy_rate"))
+                    log_row["user"] = self.reference_user(log.get("user"))
+                    log_rows.append(log_row)
+                floor_rows.append(floor_row)
+            for vip in cafe.get("cafe_vip", []):
+                vip_row = {key: value for key, value in vip.items()}
+                vip_row["cafe"] = cafe_index
+                vip_row["user"] = self.reference_user(vip.get("user"))
+                vip_rows.append(vip_row)
+        return {
+            "cafes": self.to_columns(cafe_rows),
+            "floors": self.to_columns(floor_rows),
+            "logs": self.to_columns(log_rows),
+            "vips": self.to_columns(vip_rows),
+        }
+
+    @staticmethod
+    def is_cafe_list(data):
+        return isinstance(data, list) and bool(data) and isinstance(data[0], dict) and "cafe_floor" in data[0]
+
+    def encode(self, data):
+        # 지도 응답(카페 리스트), delta 응답({cursor, cafes, removed}), 그 외 평평한 리스트(검색, cluster)를 처리
+        if isinstance(data, dict) and "cafes" in data:
+            encoded = {key: value for key, value in data.items() if key != "cafes"}
+            encoded.update(self.encode_cafe_list(data["cafes"]))
+        elif self.is_cafe_list(data):
+            encoded = self.encode_cafe_list(data)
+        elif isinstance(data, list) and all(isinstance(row, dict) for row in data):
+            return {"rows": self.to_columns(data)}
+        else:
+            # 에러 응답 등은 그대로
+            return data
+        encoded.update(self.dictionaries)
+        return encoded
+
+
+class CompactJSONRenderer(JSONRenderer):
+    media_type = "application/vnd.cafejari.compact+json"
+    format = "compact"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super(CompactJSONRenderer, self).render(
+            CompactEncoder().encode(data), accepted_media_type, renderer_context
+        )
+
+
+class CompactMessagePackRenderer(BaseRenderer):
+    media_type = "application/vnd.cafejari.compact+msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(CompactEncoder().encode(data), use_bin_type=True)
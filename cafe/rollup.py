@@ -0,0 +1,122 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+
+from cafe.models import OccupancyRateUpdateLog, OccupancyHourlyRollup, RollupWatermark
+from cafejari.settings import OCCUPANCY_ROLLUP_BATCH_SIZE, OCCUPANCY_ROLLUP_LAG
+
+WEEKDAY_RANGE, WEEKEND_RANGE = [2, 3, 4, 5, 6], [1, 7]
+
+
+def get_log_batch(watermark, batch_size, *fields):
+    # watermark 이후 로그를 id 순으로 (id, update, *fields) 목록으로 가져옴
+    # 늦게 commit되는 로그를 건너뛰지 않도록 작성된 지 OCCUPANCY_ROLLUP_LAG초가 안 된 로그에서 멈춤
+    limit_datetime = datetime.datetime.now() - datetime.timedelta(seconds=OCCUPANCY_ROLLUP_LAG)
+    row_list = []
+    for row in OccupancyRateUpdateLog.objects.filter(id__gt=watermark.last_id).order_by("id").values_list(
+        "id", "update", *fields
+    )[:batch_size]:
+        if row[1] >= limit_datetime:
+            break
+        row_list.append(row)
+    return row_list
+
+
+# 혼잡도 로그를 층별 (날짜, 시) 단위로 집계, 분석(시간대별 혼잡도, 차트 등)은 원본 로그 대신 집계 테이블을 읽음
+# 마지막으로 반영한 로그 id(high-water mark) 이후의 로그만 읽어 기존 집계에 더함
+class OccupancyRollup:
+    NAME = "occupancy_hourly"
+    UPDATE_FIELDS = [
+        "log_count", "occupancy_rate_sum", "occupancy_rate_min", "occupancy_rate_max", "user_count", "user_id_list",
+        "congestion_count", "congestion"
+    ]
+
+    @staticmethod
+    def merge(rollup, log_list):
+        # log_list: (occupancy_rate, congestion, user_id) 목록
+        user_id_set = set(rollup.user_id_list)
+        for occupancy_rate, congestion, user_id in log_list:
+            rollup.log_count += 1
+            rollup.occupancy_rate_sum += occupancy_rate
+            rollup.occupancy_rate_min = occupancy_rate if rollup.occupancy_rate_min is None \
+                else min(rollup.occupancy_rate_min, occupancy_rate)
+            rollup.occupancy_rate_max = occupancy_rate if rollup.occupancy_rate_max is None \
+                else max(rollup.occupancy_rate_max, occupancy_rate)
+            if user_id is not None:
+                user_id_set.add(user_id)
+            if congestion is not None:
+                rollup.congestion_count[congestion] = rollup.congestion_count.get(congestion, 0) + 1
+        rollup.user_id_list = sorted(user_id_set)
+        rollup.user_count = len(user_id_set)
+        rollup.congestion = max(rollup.congestion_count, key=rollup.congestion_count.get) \
+            if rollup.congestion_count else None
+
+    @classmethod
+    def update(cls, batch_size=OCCUPANCY_ROLLUP_BATCH_SIZE):
+        # 로그 한 묶음을 반영하고 반영한 로그 수를 돌려줌
+        with transaction.atomic():
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=cls.NAME)
+            row_list = get_log_batch(watermark, batch_size, "occupancy_rate", "congestion", "cafe_floor_id", "user_id")
+            if not row_list:
+                return 0
+
+            log_list_dict = defaultdict(list)
+            for _, update, occupancy_rate, congestion, cafe_floor_id, user_id in row_list:
+                if cafe_floor_id is not None:
+                    log_list_dict[(cafe_floor_id, update.date(), update.hour)].append((occupancy_rate, congestion, user_id))
+            rollup_dict = {
+                (rollup.cafe_floor_id, rollup.date, rollup.hour): rollup
+                for rollup in OccupancyHourlyRollup.objects.filter(
+                    cafe_floor_id__in={key[0] for key in log_list_dict},
+                    date__in={key[1] for key in log_list_dict}
+                )
+            }
+            created_list, updated_list = [], []
+            for key, log_list in log_list_dict.items():
+                rollup = rollup_dict.get(key)
+                if rollup is None:
+                    rollup = OccupancyHourlyRollup(cafe_floor_id=key[0], date=key[1], hour=key[2])
+                    created_list.append(rollup)
+                else:
+                    updated_list.append(rollup)
+                cls.merge(rollup, log_list)
+            OccupancyHourlyRollup.objects.bulk_create(created_list)
+            OccupancyHourlyRollup.objects.bulk_update(updated_list, cls.UPDATE_FIELDS)
+
+            watermark.last_id = row_list[-1][0]
+            watermark.save()
+        return len(row_list)
+
+    @classmethod
+    def update_all(cls):
+        total_count = 0
+        while True:
+            count = cls.update()
+            total_count += count
+            if count < OCCUPANCY_ROLLUP_BATCH_SIZE:
+                return total_count
+
+    @classmethod
+    def rebuild(cls):
+        # 집계를 비우고 처음 로그부터 다시 만듦
+        with transaction.atomic():
+            OccupancyHourlyRollup.objects.all().delete()
+            RollupWatermark.objects.filter(name=cls.NAME).delete()
+        return cls.update_all()
+
+    @staticmethod
+    def get_hourly_average_dict(cafe_floor_id_list, date_from, is_weekend):
+        # 평일/주말 구분한 {(cafe_floor_id, hour): 평균 혼잡도}
+        row_queryset = OccupancyHourlyRollup.objects.filter(
+            cafe_floor_id__in=cafe_floor_id_list,
+            date__gte=date_from,
+            date__week_day__in=WEEKEND_RANGE if is_weekend else WEEKDAY_RANGE
+        ).values("cafe_floor_id", "hour").annotate(
+            log_count=Sum("log_count"), occupancy_rate_sum=Sum("occupancy_rate_sum")
+        ).order_by()
+        return {
+            (row["cafe_floor_id"], row["hour"]): float(row["occupancy_rate_sum"]) / row["log_count"]
+            for row in row_queryset if row["log_count"]
+        }
@@ -1,10 +1,12 @@
 import datetime
 
-from django.db.models import Avg
+from django.db import models
+from django.db.models import Prefetch
 from rest_framework import serializers
 from cafe.models import District, Brand, CongestionArea, Cafe, OccupancyRatePrediction, CafeVIP, CafeImage, \
-    OpeningHour, OccupancyRateUpdateLog, CafeFloor, DailyActivityStack, Location, CATI
-from cafe.utils import PointCalculator
+    OpeningHour, OccupancyRateUpdateLog, CafeFloor, DailyActivityStack, Location, CATI, CafeFloorLiveState, \
+    CATISummary
+from cafe.utils import PointCalculator, CATICalculator
 from cafejari.settings import RECENT_HOUR
 from user.models import Grade, ProfileImage, Profile, User
 from utils import ImageModelSerializer
@@ -91,7 +93,8 @@ class OccupancyRateUpdateLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OccupancyRateUpdateLog
-        fields = "__all__"
+        # 평일/주말, 분은 예측 조회용 내부 컬럼이라 응답, 실시간 상태의 최근 로그에 넣지 않음
+        exclude = ["day_class", "minute_of_day"]
 
 
 class DailyActivityStackSerializer(serializers.ModelSerializer):
@@ -191,21 +194,54 @@ class CafeFloorCafeRepresentationSerializer(CafeFloorSerializer):
     occupancy_rate_prediction = OccupancyRatePredictionSerializer(read_only=True)
 
     @staticmethod
-    def get_recent_updated_log(obj):
+    def get_log_user_id(log):
+        # 이전 형태(유저 정보 전체)로 저장된 로그도 id만 사용
+        user = log["user"]
+        return user["id"] if isinstance(user, dict) else user
+
+    @classmethod
+    def attach_recent_updated_log(cls, cafe_floor_list):
+        # 층별 실시간 상태의 최근 로그(유저는 id만 저장)에 응답 시점의 유저 정보를 붙여 recent_updated_log_list로 둠
+        # 닉네임, 등급, 프로필 사진이 바뀌어도 바로 반영되도록 저장하지 않고, 여러 층의 유저를 한번에 불러옴
+        recent_datetime = datetime.datetime.now() - datetime.timedelta(hours=RECENT_HOUR)
+        recent_log_list_pair = []
+        for cafe_floor in cafe_floor_list:
+            try:
+                recent_log = cafe_floor.live_state.recent_log
+            except CafeFloorLiveState.DoesNotExist:
+                recent_log = []
+            recent_log_list_pair.append((cafe_floor, [
+                log for log in recent_log if datetime.datetime.fromisoformat(log["update"]) >= recent_datetime
+            ]))
+        user_id_set = {
+            cls.get_log_user_id(log) for _, recent_log_list in recent_log_list_pair for log in recent_log_list
+        } - {None}
+        user_dict = {user["id"]: user for user in PartialUserForRepSerializer(
+            User.objects.filter(id__in=user_id_set).select_related("profile__grade", "profile__profile_image"),
+            many=True, read_only=True
+        ).data} if user_id_set else {}
+        for cafe_floor, recent_log_list in recent_log_list_pair:
+            cafe_floor.recent_updated_log_list = [
+                {**log, "user": user_dict.get(cls.get_log_user_id(log))} for log in recent_log_list
+            ]
+
+    @classmethod
+    def get_recent_updated_log(cls, obj):
         # 카페 영업시간이 끝났으면 혼잡도 표시를 하지 않음
-        if obj.cafe.is_opened:
-            timedelta = datetime.timedelta(hours=RECENT_HOUR)
-        else:
-            timedelta = datetime.timedelta(milliseconds=1)
-        filtered_logs = obj.occupancy_rate_update_log.filter(
-            update__gte=(datetime.datetime.now() - timedelta)
-        ).order_by("-update")
-        serializer = OccupancyRateUpdateLogCafeFloorRepresentationSerializer(filtered_logs, many=True, read_only=True)
-        return serializer.data
+        if not obj.cafe.is_opened:
+            return []
+        # 로그 테이블 대신 층별 실시간 상태에 저장된 최근 로그를 사용, 여러 카페 응답은 미리 한번에 붙여둠
+        if not hasattr(obj, "recent_updated_log_list"):
+            cls.attach_recent_updated_log([obj])
+        return obj.recent_updated_log_list
 
     @staticmethod
     def get_point_prediction(obj):
-        return PointCalculator.calculate_reward_based_on_data(obj.id)
+        # 층별 실시간 상태의 유저 로그 수로 계산
+        try:
+            return PointCalculator.calculate_reward_based_on_count(obj.live_state.user_log_count)
+        except CafeFloorLiveState.DoesNotExist:
+            return PointCalculator.calculate_reward_based_on_count(0)
 
 
 # 혼잡도 업데이트 로그 속 cafe_floor 참조 serializer
@@ -226,6 +262,20 @@ class OccupancyRateUpdateLogResponseSerializer(OccupancyRateUpdateLogSerializer)
         return super(OccupancyRateUpdateLogResponseSerializer, self).to_representation(instance)
 
 
+# 여러 카페 응답, 층별 최근 로그의 유저 정보를 카페마다 조회하지 않고 한번에 불러옴
+class CafeResponseListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        # 관계 manager(즐겨찾기 카페 등)로 받으면 지도 응답과 같이 필요한 정보를 한번에 불러옴
+        if isinstance(data, models.manager.BaseManager):
+            data = self.child.optimize_queryset(data.all())
+        cafe_list = list(data)
+        CafeFloorCafeRepresentationSerializer.attach_recent_updated_log(
+            [cafe_floor for cafe in cafe_list for cafe_floor in cafe.cafe_floor.all()]
+        )
+        return super(CafeResponseListSerializer, self).to_representation(cafe_list)
+
+
 # 맵 검색에서 표시할 카페 정보
 class CafeResponseSerializer(CafeSerializer):
     cafe_floor = CafeFloorCafeRepresentationSerializer(many=True, read_only=True)
@@ -235,31 +285,39 @@ class CafeResponseSerializer(CafeSerializer):
     opening_hour = OpeningHourSerializer(read_only=True)
     brand = BrandResponseSerializer(read_only=True)
 
+    class Meta(CafeSerializer.Meta):
+        list_serializer_class = CafeResponseListSerializer
+
     def to_representation(self, instance):
         self.fields['brand'] = BrandResponseSerializer(read_only=True)
         return super(CafeResponseSerializer, self).to_representation(instance)
 
+    @staticmethod
+    def optimize_queryset(queryset):
+        # 카페 수와 상관없이 고정된 쿼리 수로 응답하도록 필요한 정보를 한번에 불러옴
+        cafe_floor_queryset = CafeFloor.objects.select_related("occupancy_rate_prediction", "live_state")
+        cafe_vip_queryset = CafeVIP.objects.select_related("user__profile__grade", "user__profile__profile_image")
+        return queryset.select_related("opening_hour", "brand", "cati_summary").prefetch_related(
+            Prefetch("cafe_floor", queryset=cafe_floor_queryset),
+            Prefetch("cafe_vip", queryset=cafe_vip_queryset),
+            Prefetch("cafe_image", queryset=CafeImage.objects.filter(is_visible=True), to_attr="visible_cafe_image_list"),
+        )
+
     @staticmethod
     def get_cafe_image(obj):
-        filtered_images = obj.cafe_image.filter(is_visible=True)
+        if hasattr(obj, "visible_cafe_image_list"):
+            filtered_images = obj.visible_cafe_image_list
+        else:
+            filtered_images = obj.cafe_image.filter(is_visible=True)
         serializer = CafeImageResponseSerializer(filtered_images, many=True, read_only=True)
         return serializer.data
 
     @staticmethod
     def get_cati(obj):
-        filtered_cati_queryset = obj.cati.all()
-        if filtered_cati_queryset.exists():
-            openness_avg_dict = filtered_cati_queryset.aggregate(avg=Avg('openness'))
-            coffee_avg_dict = filtered_cati_queryset.aggregate(avg=Avg('coffee'))
-            workspace_avg_dict = filtered_cati_queryset.aggregate(avg=Avg('workspace'))
-            acidity_avg_dict = filtered_cati_queryset.aggregate(avg=Avg('acidity'))
-            return {
-                "openness": openness_avg_dict["avg"],
-                "coffee": coffee_avg_dict["avg"],
-                "workspace": workspace_avg_dict["avg"],
-                "acidity": acidity_avg_dict["avg"]
-            }
-        else:
+        # 투표 시점에 갱신되는 카페별 CATI 합계로 평균을 계산
+        try:
+            return CATICalculator.get_average_dict(obj.cati_summary)
+        except CATISummary.DoesNotExist:
             return None
 
 
@@ -0,0 +1,231 @@
+import logging
+
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from cafe.autocomplete import CafeAutocomplete, CAFE, BRAND
+from cafe.live_channel import LiveOccupancyChannel
+from cafe.live_state import LiveFloorState
+from cafe.models import Cafe, CafeFloor, CafeImage, OpeningHour, CafeVIP, CATI, OccupancyRatePrediction, \
+    OccupancyRateUpdateLog, Brand, Location
+from cafe.occupancy_profile import OccupancyProfiler
+from cafe.spatial_index import CafeSpatialIndex
+from cafe.sync import CafeSync
+from cafe.tile_cache import CafeTileCache
+from cafe.utils import CATICalculator
+from reference_cache import ReferenceCache
+from user.models import User
+
+
+# 지도/추천/검색은 point(GiST 인덱스)로 조회하므로 어느 경로로 저장되든 좌표와 맞춰둠
+@receiver(pre_save, sender=Cafe)
+def sync_cafe_point(sender, instance, **kwargs):
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.point = Point(instance.longitude, instance.latitude, srid=4326)
+
+
+# 시간대 조회가 인덱스를 타도록 로그 작성 시각의 평일/주말, 분(0 ~ 1439)을 함께 저장
+@receiver(pre_save, sender=OccupancyRateUpdateLog)
+def sync_occupancy_log_local_time(sender, instance, **kwargs):
+    if instance.update is not None:
+        instance.day_class = OccupancyProfiler.get_day_class(instance.update.date())
+        instance.minute_of_day = instance.update.hour * 60 + instance.update.minute
+
+
+# 카페가 이동한 경우 이전 위치의 타일도 지워야 하므로 저장 전 좌표를 기억해둠
+# 자동완성, 공간 인덱스는 관련 필드가 바뀐 경우에만 갱신하므로 함께 기억
+@receiver(pre_save, sender=Cafe)
+def remember_previous_cafe(sender, instance, **kwargs):
+    if instance.pk:
+        previous = Cafe.objects.filter(id=instance.pk).values_list(
+            "latitude", "longitude", "name", "is_visible", "is_closed", "is_opened").first()
+        if previous:
+            instance._previous_coordinate = previous[:2]
+            instance._previous_search_fields = previous[2:5]
+            instance._previous_spatial_fields = previous[:2] + previous[3:]
+
+
+# 지도 delta 응답용 변경 시각(하위 정보 변경은 CafeSync가 commit 후 갱신)
+@receiver(pre_save, sender=Cafe)
+def touch_cafe(sender, instance, **kwargs):
+    instance.last_modified = timezone.now()
+
+
+@receiver(post_save, sender=Cafe)
+@receiver(post_delete, sender=Cafe)
+def on_cafe_changed(sender, instance, **kwargs):
+    coordinate_list = [(instance.latitude, instance.longitude)]
+    previous_coordinate = getattr(instance, "_previous_coordinate", None)
+    if previous_coordinate:
+        coordinate_list.append(previous_coordinate)
+    transaction.on_commit(lambda: CafeTileCache.evict_coordinates(coordinate_list))
+
+
+@receiver(post_save, sender=Cafe)
+def on_cafe_saved_autocomplete(sender, instance, **kwargs):
+    if getattr(instance, "_previous_search_fields", None) == (instance.name, instance.is_visible, instance.is_closed):
+        return
+    cafe_id = instance.id
+    name = instance.name if instance.is_visible and not instance.is_closed else None
+    transaction.on_commit(lambda: CafeAutocomplete.on_changed(CAFE, cafe_id, name))
+
+
+@receiver(post_delete, sender=Cafe)
+def on_cafe_deleted_autocomplete(sender, instance, **kwargs):
+    cafe_id = instance.id
+    transaction.on_commit(lambda: CafeAutocomplete.on_changed(CAFE, cafe_id))
+
+
+@receiver(post_save, sender=Cafe)
+def on_cafe_saved_spatial_index(sender, instance, **kwargs):
+    spatial_fields = (instance.latitude, instance.longitude, instance.is_visible, instance.is_closed, instance.is_opened)
+    if getattr(instance, "_previous_spatial_fields", None) == spatial_fields:
+        return
+    cafe_id, flag = instance.id, CafeSpatialIndex.get_flag(*spatial_fields[2:])
+    # 추천 후보 캐시도 공간 인덱스 버전을 key로 쓰므로 함께 무효화됨
+    transaction.on_commit(lambda: CafeSpatialIndex.on_changed(cafe_id, spatial_fields[0], spatial_fields[1], flag))
+
+
+@receiver(post_delete, sender=Cafe)
+def on_cafe_deleted_spatial_index(sender, instance, **kwargs):
+    cafe_id = instance.id
+    transaction.on_commit(lambda: CafeSpatialIndex.on_changed(cafe_id))
+
+
+@receiver(post_save, sender=Brand)
+def on_brand_saved_autocomplete(sender, instance, **kwargs):
+    brand_id, name = instance.id, instance.name
+    transaction.on_commit(lambda: CafeAutocomplete.on_changed(BRAND, brand_id, name))
+
+
+@receiver(post_delete, sender=Brand)
+def on_brand_deleted_autocomplete(sender, instance, **kwargs):
+    brand_id = instance.id
+    transaction.on_commit(lambda: CafeAutocomplete.on_changed(BRAND, brand_id))
+
+
+@receiver(post_save, sender=CafeFloor)
+@receiver(post_delete, sender=CafeFloor)
+@receiver(post_save, sender=CafeImage)
+@receiver(post_delete, sender=CafeImage)
+@receiver(post_save, sender=OpeningHour)
+@receiver(post_delete, sender=OpeningHour)
+@receiver(post_save, sender=CafeVIP)
+@receiver(post_delete, sender=CafeVIP)
+@receiver(post_save, sender=CATI)
+@receiver(post_delete, sender=CATI)
+def on_cafe_detail_changed(sender, instance, **kwargs):
+    cafe_id = instance.cafe_id
+
+    def on_commit():
+        CafeTileCache.evict_cafes([cafe_id])
+        CafeSync.mark_cafes_changed([cafe_id])
+
+    transaction.on_commit(on_commit)
+
+
+# 알림 여부만 저장한 경우(update_fields=["is_notified"])는 혼잡도가 바뀐 것이 아니므로 지도/실시간 상태를 건드리지 않음
+def is_notified_only(update_fields):
+    return update_fields is not None and set(update_fields) <= {"is_notified"}
+
+
+@receiver(post_save, sender=OccupancyRatePrediction)
+@receiver(post_delete, sender=OccupancyRatePrediction)
+@receiver(post_save, sender=OccupancyRateUpdateLog)
+@receiver(post_delete, sender=OccupancyRateUpdateLog)
+def on_cafe_floor_occupancy_changed(sender, instance, update_fields=None, **kwargs):
+    if is_notified_only(update_fields):
+        return
+    cafe_floor_id = instance.cafe_floor_id
+
+    def on_commit():
+        CafeTileCache.evict_cafe_floors([cafe_floor_id])
+        CafeSync.mark_cafe_floors_changed([cafe_floor_id])
+
+    if cafe_floor_id is not None:
+        transaction.on_commit(on_commit)
+
+
+# 혼잡도 등록 외의 경로(관리자, cron)로 로그가 바뀌면 해당 층의 실시간 상태를 다시 만듦
+@receiver(post_save, sender=OccupancyRateUpdateLog)
+@receiver(post_delete, sender=OccupancyRateUpdateLog)
+def rebuild_cafe_floor_live_state(sender, instance, update_fields=None, **kwargs):
+    if is_notified_only(update_fields):
+        return
+    cafe_floor_id = instance.cafe_floor_id
+
+    # 혼잡도 등록 경로는 같은 transaction 안에서 이미 갱신하므로 commit 시점에 확인 후 건너뜀
+    def rebuild():
+        if not getattr(instance, "_is_live_state_updated", False):
+            LiveFloorState.rebuild([cafe_floor_id])
+
+    if cafe_floor_id is not None:
+        transaction.on_commit(rebuild)
+
+
+# 실시간 혼잡도 구독자에게 층별 변경분 전달(실시간 상태 갱신 이후에 보내도록 위 receiver 다음에 등록)
+# 로그는 새로 작성된 경우만 전달(알림 여부 등 수정은 혼잡도 변경이 아님)
+@receiver(post_save, sender=OccupancyRateUpdateLog)
+@receiver(post_save, sender=OccupancyRatePrediction)
+def publish_live_occupancy(sender, instance, created=False, **kwargs):
+    if sender is OccupancyRateUpdateLog and not created:
+        return
+    cafe_floor_id = instance.cafe_floor_id
+    message_type = "log" if sender is OccupancyRateUpdateLog else "prediction"
+
+    def publish():
+        try:
+            LiveOccupancyChannel.publish_cafe_floors([cafe_floor_id], message_type)
+        except Exception as e:
+            logging.getLogger('my').error(e)
+
+    if cafe_floor_id is not None:
+        transaction.on_commit(publish)
+
+
+# 유저가 삭제되면 로그의 user가 SET_NULL로 바뀌는데 이때는 save 신호가 없으므로 유저 로그 수를 직접 다시 만듦
+@receiver(pre_delete, sender=User)
+def rebuild_user_cafe_floor_live_state(sender, instance, **kwargs):
+    cafe_floor_id_list = list(OccupancyRateUpdateLog.objects.filter(
+        user__id=instance.id, cafe_floor__isnull=False
+    ).order_by().values_list("cafe_floor_id", flat=True).distinct())
+    if cafe_floor_id_list:
+        transaction.on_commit(lambda: LiveFloorState.rebuild(cafe_floor_id_list))
+
+
+# CATI 투표 경로 외(삭제, 관리자 수정)로 바뀌면 해당 카페의 CATI 합계를 다시 만듦
+@receiver(post_save, sender=CATI)
+@receiver(post_delete, sender=CATI)
+def rebuild_cati_summary(sender, instance, **kwargs):
+    cafe_id = instance.cafe_id
+
+    # 투표 경로는 같은 transaction 안에서 이미 갱신하므로 commit 시점에 확인 후 건너뜀
+    def rebuild():
+        if not getattr(instance, "_is_cati_summary_updated", False):
+            CATICalculator.rebuild([cafe_id])
+
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=Brand)
+def on_brand_changed(sender, instance, **kwargs):
+    brand_id = instance.id
+
+    def on_commit():
+        CafeTileCache.evict_coordinates(Cafe.objects.filter(brand__id=brand_id).values_list("latitude", "longitude"))
+        CafeSync.mark_brands_changed([brand_id])
+
+    transaction.on_commit(on_commit)
+
+
+# 참조 테이블(브랜드, 깃발 지역)이 바뀌면 워커별 캐시를 모든 워커에서 다시 불러오도록 함
+# 다른 앱의 참조 테이블은 각 앱의 signals에서 처리
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def on_reference_data_changed(sender, **kwargs):
+    transaction.on_commit(ReferenceCache.get_table(sender).invalidate)
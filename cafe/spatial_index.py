@@ -0,0 +1,194 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from cafe.models import Cafe
+from cafejari.settings import SPATIAL_INDEX_CELL_SIZE, SPATIAL_INDEX_MAX_AGE, SPATIAL_INDEX_VERSION_CHECK_INTERVAL
+from utils import SharedVersion
+
+VISIBLE, CLOSED, OPENED = 1, 2, 4
+# cell key = (cell_y + LATITUDE_OFFSET) << 20 | (cell_x + LONGITUDE_OFFSET)
+LATITUDE_OFFSET = int(90 / SPATIAL_INDEX_CELL_SIZE)
+LONGITUDE_OFFSET = int(180 / SPATIAL_INDEX_CELL_SIZE)
+# 이 반경(격자 수)을 넘어가면 격자 대신 전체 배열을 한번에 계산
+MAX_RING = 32
+
+
+# 카페 좌표와 상태(공개, 폐업, 영업중)만 NumPy 배열로 들고 있는 워커별 격자(uniform grid) 공간 인덱스
+# 지도 범위, 가까운 카페 조회를 DB 없이 id로 답하고, DB는 id로 상세 정보를 불러오는 데만 사용
+# 변경은 signal에서 이 워커에 반영 + 공유 버전으로 다른 워커에 알림, SPATIAL_INDEX_MAX_AGE마다 새로 만듦
+class CafeSpatialIndex:
+    version = SharedVersion("cafe_spatial_index")
+    lock = threading.RLock()
+
+    ids = np.empty(0, dtype=np.int64)
+    latitudes = np.empty(0, dtype=np.float64)
+    longitudes = np.empty(0, dtype=np.float64)
+    flags = np.empty(0, dtype=np.uint8)
+    cell_keys = np.empty(0, dtype=np.int64)
+    id_index_dict = {}
+
+    built_version = None
+    built_at = 0.0
+    last_version_check = 0.0
+
+    @staticmethod
+    def get_cell(latitude, longitude):
+        return (
+            np.floor(np.asarray(latitude) / SPATIAL_INDEX_CELL_SIZE).astype(np.int64),
+            np.floor(np.asarray(longitude) / SPATIAL_INDEX_CELL_SIZE).astype(np.int64),
+        )
+
+    @staticmethod
+    def get_cell_key(cell_y, cell_x):
+        return ((cell_y + LATITUDE_OFFSET) << 20) | (cell_x + LONGITUDE_OFFSET)
+
+    @staticmethod
+    def get_flag(is_visible, is_closed, is_opened):
+        return (VISIBLE if is_visible else 0) | (CLOSED if is_closed else 0) | (OPENED if is_opened else 0)
+
+    @classmethod
+    def build(cls):
+        version = cls.version.get()
+        row_list = list(Cafe.objects.values_list("id", "latitude", "longitude", "is_visible", "is_closed", "is_opened"))
+        ids = np.array([row[0] for row in row_list], dtype=np.int64)
+        latitudes = np.array([row[1] for row in row_list], dtype=np.float64)
+        longitudes = np.array([row[2] for row in row_list], dtype=np.float64)
+        flags = np.array([cls.get_flag(*row[3:]) for row in row_list], dtype=np.uint8)
+
+        # 격자 key 순으로 정렬해 두면 격자 한 줄(같은 cell_y)의 범위를 searchsorted로 바로 찾을 수 있음
+        cell_keys = cls.get_cell_key(*cls.get_cell(latitudes, longitudes))
+        order = np.argsort(cell_keys, kind="stable")
+        with cls.lock:
+            cls.ids = ids[order]
+            cls.latitudes = latitudes[order]
+            cls.longitudes = longitudes[order]
+            cls.flags = flags[order]
+            cls.cell_keys = cell_keys[order]
+            cls.id_index_dict = {int(cafe_id): index for index, cafe_id in enumerate(cls.ids)}
+            cls.built_version = version
+            cls.built_at = time.monotonic()
+
+    @classmethod
+    def ensure_fresh(cls):
+        now = time.monotonic()
+        if cls.built_version is not None and now - cls.built_at > SPATIAL_INDEX_MAX_AGE:
+            cls.build()
+            return
+        if cls.built_version is not None and now - cls.last_version_check < SPATIAL_INDEX_VERSION_CHECK_INTERVAL:
+            return
+        cls.last_version_check = now
+        if cls.built_version is None or cls.version.get() != cls.built_version:
+            cls.build()
+
+    @classmethod
+    def get_flag_mask(cls, index_array, require_opened):
+        required = VISIBLE | (OPENED if require_opened else 0)
+        flags = cls.flags[index_array]
+        return ((flags & required) == required) & ((flags & CLOSED) == 0)
+
+    @classmethod
+    def get_block_index_array(cls, min_cell_y, min_cell_x, max_cell_y, max_cell_x):
+        # 격자 사각형 범위에 속한 원소 index
+        rows = [
+            np.arange(
+                np.searchsorted(cls.cell_keys, cls.get_cell_key(cell_y, min_cell_x), side="left"),
+                np.searchsorted(cls.cell_keys, cls.get_cell_key(cell_y, max_cell_x), side="right"),
+            )
+            for cell_y in range(min_cell_y, max_cell_y + 1)
+        ]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def get_ids_in_bound(cls, south, west, north, east, require_opened=False):
+        cls.ensure_fresh()
+        with cls.lock:
+            min_cell_y, min_cell_x = (int(cell) for cell in cls.get_cell(south, west))
+            max_cell_y, max_cell_x = (int(cell) for cell in cls.get_cell(north, east))
+            index_array = cls.get_block_index_array(min_cell_y, min_cell_x, max_cell_y, max_cell_x)
+            latitudes, longitudes = cls.latitudes[index_array], cls.longitudes[index_array]
+            mask = (south <= latitudes) & (latitudes <= north) & (west <= longitudes) & (longitudes <= east)
+            mask &= cls.get_flag_mask(index_array, require_opened)
+            return cls.ids[index_array[mask]].tolist()
+
+    @classmethod
+    def get_nearest_ids(cls, latitude, longitude, k, require_opened=False):
+        # 가까운 순 k개 id, 경도 차이는 cos(위도)를 곱해 거리 비율을 맞춤
+        cls.ensure_fresh()
+        longitude_scale = math.cos(math.radians(latitude))
+        with cls.lock:
+            center_cell_y, center_cell_x = (int(cell) for cell in cls.get_cell(latitude, longitude))
+            ring = 0
+            while True:
+                if ring > MAX_RING:
+                    index_array = np.arange(len(cls.ids))
+                else:
+                    index_array = cls.get_block_index_array(
+                        center_cell_y - ring, center_cell_x - ring, center_cell_y + ring, center_cell_x + ring
+                    )
+                index_array = index_array[cls.get_flag_mask(index_array, require_opened)]
+                distances = np.hypot(
+                    cls.latitudes[index_array] - latitude,
+                    (cls.longitudes[index_array] - longitude) * longitude_scale
+                )
+                # 격자 사각형 안은 모두 봤으므로 사각형 경계까지의 거리 안쪽 결과는 확정
+                covered_distance = ring * SPATIAL_INDEX_CELL_SIZE * longitude_scale
+                if ring > MAX_RING or np.count_nonzero(distances <= covered_distance) >= k:
+                    order = np.argsort(distances, kind="stable")[:k]
+                    return cls.ids[index_array[order]].tolist()
+                ring = ring * 2 + 1
+
+    @classmethod
+    def get_ids_within_distance(cls, latitude, longitude, distance, require_opened=False):
+        # 기준점에서 distance(위도 단위, 경도는 cos(위도) 보정) 안의 id, 위도, 경도
+        cls.ensure_fresh()
+        longitude_scale = math.cos(math.radians(latitude))
+        latitude_bound, longitude_bound = distance, distance / longitude_scale
+        with cls.lock:
+            min_cell_y, min_cell_x = (int(cell) for cell in cls.get_cell(latitude - latitude_bound, longitude - longitude_bound))
+            max_cell_y, max_cell_x = (int(cell) for cell in cls.get_cell(latitude + latitude_bound, longitude + longitude_bound))
+            index_array = cls.get_block_index_array(min_cell_y, min_cell_x, max_cell_y, max_cell_x)
+            index_array = index_array[cls.get_flag_mask(index_array, require_opened)]
+            distances = np.hypot(
+                cls.latitudes[index_array] - latitude,
+                (cls.longitudes[index_array] - longitude) * longitude_scale
+            )
+            index_array = index_array[distances <= distance]
+            return list(zip(
+                cls.ids[index_array].tolist(), cls.latitudes[index_array].tolist(), cls.longitudes[index_array].tolist()
+            ))
+
+    @classmethod
+    def get_location_dict(cls, cafe_id_list):
+        with cls.lock:
+            return {
+                cafe_id: (float(cls.latitudes[cls.id_index_dict[cafe_id]]), float(cls.longitudes[cls.id_index_dict[cafe_id]]))
+                for cafe_id in cafe_id_list if cafe_id in cls.id_index_dict
+            }
+
+    @classmethod
+    def update(cls, cafe_id, latitude=None, longitude=None, flag=None):
+        # 같은 격자 안의 변경(상태, 좌표)은 바로 반영, 격자 이동/추가/삭제는 다음 조회 때 다시 만듦
+        if cls.built_version is None:
+            return
+        with cls.lock:
+            index = cls.id_index_dict.get(cafe_id)
+            if index is None or latitude is None:
+                cls.built_version = None
+                return
+            cell_key = cls.get_cell_key(*(int(cell) for cell in cls.get_cell(latitude, longitude)))
+            if cell_key != cls.cell_keys[index]:
+                cls.built_version = None
+                return
+            cls.latitudes[index] = latitude
+            cls.longitudes[index] = longitude
+            cls.flags[index] = flag
+
+    @classmethod
+    def on_changed(cls, cafe_id, latitude=None, longitude=None, flag=None):
+        cls.update(cafe_id, latitude, longitude, flag)
+        version = cls.version.bump()
+        if cls.built_version is not None and version == cls.built_version + 1:
+            cls.built_version = version
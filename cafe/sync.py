@@ -0,0 +1,31 @@
+import datetime
+
+from django.utils import timezone
+
+from cafe.models import Cafe
+from cafejari.settings import MAP_SYNC_CURSOR_OVERLAP
+
+
+# 지도 delta 응답(since 이후 바뀐 카페만)을 위해 카페 및 하위 정보가 바뀔 때마다 Cafe.last_modified를 갱신
+# queryset.update를 사용하므로 Cafe 저장 signal은 다시 발생하지 않음
+class CafeSync:
+
+    @staticmethod
+    def get_cursor():
+        # 변경 표시는 commit 직후 따로 기록되므로 그 사이에 읽은 요청이 놓치지 않도록 조금 겹쳐서 돌려줌
+        return timezone.now() - datetime.timedelta(seconds=MAP_SYNC_CURSOR_OVERLAP)
+
+    @staticmethod
+    def mark_cafes_changed(cafe_id_list):
+        if cafe_id_list:
+            Cafe.objects.filter(id__in=cafe_id_list).update(last_modified=timezone.now())
+
+    @staticmethod
+    def mark_cafe_floors_changed(cafe_floor_id_list):
+        if cafe_floor_id_list:
+            Cafe.objects.filter(cafe_floor__id__in=cafe_floor_id_list).update(last_modified=timezone.now())
+
+    @staticmethod
+    def mark_brands_changed(brand_id_list):
+        if brand_id_list:
+            Cafe.objects.filter(brand__id__in=brand_id_list).update(last_modified=timezone.now())
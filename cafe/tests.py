@@ -0,0 +1,400 @@
+import asyncio
+import datetime
+import math
+import time
+from unittest.mock import patch
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from cafe.autocomplete import CafeAutocomplete, normalize, CAFE, BRAND
+from cafe.live_channel import LocalBroker, LiveSubscription
+from cafe.live_state import LiveFloorState
+from cafe.models import Cafe, CafeFloor, CafeImage, CafeVIP, CATI, OccupancyRateUpdateLog, OccupancyRatePrediction, \
+    OpeningHour, Congestion
+from cafe.occupancy_profile import OccupancyProfiler, BUCKET_COUNT, COUNT, MEAN, M2
+from cafe.prediction import OccupancyPredictionEngine
+from cafe.quota import MemoryQuotaStore, SharingQuota, COOLDOWN, NO_REWARD, REWARD
+from cafe.serializers import CafeResponseSerializer
+from cafe.utils import CATICalculator
+from cafe.views import OccupancyRateUpdateLogViewSet
+from cafejari.settings import UPDATE_COOLTIME
+from user.models import User, Profile, Grade, ProfileImage
+
+
+# 지도 응답은 카페 수와 상관없이 같은 수의 쿼리로 만들어져야 함
+class CafeResponseQueryCountTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grade = Grade.objects.create(
+            step=1, name="테스트등급", sharing_count_requirement=0,
+            sharing_restriction_per_cafe=3, activity_stack_restriction_per_day=5
+        )
+        cls.profile_image = ProfileImage.objects.create(image="user/profile/test.jpg")
+        cls.user_count = 0
+
+    @classmethod
+    def create_user(cls):
+        cls.user_count += 1
+        user = User.objects.create(username=f"user{cls.user_count}")
+        Profile.objects.create(
+            user=user, nickname=f"유저{cls.user_count}", grade=cls.grade, profile_image=cls.profile_image
+        )
+        return user
+
+    def create_cafe(self, index):
+        cafe = Cafe.objects.create(
+            name=f"카페{index}", address=f"주소{index}", latitude=37.55 + index * 0.001, longitude=126.93
+        )
+        OpeningHour.objects.create(
+            cafe=cafe, mon="", tue="", wed="", thu="", fri="", sat="", sun=""
+        )
+        CafeImage.objects.create(cafe=cafe, image=f"cafe/cafe_image/test_{index}.jpg")
+        CafeVIP.objects.create(cafe=cafe, user=self.create_user(), update_count=3)
+        CATI.objects.create(cafe=cafe, user=self.create_user(), openness=1, coffee=0, workspace=-1, acidity=2)
+        for floor in (1, 2):
+            cafe_floor = CafeFloor.objects.create(cafe=cafe, floor=floor)
+            OccupancyRatePrediction.objects.create(cafe_floor=cafe_floor, occupancy_rate=0.5)
+            for _ in range(2):
+                log = OccupancyRateUpdateLog.objects.create(
+                    cafe_floor=cafe_floor, user=self.create_user(), occupancy_rate=0.3, point=10
+                )
+                LiveFloorState.push_log(log)
+        CATICalculator.rebuild([cafe.id])
+        return cafe
+
+    @staticmethod
+    def count_queries(cafe_id_list):
+        with CaptureQueriesContext(connection) as context:
+            data = CafeResponseSerializer(
+                CafeResponseSerializer.optimize_queryset(Cafe.objects.filter(id__in=cafe_id_list)), many=True
+            ).data
+        return len(context.captured_queries), data
+
+    def test_query_count_does_not_grow_with_cafe_count(self):
+        cafe_id_list = [self.create_cafe(index).id for index in range(6)]
+
+        single_count, single_data = self.count_queries(cafe_id_list[:1])
+        many_count, many_data = self.count_queries(cafe_id_list)
+
+        self.assertEqual(len(single_data), 1)
+        self.assertEqual(len(many_data), len(cafe_id_list))
+        self.assertEqual(len(many_data[0]["cafe_floor"][0]["recent_updated_log"]), 2)
+        self.assertEqual(single_count, many_count)
+
+    def test_recent_log_shows_current_profile(self):
+        cafe = self.create_cafe(0)
+        log = OccupancyRateUpdateLog.objects.filter(cafe_floor__cafe=cafe).select_related("user__profile").first()
+        Profile.objects.filter(id=log.user.profile.id).update(nickname="바뀐닉네임")
+
+        _, data = self.count_queries([cafe.id])
+        nickname_list = [
+            recent_log["user"]["profile"]["nickname"]
+            for cafe_floor in data[0]["cafe_floor"] for recent_log in cafe_floor["recent_updated_log"]
+        ]
+        self.assertIn("바뀐닉네임", nickname_list)
+
+
+# 자동완성 인덱스는 DB 없이 항목 리스트로 만들어 확인
+class CafeAutocompleteTest(SimpleTestCase):
+
+    def setUp(self):
+        CafeAutocomplete.load([
+            (BRAND, 1, "스타벅스"),
+            (CAFE, 10, "스타벅스 신촌점"),
+            (CAFE, 11, "투썸플레이스"),
+            (CAFE, 12, "신촌 커피"),
+        ])
+        # 검색 중 공유 버전 확인, DB로 다시 만드는 것을 막음
+        CafeAutocomplete.built_version = CafeAutocomplete.version.get()
+        CafeAutocomplete.last_version_check = time.monotonic()
+
+    def tearDown(self):
+        CafeAutocomplete.load([])
+        CafeAutocomplete.built_version = None
+
+    @staticmethod
+    def search_ids(query):
+        return [(result["type"], result["id"]) for result in CafeAutocomplete.search(query)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize("스타 벅스"), "ㅅㅡㅌㅏㅂㅓㄱㅅㅡ")
+        self.assertEqual(normalize("Cafe ABC"), "cafeabc")
+        self.assertEqual(normalize("ㅘㄳ"), "ㅗㅏㄱㅅ")
+        # 입력 중인 마지막 글자의 받침도 다음 음절 초성과 매칭
+        self.assertTrue(normalize("스타벅스").startswith(normalize("스탑")))
+
+    def test_search_ranks_prefix_and_brand_first(self):
+        self.assertEqual(self.search_ids("스탑"), [("brand", 1), ("cafe", 10)])
+        self.assertEqual(self.search_ids("신촌"), [("cafe", 12), ("cafe", 10)])
+        self.assertEqual(self.search_ids("  "), [])
+        self.assertEqual(self.search_ids("없는카페"), [])
+
+    def test_search_limit(self):
+        self.assertEqual(len(CafeAutocomplete.search("ㅅ", limit=2)), 2)
+
+    def test_update_entries(self):
+        CafeAutocomplete.update(CAFE, 11)
+        self.assertEqual(self.search_ids("투썸"), [])
+
+        CafeAutocomplete.update(CAFE, 13, "투썸 연남점")
+        CafeAutocomplete.update(CAFE, 12, "연남 커피")
+        self.assertEqual(self.search_ids("투썸"), [("cafe", 13)])
+        self.assertEqual(self.search_ids("연남"), [("cafe", 12), ("cafe", 13)])
+        self.assertEqual(self.search_ids("신촌"), [("cafe", 10)])
+
+
+# 구독자별 queue는 event loop에서 채워지므로 dispatch 후 한번 양보하고 확인
+class LocalBrokerTest(SimpleTestCase):
+
+    @staticmethod
+    def get_message(cafe_id, latitude=37.55, longitude=126.93):
+        return {"type": "log", "cafe": cafe_id, "cafe_floor": cafe_id * 10, "latitude": latitude, "longitude": longitude}
+
+    async def test_dispatch_to_matching_subscriptions(self):
+        broker = LocalBroker()
+        bound_subscription = LiveSubscription(bound=(37.5, 126.9, 37.6, 127.0))
+        cafe_subscription = LiveSubscription(cafe_id_set={2})
+        broker.subscribe(bound_subscription)
+        broker.subscribe(cafe_subscription)
+
+        broker.publish(self.get_message(1))
+        broker.publish(self.get_message(2, latitude=35.1))
+        await asyncio.sleep(0)
+
+        self.assertEqual(bound_subscription.queue.get_nowait()["cafe"], 1)
+        self.assertTrue(bound_subscription.queue.empty())
+        self.assertEqual(cafe_subscription.queue.get_nowait()["cafe"], 2)
+        self.assertTrue(cafe_subscription.queue.empty())
+
+    async def test_unsubscribe(self):
+        broker = LocalBroker()
+        subscription = LiveSubscription(cafe_id_set={1})
+        broker.subscribe(subscription)
+        broker.unsubscribe(subscription)
+
+        broker.publish(self.get_message(1))
+        await asyncio.sleep(0)
+
+        self.assertTrue(subscription.queue.empty())
+        self.assertEqual(broker.subscriptions, set())
+
+    async def test_full_queue_drops_messages(self):
+        broker = LocalBroker()
+        subscription = LiveSubscription(cafe_id_set={1})
+        subscription.queue = asyncio.Queue(maxsize=1)
+        broker.subscribe(subscription)
+
+        broker.publish(self.get_message(1))
+        broker.publish(self.get_message(1))
+        await asyncio.sleep(0)
+
+        self.assertEqual(subscription.queue.qsize(), 1)
+
+
+# 쿨타임, 층별 하루 등록 제한, 하루 stack 제한 규칙(RedisQuotaStore의 script와 같은 규칙)
+class MemoryQuotaStoreTest(SimpleTestCase):
+    now = datetime.datetime(2026, 10, 19, 10, 0)
+    cooltime = datetime.timedelta(minutes=UPDATE_COOLTIME)
+
+    def setUp(self):
+        self.store = MemoryQuotaStore()
+        self.grade = Grade(sharing_restriction_per_cafe=2, activity_stack_restriction_per_day=2)
+
+    def acquire(self, cafe_floor_id, now):
+        return self.store.acquire(1, cafe_floor_id, self.grade, now)
+
+    def test_cooldown_per_floor(self):
+        self.assertEqual(self.acquire(1, self.now), REWARD)
+        self.assertEqual(self.acquire(1, self.now + self.cooltime / 2), COOLDOWN)
+        self.assertEqual(self.acquire(2, self.now + self.cooltime / 2), REWARD)
+        self.assertEqual(self.acquire(1, self.now + self.cooltime), REWARD)
+
+    def test_sharing_restriction_per_floor(self):
+        self.assertEqual(self.acquire(1, self.now), REWARD)
+        self.assertEqual(self.acquire(1, self.now + self.cooltime), REWARD)
+        self.assertEqual(self.acquire(1, self.now + self.cooltime * 2), NO_REWARD)
+
+    def test_daily_stack_restriction(self):
+        self.assertEqual(self.acquire(1, self.now), REWARD)
+        self.assertEqual(self.acquire(2, self.now), REWARD)
+        self.assertEqual(self.acquire(3, self.now), NO_REWARD)
+        # stack을 받지 못한 층은 다시 등록해도 포인트 없음
+        self.assertEqual(self.acquire(3, self.now + self.cooltime), NO_REWARD)
+        # 다음 날에는 제한이 초기화됨
+        self.assertEqual(self.acquire(3, self.now + datetime.timedelta(days=1)), REWARD)
+
+    def test_release(self):
+        self.grade.activity_stack_restriction_per_day = 1
+        self.assertEqual(self.acquire(1, self.now), REWARD)
+        self.store.release(1, 1, self.now)
+        # 쿨타임과 stack이 모두 돌아옴
+        self.assertEqual(self.acquire(2, self.now), REWARD)
+        self.assertEqual(self.acquire(1, self.now + self.cooltime), NO_REWARD)
+
+        # 같은 층의 두번째 등록을 되돌리면 첫 등록의 stack은 남음
+        self.assertEqual(self.acquire(2, self.now + self.cooltime), REWARD)
+        self.store.release(1, 2, self.now + self.cooltime)
+        self.assertEqual(self.acquire(2, self.now + self.cooltime), REWARD)
+
+
+# 혼잡도 등록 저장에 실패하면 이번 등록으로 쓴 쿨타임, stack을 되돌림
+@patch("cafe.views.is_occupancy_update_possible", return_value=True)
+class OccupancyRegistrationQuotaTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        grade = Grade.objects.create(
+            step=1, name="테스트등급", sharing_count_requirement=0,
+            sharing_restriction_per_cafe=3, activity_stack_restriction_per_day=1
+        )
+        cls.user = User.objects.create(username="user")
+        Profile.objects.create(user=cls.user, nickname="유저", grade=grade)
+        cafe = Cafe.objects.create(name="카페", address="주소", latitude=37.55, longitude=126.93)
+        cls.cafe_floor = CafeFloor.objects.create(cafe=cafe, floor=1)
+
+    def setUp(self):
+        self.previous_store = SharingQuota.store
+        SharingQuota.store = MemoryQuotaStore()
+
+    def tearDown(self):
+        SharingQuota.store = self.previous_store
+
+    def register(self):
+        request = APIRequestFactory().post(
+            "/cafe/occupancy_update_log/user_registration/",
+            {"occupancy_rate": 0.5, "cafe_floor_id": self.cafe_floor.id},
+            format="json"
+        )
+        force_authenticate(request, user=self.user)
+        return OccupancyRateUpdateLogViewSet.as_view({"post": "user_registration"})(request)
+
+    def test_failed_save_releases_quota(self, _):
+        with patch.object(OccupancyRateUpdateLogViewSet, "save_log", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.register()
+
+        self.assertEqual(self.register().status_code, 201)
+        log = OccupancyRateUpdateLog.objects.get(user=self.user)
+        self.assertGreater(log.point, 0)
+        self.assertEqual(Profile.objects.get(user=self.user).point, log.point)
+
+        # 성공한 등록의 쿨타임은 남아있음
+        self.assertEqual(self.register().status_code, 409)
+
+
+# 일괄 계산(배열)은 기존 층별 반복 계산(benchmark_occupancy_prediction.predict_occupancy_per_floor)과 같은 결과여야 함
+class OccupancyPredictionComputeTest(SimpleTestCase):
+
+    @staticmethod
+    def predict_per_floor(floor_ids, seconds, occupancy_rates, congestion_indexes, now_seconds, start_seconds, end_seconds):
+        # 층별로 가장 가까운 과거/미래 로그를 골라 보간하는 기존 계산, {층 id: (혼잡도, 지역 혼잡도 index)}
+        result_dict = {}
+        for floor_id in sorted(set(floor_ids.tolist())):
+            log_list = [
+                (seconds[index], occupancy_rates[index], congestion_indexes[index])
+                for index in np.flatnonzero(floor_ids == floor_id)
+            ]
+            after_logs = sorted((log for log in log_list if now_seconds <= log[0] <= end_seconds), key=lambda log: log[0])
+            before_logs = sorted((log for log in log_list if start_seconds <= log[0] <= now_seconds), key=lambda log: -log[0])
+            if after_logs and before_logs:
+                future, past = after_logs[0], before_logs[0]
+                x = math.floor(now_seconds - past[0])
+                x1 = math.floor(future[0] - past[0])
+                y0, y1 = past[1], future[1]
+                if y1 >= y0:
+                    occupancy_rate = y0 + math.pow(math.pow(y1 - y0, 2) * x / x1, 0.5)
+                else:
+                    occupancy_rate = y1 + math.pow(math.pow(y1 - y0, 2) * (x1 - x) / x1, 0.5)
+                congestion = past[2] if x < x1 / 2 else future[2]
+            elif after_logs:
+                occupancy_rate, congestion = after_logs[0][1], after_logs[0][2]
+            elif before_logs:
+                occupancy_rate, congestion = before_logs[0][1], before_logs[0][2]
+            else:
+                continue
+            result_dict[floor_id] = (occupancy_rate, congestion)
+        return result_dict
+
+    def test_compute_matches_per_floor_loop(self):
+        rng = np.random.default_rng(0)
+        now = datetime.datetime(2026, 10, 19, 12, 0, 0, 250000)
+        start_time, end_time, _ = OccupancyPredictionEngine.get_window(now)
+        now_seconds = OccupancyPredictionEngine.get_seconds(now.time())
+        start_seconds = OccupancyPredictionEngine.get_seconds(start_time)
+        end_seconds = OccupancyPredictionEngine.get_seconds(end_time)
+
+        # 층마다 0 ~ 5개 로그, 시간대 밖 로그 포함, 시각은 겹치지 않고 현재 시각과 1초 이상 떨어지게 만듦
+        size = 1000
+        floor_ids = rng.integers(0, 300, size)
+        seconds = rng.choice(np.arange(int(start_seconds) - 600, int(end_seconds) + 600), size, replace=False) + 0.5
+        occupancy_rates = np.round(rng.uniform(0, 1, size), 2)
+        congestion_indexes = rng.integers(-1, len(Congestion), size)
+
+        result_floor_ids, result_occupancy_rates, result_congestions = OccupancyPredictionEngine.compute(
+            floor_ids, seconds, occupancy_rates, congestion_indexes, now_seconds, start_seconds, end_seconds
+        )
+        expected_dict = self.predict_per_floor(
+            floor_ids, seconds, occupancy_rates, congestion_indexes, now_seconds, start_seconds, end_seconds
+        )
+
+        self.assertEqual(result_floor_ids.tolist(), sorted(expected_dict))
+        for floor_id, occupancy_rate, congestion in zip(
+                result_floor_ids.tolist(), result_occupancy_rates.tolist(), result_congestions.tolist()):
+            self.assertAlmostEqual(occupancy_rate, expected_dict[floor_id][0], places=9)
+            self.assertEqual(congestion, expected_dict[floor_id][1])
+
+
+# 로그를 나눠서 병합(Welford/Chan)한 분포는 전체 로그로 한번에 계산한 분포와 같아야 함
+class OccupancyProfileMergeTest(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        size = 5000
+        # 일부 시간대에 로그가 몰리도록 시간대를 좁게 뽑음
+        self.day_classes = rng.integers(0, 2, size)
+        self.buckets = rng.integers(50, 80, size)
+        self.occupancy_rates = np.round(rng.uniform(0, 1, size), 2)
+
+    def get_expected(self, day_class, bucket):
+        values = self.occupancy_rates[(self.day_classes == day_class) & (self.buckets == bucket)]
+        if not len(values):
+            return 0, 0.0, 0.0
+        return len(values), values.mean(), np.square(values - values.mean()).sum()
+
+    def test_batch_merge_matches_full_recompute(self):
+        profile = OccupancyProfiler.empty()
+        # 한 개짜리 묶음, 같은 시간대만 있는 묶음 등 크기가 다른 묶음으로 나눠 병합
+        for start, end in ((0, 1), (1, 2), (2, 500), (500, 501), (501, 3000), (3000, 5000)):
+            OccupancyProfiler.merge(
+                profile, self.day_classes[start:end], self.buckets[start:end], self.occupancy_rates[start:end]
+            )
+
+        for day_class in (0, 1):
+            for bucket in range(BUCKET_COUNT):
+                count, mean, m2 = self.get_expected(day_class, bucket)
+                self.assertEqual(profile[day_class, bucket, COUNT], count)
+                self.assertAlmostEqual(profile[day_class, bucket, MEAN], mean, places=9)
+                self.assertAlmostEqual(profile[day_class, bucket, M2], m2, places=6)
+
+    def test_typical_matches_weighted_logs(self):
+        profile = OccupancyProfiler.merge(
+            OccupancyProfiler.empty(), self.day_classes, self.buckets, self.occupancy_rates
+        )
+        radius, day_class, bucket = 2, 1, 51
+        # 주변 시간대 로그를 시간대 거리에 따른 가중치로 직접 계산
+        mask = (self.day_classes == day_class) & (np.abs(self.buckets - bucket) <= radius)
+        weights = radius + 1 - np.abs(self.buckets[mask] - bucket)
+        values = self.occupancy_rates[mask]
+        mean = np.average(values, weights=weights)
+        deviation = np.sqrt(np.average(np.square(values - mean), weights=weights))
+
+        typical = OccupancyProfiler.get_typical(profile, day_class, bucket, radius=radius)
+        self.assertAlmostEqual(typical[0], mean, places=9)
+        self.assertAlmostEqual(typical[1], deviation, places=6)
+        self.assertEqual(typical[2], int(mask.sum()))
+        self.assertIsNone(OccupancyProfiler.get_typical(profile, day_class, 10, radius=radius))
@@ -0,0 +1,79 @@
+import math
+
+from django.core.cache import cache
+
+from cafe.models import Cafe
+from cafejari.settings import MAP_TILE_SIZE, MAP_TILE_CACHE_TIMEOUT
+
+
+# 지도 응답을 고정된 격자(tile) 단위로 캐싱
+# 각 카페는 좌표에 따라 정확히 하나의 타일에 속하므로, 카페 정보가 바뀌면 해당 타일만 지우면 됨
+class CafeTileCache:
+
+    @staticmethod
+    def get_tile(latitude, longitude):
+        return math.floor(latitude / MAP_TILE_SIZE), math.floor(longitude / MAP_TILE_SIZE)
+
+    @staticmethod
+    def get_tile_key(tile):
+        return f"cafe_tile:{MAP_TILE_SIZE}:{tile[0]}:{tile[1]}"
+
+    @classmethod
+    def get_tiles_in_bound(cls, south, west, north, east):
+        south_west_tile = cls.get_tile(south, west)
+        north_east_tile = cls.get_tile(north, east)
+        return [
+            (tile_y, tile_x)
+            for tile_y in range(south_west_tile[0], north_east_tile[0] + 1)
+            for tile_x in range(south_west_tile[1], north_east_tile[1] + 1)
+        ]
+
+    @classmethod
+    def get_cafe_list(cls, south, west, north, east, build_tile_cafe_list):
+        # build_tile_cafe_list(south, west, north, east) -> 해당 범위 카페의 직렬화된 리스트
+        tile_key_dict = {cls.get_tile_key(tile): tile for tile in cls.get_tiles_in_bound(south, west, north, east)}
+        tile_cafe_list_dict = cache.get_many(tile_key_dict.keys())
+
+        # 캐시에 없는 타일들은 한번에 불러와서 타일별로 나눠 저장
+        missing_tile_dict = {key: tile for key, tile in tile_key_dict.items() if key not in tile_cafe_list_dict}
+        if missing_tile_dict:
+            missing_tiles = missing_tile_dict.values()
+            built_tile_cafe_list_dict = {key: [] for key in missing_tile_dict}
+            cafe_list = build_tile_cafe_list(
+                min(tile[0] for tile in missing_tiles) * MAP_TILE_SIZE - MAP_TILE_SIZE,
+                min(tile[1] for tile in missing_tiles) * MAP_TILE_SIZE - MAP_TILE_SIZE,
+                (max(tile[0] for tile in missing_tiles) + 2) * MAP_TILE_SIZE,
+                (max(tile[1] for tile in missing_tiles) + 2) * MAP_TILE_SIZE,
+            )
+            for cafe in cafe_list:
+                key = cls.get_tile_key(cls.get_tile(cafe["latitude"], cafe["longitude"]))
+                if key in built_tile_cafe_list_dict:
+                    built_tile_cafe_list_dict[key].append(cafe)
+            cache.set_many(built_tile_cafe_list_dict, timeout=MAP_TILE_CACHE_TIMEOUT)
+            tile_cafe_list_dict.update(built_tile_cafe_list_dict)
+
+        # 타일들을 이어붙인 뒤 실제 요청 범위로 자름
+        cafe_list = [
+            cafe
+            for tile_cafe_list in tile_cafe_list_dict.values()
+            for cafe in tile_cafe_list
+            if south <= cafe["latitude"] <= north and west <= cafe["longitude"] <= east
+        ]
+        cafe_list.sort(key=lambda cafe: cafe["name"])
+        return cafe_list
+
+    @classmethod
+    def evict_coordinates(cls, coordinate_list):
+        cache.delete_many({cls.get_tile_key(cls.get_tile(latitude, longitude)) for latitude, longitude in coordinate_list})
+
+    @classmethod
+    def evict_cafes(cls, cafe_id_list):
+        if cafe_id_list:
+            cls.evict_coordinates(Cafe.objects.filter(id__in=cafe_id_list).values_list("latitude", "longitude"))
+
+    @classmethod
+    def evict_cafe_floors(cls, cafe_floor_id_list):
+        if cafe_floor_id_list:
+            cls.evict_coordinates(
+                Cafe.objects.filter(cafe_floor__id__in=cafe_floor_id_list).values_list("latitude", "longitude")
+            )
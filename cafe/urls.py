@@ -1,7 +1,7 @@
 
 from django.urls import path, include
 from rest_framework import routers
-from cafe.views import CafeViewSet, OccupancyRateUpdateLogViewSet, LocationViewSet, CATIViewSet
+from cafe.views import CafeViewSet, OccupancyRateUpdateLogViewSet, LocationViewSet, CATIViewSet, live_occupancy_stream
 
 router = routers.DefaultRouter()
 router.register('occupancy_update_log', OccupancyRateUpdateLogViewSet)
@@ -10,5 +10,6 @@ router.register('location', LocationViewSet)
 router.register('', CafeViewSet)
 
 urlpatterns = [
+    path('live/', live_occupancy_stream),
     path('', include(router.urls))
 ]
\ No newline at end of file
@@ -1,16 +1,106 @@
-from cafe.models import OccupancyRateUpdateLog
+from django.db.models import F, Count, Sum, Func, Value, FloatField
+
+from cafe.models import CATI, CATISummary, CafeFloorLiveState
 from cafejari.settings import OCCUPANCY_INSUFFICIENT_THRESHOLD, OCCUPANCY_ENOUGH_THRESHOLD, NO_DATA_POINT, \
     INSUFFICIENT_DATA_POINT, ENOUGH_DATA_POINT
 
 
 class PointCalculator:
 
+    # 유저 로그 수는 층별 실시간 상태(live_state)에 로그 작성/삭제 시점마다 갱신되어 있음
     @staticmethod
     def calculate_reward_based_on_data(cafe_floor_id):
-        count = OccupancyRateUpdateLog.objects.filter(cafe_floor__id=cafe_floor_id, user__isnull=False).count()
+        count = CafeFloorLiveState.objects.filter(cafe_floor__id=cafe_floor_id).values_list(
+            "user_log_count", flat=True).first()
+        return PointCalculator.calculate_reward_based_on_count(count or 0)
+
+    @staticmethod
+    def calculate_reward_based_on_data_list(cafe_floor_id_list):
+        # {cafe_floor_id: point} 형태로 여러 층의 보상을 한번에 계산
+        count_dict = dict(CafeFloorLiveState.objects.filter(cafe_floor__id__in=cafe_floor_id_list).values_list(
+            "cafe_floor_id", "user_log_count"))
+        return {
+            cafe_floor_id: PointCalculator.calculate_reward_based_on_count(count_dict.get(cafe_floor_id, 0))
+            for cafe_floor_id in cafe_floor_id_list
+        }
+
+    @staticmethod
+    def calculate_reward_based_on_count(count):
         if count < OCCUPANCY_INSUFFICIENT_THRESHOLD:
             return NO_DATA_POINT
         elif count < OCCUPANCY_ENOUGH_THRESHOLD:
             return INSUFFICIENT_DATA_POINT
         else:
-            return ENOUGH_DATA_POINT
\ No newline at end of file
+            return ENOUGH_DATA_POINT
+
+
+# 카페별 CATI 투표 합계를 투표 시점에 갱신
+class CATICalculator:
+    CATI_FIELDS = ("openness", "coffee", "workspace", "acidity")
+
+    @staticmethod
+    def apply_vote(cafe_id, previous_vote, new_vote):
+        # previous_vote, new_vote: {"openness": int, ...}, 새 투표면 previous_vote=None
+        CATISummary.objects.get_or_create(cafe_id=cafe_id)
+        update_dict = {
+            f"{field}_sum": F(f"{field}_sum") + new_vote[field] - (previous_vote[field] if previous_vote else 0)
+            for field in CATICalculator.CATI_FIELDS
+        }
+        if previous_vote is None:
+            update_dict["count"] = F("count") + 1
+        CATISummary.objects.filter(cafe_id=cafe_id).update(**update_dict)
+
+    @staticmethod
+    def rebuild(cafe_id_list=None):
+        # CATI 테이블로부터 합계를 다시 만듦(None이면 전체 카페)
+        cati_queryset = CATI.objects.all()
+        summary_queryset = CATISummary.objects.all()
+        if cafe_id_list is not None:
+            cati_queryset = cati_queryset.filter(cafe__id__in=cafe_id_list)
+            summary_queryset = summary_queryset.filter(cafe__id__in=cafe_id_list)
+        aggregated_list = cati_queryset.order_by().values("cafe").annotate(
+            count=Count("id"),
+            openness_sum=Sum("openness"),
+            coffee_sum=Sum("coffee"),
+            workspace_sum=Sum("workspace"),
+            acidity_sum=Sum("acidity"),
+        )
+        summary_list = [
+            CATISummary(
+                cafe_id=aggregated["cafe"],
+                count=aggregated["count"],
+                openness_sum=aggregated["openness_sum"],
+                coffee_sum=aggregated["coffee_sum"],
+                workspace_sum=aggregated["workspace_sum"],
+                acidity_sum=aggregated["acidity_sum"],
+            ) for aggregated in aggregated_list
+        ]
+        summary_queryset.exclude(cafe__id__in=[summary.cafe_id for summary in summary_list]).delete()
+        CATISummary.objects.bulk_create(
+            summary_list,
+            update_conflicts=True,
+            unique_fields=["cafe"],
+            update_fields=["count", "openness_sum", "coffee_sum", "workspace_sum", "acidity_sum"],
+        )
+
+    @staticmethod
+    def get_average_dict(summary):
+        if not summary.count:
+            return None
+        return {field: getattr(summary, f"{field}_sum") / summary.count for field in CATICalculator.CATI_FIELDS}
+
+
+# PostGIS KNN 연산자(<->), order_by에 사용하면 GiST 인덱스를 타고 가까운 순으로 바로 읽음
+# 좌표계(4326) 기준 평면 거리이므로 정렬에만 사용하고 실제 거리는 Distance로 계산
+class KNNDistance(Func):
+    arg_joiner = " <-> "
+    template = "%(expressions)s"
+    output_field = FloatField()
+
+    def __init__(self, expression, longitude, latitude):
+        user_location = Func(
+            Func(Value(float(longitude)), Value(float(latitude)), function="ST_MakePoint"),
+            Value(4326),
+            function="ST_SetSRID"
+        )
+        super(KNNDistance, self).__init__(expression, user_location)
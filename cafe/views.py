@@ -1,8 +1,15 @@
+import asyncio
 import datetime
-
-from django.contrib.gis.db.models.functions import Distance
-from django.contrib.gis.geos import Point, GEOSGeometry
-from django.db.models import Q
+import json
+import math
+
+from django.contrib.gis.geos import Polygon
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import transaction
+from django.db.models import Q, F, Case, When, Value, IntegerField
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models.functions import Greatest
+from django.http import StreamingHttpResponse
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema, no_body
 from rest_framework import mixins, status
@@ -10,23 +17,36 @@ from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet
 
-from cafe.models import Cafe, CafeFloor, OccupancyRateUpdateLog, DailyActivityStack, Location, CATI, Congestion, \
-    OccupancyRatePrediction
+from cafe.autocomplete import CafeAutocomplete
+from cafe.cluster import CafeCluster
+from cafe.live_channel import LiveSubscription, LiveOccupancyChannel
+from cafe.live_state import LiveFloorState
+from cafe.models import Cafe, CafeFloor, OccupancyRateUpdateLog, Location, CATI, Congestion, OccupancyRatePrediction
+from cafe.occupancy_profile import OccupancyProfiler, WEEKDAY, WEEKEND, BUCKET_COUNT
+from cafe.prediction_memo import OccupancyPredictionMemo
+from cafe.quota import SharingQuota, COOLDOWN, REWARD
+from cafe.recommendation import CafeRecommendation
+from cafe.renderers import CompactJSONRenderer, CompactMessagePackRenderer
 from cafe.serializers import CafeResponseSerializer, \
-    OccupancyRateUpdateLogResponseSerializer, OccupancyRateUpdateLogSerializer, DailyActivityStackSerializer, \
+    OccupancyRateUpdateLogResponseSerializer, OccupancyRateUpdateLogSerializer, \
     CafeSearchResponseSerializer, LocationResponseSerializer, CATISerializer
 from cafe.swagger_serializers import SwaggerOccupancyRegistrationRequestSerializer, SwaggerCafeResponseSerializer, \
     SwaggerCATIRequestSerializer
-from cafe.utils import PointCalculator
-from cafejari.settings import UPDATE_COOLTIME, RECENT_HOUR
-from challenge.models import Challenge
+from cafe.spatial_index import CafeSpatialIndex
+from cafe.sync import CafeSync
+from cafe.tile_cache import CafeTileCache
+from cafe.utils import PointCalculator, CATICalculator, KNNDistance
+from cafejari.settings import RECENT_HOUR, MAP_CLUSTER_ZOOM_LEVEL, MAP_CLUSTER_GRID_COUNT, \
+    LIVE_CHANNEL_HEARTBEAT, LIVE_CHANNEL_MAX_LIFETIME
 from cron.occupancy_prediction import is_occupancy_update_possible
 from error import ServiceError
 from notification.firebase_message import FirebaseMessage
 from notification.models import PushNotificationType
-from user.serializers import ProfileSerializer
+from reference_cache import ReferenceCache
+from user.models import Profile, Grade
 from utils import AUTHORIZATION_MANUAL_PARAMETER
 
 
@@ -43,6 +63,10 @@ class CafeViewSet(
     queryset = Cafe.objects.all()
     serializer_class = CafeResponseSerializer
     permission_classes = [AllowAny]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CompactJSONRenderer, CompactMessagePackRenderer]
+
+    def get_queryset(self):
+        return CafeResponseSerializer.optimize_queryset(super(CafeViewSet, self).get_queryset())
 
     @swagger_auto_schema(
         operation_id='카페 지도 정보',
@@ -68,7 +92,17 @@ class CafeViewSet(
                 in_=openapi.IN_QUERY,
                 type=openapi.TYPE_INTEGER,
                 required=False,
-                description='1, 2, 3 int 값으로. default=3',
+                description=f'1, 2, 3 int 값으로. default=3, 서버에 MAP_CLUSTER_ZOOM_LEVEL(현재 {MAP_CLUSTER_ZOOM_LEVEL})이 '
+                            f'설정되어 있으면 그 이상일 때 격자별 cluster 정보로 응답'
+                            f'(latitude, longitude, cafe_count, occupancy_rate, occupancy_rate_prediction, fresh_cafe_count)',
+            ),
+            openapi.Parameter(
+                name='since',
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                required=False,
+                description='이전 응답의 cursor(응답 header X-Cafe-Cursor), 주면 그 이후 바뀐 카페만 응답. '
+                            '{"cursor": 다음 요청 cursor, "cafes": 바뀐 카페 리스트, "removed": 비공개/폐업된 카페 id 리스트}',
             ),
         ]
     )
@@ -80,15 +114,65 @@ class CafeViewSet(
         latitude_bound = 0.01 * 0.7 * zoom_level
         longitude_bound = 0.012 * 0.35 * zoom_level
 
-        queryset = self.queryset.filter(
-            is_visible=True,
-            is_closed=False,
-            latitude__gte=latitude - latitude_bound,
-            latitude__lte=latitude + latitude_bound,
-            longitude__gte=longitude - longitude_bound,
-            longitude__lte=longitude + longitude_bound,
+        # 넓은 화면은 카페를 격자별로 묶어서 응답(격자 수가 고정이라 응답 크기가 카페 수와 무관)
+        # 조회 시 계산 모드여도 넓은 화면의 카페를 요청 안에서 모두 계산하지 않고 이미 있는 예측(warm set, 조회된 카페)만 사용
+        if MAP_CLUSTER_ZOOM_LEVEL is not None and zoom_level >= MAP_CLUSTER_ZOOM_LEVEL:
+            cluster_list = CafeCluster.get_cluster_list(
+                south=latitude - latitude_bound,
+                west=longitude - longitude_bound,
+                north=latitude + latitude_bound,
+                east=longitude + longitude_bound,
+                cell_size=latitude_bound * 2 / MAP_CLUSTER_GRID_COUNT
+            )
+            return Response(data=cluster_list, status=status.HTTP_200_OK)
+
+        # 같은 화면을 새로고침하는 경우 cursor 이후 바뀐 카페만 응답
+        cursor = CafeSync.get_cursor()
+        since = self.request.query_params.get('since')
+        if since:
+            try:
+                since = datetime.datetime.fromisoformat(since)
+            except ValueError:
+                return ServiceError.invalid_sync_cursor_response()
+            OccupancyPredictionMemo.refresh_cafes(CafeSpatialIndex.get_ids_in_bound(
+                south=latitude - latitude_bound,
+                west=longitude - longitude_bound,
+                north=latitude + latitude_bound,
+                east=longitude + longitude_bound
+            ))
+            changed_cafes = list(self.get_queryset().filter(
+                last_modified__gt=since,
+                point__bboverlaps=Polygon.from_bbox((
+                    longitude - longitude_bound, latitude - latitude_bound,
+                    longitude + longitude_bound, latitude + latitude_bound
+                )),
+            ))
+            return Response(data={
+                "cursor": cursor.isoformat(),
+                "cafes": self.get_serializer(
+                    [cafe for cafe in changed_cafes if cafe.is_visible and not cafe.is_closed], many=True
+                ).data,
+                "removed": [cafe.id for cafe in changed_cafes if not cafe.is_visible or cafe.is_closed],
+            }, status=status.HTTP_200_OK)
+
+        cafe_list = CafeTileCache.get_cafe_list(
+            south=latitude - latitude_bound,
+            west=longitude - longitude_bound,
+            north=latitude + latitude_bound,
+            east=longitude + longitude_bound,
+            build_tile_cafe_list=self.build_tile_cafe_list
         )
-        return Response(data=self.get_serializer(queryset, many=True).data, status=status.HTTP_200_OK)
+        return Response(data=cafe_list, status=status.HTTP_200_OK, headers={"X-Cafe-Cursor": cursor.isoformat()})
+
+    # 캐시에 없는 지도 타일 범위의 카페 정보를 직렬화
+    def build_tile_cafe_list(self, south, west, north, east):
+        # 범위 필터링은 워커별 공간 인덱스에서, DB는 상세 정보만 불러옴
+        cafe_id_list = CafeSpatialIndex.get_ids_in_bound(south=south, west=west, north=north, east=east)
+        # 조회 시 계산 모드면 이번 시간대에 계산하지 않은 카페의 예상 혼잡도를 먼저 계산
+        OccupancyPredictionMemo.refresh_cafes(cafe_id_list)
+        # 인덱스가 다른 워커의 변경을 아직 반영하지 않았을 수 있으므로 공개/폐업 여부는 DB 기준으로 다시 거름
+        queryset = self.get_queryset().filter(id__in=cafe_id_list, is_visible=True, is_closed=False)
+        return self.get_serializer(queryset, many=True).data
 
     @swagger_auto_schema(
         operation_id='개별 카페 정보',
@@ -96,6 +180,8 @@ class CafeViewSet(
         responses={200: SwaggerCafeResponseSerializer()},
     )
     def retrieve(self, request, *args, **kwargs):
+        if str(kwargs.get("pk")).isdigit():
+            OccupancyPredictionMemo.refresh_cafes([int(kwargs["pk"])])
         return super(CafeViewSet, self).retrieve(request, *args, **kwargs)
 
     @swagger_auto_schema(
@@ -132,20 +218,63 @@ class CafeViewSet(
         latitude = self.request.query_params.get('latitude')
         longitude = self.request.query_params.get('longitude')
         queryset = self.queryset.filter(is_closed=False, is_visible=True)
+        ordering = []
         if query:
+            # 단어별 icontains는 name, address의 trigram(GIN) 인덱스를 사용
             query_list = query.split()
             for query_word in query_list:
                 queryset = queryset.filter(Q(name__icontains=query_word) | Q(address__icontains=query_word))
-        if latitude and longitude:
-            user_location = Point(float(longitude), float(latitude), srid=4326)
+            # 이름 시작 일치 > 이름 포함 > 주소만 일치 순으로 묶은 뒤 거리, 유사도 순으로 정렬
+            query = " ".join(query_list)
             queryset = queryset.annotate(
-                distance=Distance("point", GEOSGeometry(user_location, srid=4326))
-            ).order_by("distance")
-        if len(queryset) > 300:
-            queryset = queryset[:300]
-        serializer = CafeSearchResponseSerializer(queryset, many=True)
+                match_rank=Case(
+                    When(name__istartswith=query, then=Value(2)),
+                    When(name__icontains=query, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField()
+                ),
+                similarity=Greatest(TrigramSimilarity("name", query), TrigramSimilarity("address", query))
+            )
+            ordering.append("-match_rank")
+        if latitude and longitude:
+            ordering.append(KNNDistance("point", longitude=longitude, latitude=latitude))
+        if query:
+            ordering.append("-similarity")
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        serializer = CafeSearchResponseSerializer(queryset[:300], many=True)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        operation_id='카페 자동완성',
+        operation_description='입력 중인 검색어로 카페, 브랜드 이름 자동완성(자모 단위 부분 일치, DB 조회 없음)',
+        responses={200: '[{"type": "cafe" or "brand", "id": int, "name": str}]'},
+        manual_parameters=[
+            openapi.Parameter(
+                name='query',
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                required=True,
+                description='입력 중인 검색어',
+            ),
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                required=False,
+                description='최대 개수, default=10, 1 ~ 30',
+            )
+        ]
+    )
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def autocomplete(self, request):
+        query = self.request.query_params.get('query') or ""
+        try:
+            limit = max(1, min(int(self.request.query_params.get('limit') or 10), 30))
+        except ValueError:
+            return ServiceError.no_request_value_response("limit")
+        return Response(data=CafeAutocomplete.search(query, limit=limit), status=status.HTTP_200_OK)
+
     @swagger_auto_schema(
         operation_id='카페 추천(거리순)',
         operation_description='거리가 가까운 순으로 카페 추천',
@@ -172,18 +301,78 @@ class CafeViewSet(
         latitude = float(self.request.query_params.get('latitude') or 37.55649747287372)
         longitude = float(self.request.query_params.get('longitude') or 126.93710302643744)
 
-        # 사용자 위치를 Point 객체로 생성
-        user_location = Point(longitude, latitude, srid=4326)
-
-        # 거리순 카페 정렬
-        cafes = Cafe.objects.annotate(
-            distance=Distance("point", GEOSGeometry(user_location, srid=4326))
-        ).order_by("distance")
-
-        # 뺄 카페 거르기
-        cafes = cafes.filter(is_visible=True, is_closed=False, is_opened=True)[:20]
+        # 격자별로 캐싱된 후보를 요청 위치 기준으로 다시 정렬해 영업중인 가까운 카페 20개 id를 찾음
+        cafe_id_list = CafeRecommendation.get_nearest_ids(latitude=latitude, longitude=longitude, k=20)
+        if not cafe_id_list:
+            return Response(data=[], status=status.HTTP_200_OK)
+
+        # 상세 정보는 찾은 카페만 id로 불러옴(후보가 멀리 흩어져 있어도 그 사이 타일을 만들지 않음)
+        # 인덱스가 다른 워커의 변경을 아직 반영하지 않았을 수 있으므로 영업/공개/폐업 여부는 DB 기준으로 다시 거름
+        OccupancyPredictionMemo.refresh_cafes(cafe_id_list)
+        cafe_dict = {cafe["id"]: cafe for cafe in self.get_serializer(
+            self.get_queryset().filter(id__in=cafe_id_list, is_opened=True, is_visible=True, is_closed=False), many=True
+        ).data}
+        return Response(
+            data=[cafe_dict[cafe_id] for cafe_id in cafe_id_list if cafe_id in cafe_dict], status=status.HTTP_200_OK
+        )
 
-        return Response(data=self.get_serializer(cafes, many=True).data, status=status.HTTP_200_OK)
+    @swagger_auto_schema(
+        operation_id='카페 층 평소 혼잡도',
+        operation_description='층별 평일/주말 10분 시간대의 평소 혼잡도(앞뒤 시간대와 가중 평균), 로그가 없는 시간대는 null',
+        responses={200: '{"cafe_floor": int, "is_weekend": bool, "current": {"time": str, "occupancy_rate": float, '
+                        '"deviation": float, "count": int} or null, '
+                        '"typical_list": [{"time": str, "occupancy_rate": float or null, "count": int}]}'},
+        manual_parameters=[
+            openapi.Parameter(
+                name='cafe_floor_id',
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                required=True,
+                description='카페 층 id',
+            ),
+            openapi.Parameter(
+                name='is_weekend',
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_BOOLEAN,
+                required=False,
+                description='주말 여부, default=오늘 기준',
+            ),
+        ]
+    )
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def typical_occupancy(self, request):
+        if not self.request.query_params.get('cafe_floor_id'):
+            return ServiceError.no_request_value_response("cafe_floor_id")
+        cafe_floor_id = int(self.request.query_params.get('cafe_floor_id'))
+        now = datetime.datetime.now()
+        is_weekend = self.request.query_params.get('is_weekend')
+        day_class = OccupancyProfiler.get_day_class(now.date()) if is_weekend is None \
+            else (WEEKEND if is_weekend.lower() == "true" else WEEKDAY)
+
+        # 층별 분포 배열 하나만 읽어 계산
+        profile = OccupancyProfiler.get_profile_dict([cafe_floor_id]).get(cafe_floor_id)
+        if profile is None:
+            if not CafeFloor.objects.filter(id=cafe_floor_id).exists():
+                return ServiceError.no_cafe_floor_response()
+            profile = OccupancyProfiler.empty()
+        mean, _, count = OccupancyProfiler.get_curve(profile, day_class)
+        current_bucket = OccupancyProfiler.get_bucket(now.time())
+        typical = OccupancyProfiler.get_typical(profile, day_class, current_bucket)
+        return Response(data={
+            "cafe_floor": cafe_floor_id,
+            "is_weekend": day_class == WEEKEND,
+            "current": {
+                "time": OccupancyProfiler.get_bucket_time(current_bucket),
+                "occupancy_rate": round(typical[0], 2),
+                "deviation": round(typical[1], 2),
+                "count": typical[2]
+            } if typical else None,
+            "typical_list": [{
+                "time": OccupancyProfiler.get_bucket_time(bucket),
+                "occupancy_rate": None if math.isnan(mean[bucket]) else round(float(mean[bucket]), 2),
+                "count": int(count[bucket])
+            } for bucket in range(BUCKET_COUNT)]
+        }, status=status.HTTP_200_OK)
 
 
 class OccupancyRateUpdateLogViewSet(
@@ -195,23 +384,47 @@ class OccupancyRateUpdateLogViewSet(
     permission_classes = [IsAuthenticated]
 
     @staticmethod
-    def save_log(occupancy_rate, cafe_floor_id, user_id, point, congestion):
-        occupancy_rate_update_log_data = {
-            "occupancy_rate": occupancy_rate,
-            "cafe_floor": cafe_floor_id,
-            "user": user_id,
-            "point": point,
-            "congestion": congestion
-        }
-        serializer = OccupancyRateUpdateLogSerializer(data=occupancy_rate_update_log_data)
-        serializer.is_valid(raise_exception=True)
-        return serializer.save()
+    def validate_occupancy_rate(occupancy_rate):
+        # 모델과 같은 자릿수 검증만 하고 FK 존재 확인 쿼리는 하지 않음
+        return OccupancyRateUpdateLogSerializer().fields["occupancy_rate"].run_validation(occupancy_rate)
+
+    @staticmethod
+    def save_log(occupancy_rate, cafe_floor_object, user_id, point, congestion):
+        # 이미 불러온 층 객체로 로그를 만들고, 층별 실시간 상태와 함께 저장
+        with transaction.atomic():
+            saved_object = OccupancyRateUpdateLog.objects.create(
+                occupancy_rate=occupancy_rate,
+                cafe_floor=cafe_floor_object,
+                user_id=user_id,
+                point=point,
+                congestion=congestion
+            )
+            LiveFloorState.push_log(saved_object)
+        return saved_object
+
+    @staticmethod
+    def get_cafe_floor(cafe_floor_id):
+        # 등록에 필요한 카페, 실시간 상태, 예측, 지역 혼잡도를 한번에 불러옴
+        return CafeFloor.objects.select_related(
+            "cafe", "live_state", "occupancy_rate_prediction"
+        ).prefetch_related("cafe__congestion_area").get(id=cafe_floor_id)
+
+    @staticmethod
+    def get_grade(grade_id):
+        # 등급은 참조 테이블 캐시에서 가져오고, 캐시가 갱신되기 전이라 없으면 DB에서 다시 찾음
+        # 등급이 없는 유저(삭제된 등급)는 새 프로필과 같은 첫 등급으로 봄
+        grade_snapshot = ReferenceCache.grade.get()
+        grade = grade_snapshot.id_dict.get(grade_id)
+        if grade is None and grade_id is not None:
+            grade = Grade.objects.filter(id=grade_id).first()
+        return grade or grade_snapshot.object_list[0]
 
     @staticmethod
     def get_congestion(cafe_floor_object):
-        if cafe_floor_object.cafe.congestion_area.all():
+        congestion_area_list = cafe_floor_object.cafe.congestion_area.all()
+        if congestion_area_list:
             current_congestion_index = 0
-            for lookup_congestion_area in cafe_floor_object.cafe.congestion_area.all():
+            for lookup_congestion_area in congestion_area_list:
                 temp_congestion_index = list(Congestion).index(Congestion(lookup_congestion_area.current_congestion))
                 if current_congestion_index < temp_congestion_index:
                     current_congestion_index = temp_congestion_index
@@ -227,12 +440,12 @@ class OccupancyRateUpdateLogViewSet(
     )
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def guest_registration(self, request):
-        occupancy_rate = float(request.data.get("occupancy_rate"))
+        occupancy_rate = self.validate_occupancy_rate(request.data.get("occupancy_rate"))
         cafe_floor_id = int(request.data.get("cafe_floor_id"))
 
         # cafe_floor의 유효성 검사
         try:
-            cafe_floor_object = CafeFloor.objects.get(id=cafe_floor_id)
+            cafe_floor_object = self.get_cafe_floor(cafe_floor_id)
             if not cafe_floor_object.has_seat:
                 return ServiceError.no_cafe_seat_response()
         except CafeFloor.DoesNotExist:
@@ -252,7 +465,7 @@ class OccupancyRateUpdateLogViewSet(
         # occupancy_rate_update_log 작성
         saved_object = self.save_log(
             occupancy_rate=occupancy_rate,
-            cafe_floor_id=cafe_floor_id,
+            cafe_floor_object=cafe_floor_object,
             user_id=None,
             point=0,
             congestion=congestion
@@ -269,12 +482,12 @@ class OccupancyRateUpdateLogViewSet(
     )
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def user_registration(self, request):
-        occupancy_rate = float(request.data.get("occupancy_rate"))
+        occupancy_rate = self.validate_occupancy_rate(request.data.get("occupancy_rate"))
         cafe_floor_id = int(request.data.get("cafe_floor_id"))
 
         # cafe_floor의 유효성 검사
         try:
-            cafe_floor_object = CafeFloor.objects.get(id=cafe_floor_id)
+            cafe_floor_object = self.get_cafe_floor(cafe_floor_id)
             if not cafe_floor_object.has_seat:
                 return ServiceError.no_cafe_seat_response()
         except CafeFloor.DoesNotExist:
@@ -288,30 +501,53 @@ class OccupancyRateUpdateLogViewSet(
         if not cafe_floor_object.cafe.is_opened:
             return ServiceError.cafe_closed_response()
 
-        # 포인트 상세 로직
         now = datetime.datetime.now()
-        midnight = datetime.datetime(year=now.year, month=now.month, day=now.day, hour=0, minute=0, second=1)
-        today_this_cafe_update_logs = OccupancyRateUpdateLog.objects.filter(
-            update__gte=midnight, cafe_floor__id=cafe_floor_id, user__id=request.user.id)
-
-        # 회색 마커 이벤트 중인지 확인
-        challenge_queryset = Challenge.objects.filter(name="회색마커추가포인트", available=False)
-        if challenge_queryset.exists():
-            challenge = challenge_queryset.first()
-            now = datetime.datetime.now()
-            if challenge.start <= now <= challenge.finish:
-                log_queryset = OccupancyRateUpdateLog.objects.filter(
-                    cafe_floor__id=cafe_floor_id, update__gte=now-datetime.timedelta(hours=RECENT_HOUR)
-                )
-                prediction_queryset = OccupancyRatePrediction.objects.filter(cafe_floor__id=cafe_floor_id)
-                if not log_queryset.exists() and not prediction_queryset.exists():
-                    serializer = ProfileSerializer(
-                        request.user.profile,
-                        data={"point": request.user.profile.point + challenge.goal},
-                        partial=True
-                    )
-                    serializer.is_valid(raise_exception=True)
-                    serializer.save()
+        live_state = getattr(cafe_floor_object, "live_state", None)
+
+        # 회색 마커 이벤트 중이고, 최근 로그와 예측이 모두 없는 층이면 추가 포인트
+        challenge = next((
+            challenge for challenge in ReferenceCache.challenge.get().object_list
+            if challenge.name == "회색마커추가포인트" and not challenge.available and challenge.start <= now <= challenge.finish
+        ), None)
+        bonus_point = 0
+        if challenge is not None:
+            is_recently_updated = live_state is not None and live_state.last_update is not None and \
+                live_state.last_update >= now - datetime.timedelta(hours=RECENT_HOUR)
+            has_prediction = getattr(cafe_floor_object, "occupancy_rate_prediction", None) is not None
+            if OccupancyPredictionMemo.refresh_cafes([cafe_floor_object.cafe_id], now):
+                has_prediction = OccupancyRatePrediction.objects.filter(cafe_floor_id=cafe_floor_id).exists()
+            if not is_recently_updated and not has_prediction:
+                bonus_point = challenge.goal
+
+        # 지역 혼잡도 가져오기
+        congestion = self.get_congestion(cafe_floor_object)
+
+        grade = self.get_grade(
+            Profile.objects.filter(user__id=request.user.id).values_list("grade_id", flat=True).get()
+        )
+
+        # 쿨타임, 층별 하루 등록 제한, 하루 stack 제한 확인과 로그, 포인트, 알림 대기열 저장을 함께 처리
+        # 저장에 실패하면 이번 등록으로 쓴 쿨타임, 하루 제한을 되돌림
+        quota = COOLDOWN
+        try:
+            with transaction.atomic():
+                quota = SharingQuota.acquire(request.user.id, cafe_floor_id, grade, now)
+                if quota == COOLDOWN:
+                    return ServiceError.update_cooltime_response()
+
+                # 데이터 많고 적음에 따라 포인트 다르게 책정
+                point = PointCalculator.calculate_reward_based_on_count(
+                    live_state.user_log_count if live_state is not None else 0
+                ) if quota == REWARD else 0
+
+                # occupancy_rate_update_log 작성
+                saved_object = self.save_log(occupancy_rate=occupancy_rate, cafe_floor_object=cafe_floor_object,
+                                             user_id=request.user.id, point=point, congestion=congestion)
+
+                # 얻은 포인트 부여
+                if point + bonus_point:
+                    Profile.objects.filter(user__id=request.user.id).update(point=F("point") + point + bonus_point)
+                if bonus_point:
                     FirebaseMessage.push_message(
                         title="📍 '회색마커를 찾아라!' 이벤트 보상 지급",
                         body=f"이벤트 기간({challenge.start.hour}시 ~ {challenge.finish.hour}시)중 혼잡도 업데이트로 {challenge.goal}P가 추가 지급되었습니다",
@@ -319,57 +555,10 @@ class OccupancyRateUpdateLogViewSet(
                         user_object=request.user,
                         save_model=True
                     )
-
-        # 지역 혼잡도 가져오기
-        congestion = self.get_congestion(cafe_floor_object)
-
-        if today_this_cafe_update_logs:
-            # 오늘 이 카페에서 활동 이력 있음
-            # 쿨타임 확인, 아직 안지났으면 에러
-            recent_update_log = today_this_cafe_update_logs.order_by("-update")[0]
-            if (now - recent_update_log.update).total_seconds() < UPDATE_COOLTIME * 60:
-                return ServiceError.update_cooltime_response()
-
-            # 오늘 이 카페에서 업데이트한 횟수 확인
-            count_restriction = request.user.profile.grade.sharing_restriction_per_cafe
-            if today_this_cafe_update_logs.count() >= count_restriction:
-                saved_object = self.save_log(occupancy_rate=occupancy_rate, cafe_floor_id=cafe_floor_id,
-                                             user_id=request.user.id, point=0, congestion=congestion)
-                return Response(self.get_serializer(saved_object, read_only=True).data, status=status.HTTP_201_CREATED)
-
-            # 오늘 이 카페에서 한 업데이트가 stack 초과한 업데이트인지 확인
-            if not DailyActivityStack.objects.filter(update__gte=midnight, cafe_floor__id=cafe_floor_id,
-                                                     user__id=request.user.id).exists():
-                saved_object = self.save_log(occupancy_rate=occupancy_rate, cafe_floor_id=cafe_floor_id,
-                                             user_id=request.user.id, point=0, congestion=congestion)
-                return Response(self.get_serializer(saved_object, read_only=True).data, status=status.HTTP_201_CREATED)
-        else:
-            # 오늘 이 카페에서 활동 이력 없음
-            stack_restriction = request.user.profile.grade.activity_stack_restriction_per_day
-            today_other_cafe_stacks = DailyActivityStack.objects.filter(update__gte=midnight, user__id=request.user.id)
-            if today_other_cafe_stacks.count() >= stack_restriction:
-                # stack 초과(포인트 지급 불가)
-                saved_object = self.save_log(occupancy_rate=occupancy_rate, cafe_floor_id=cafe_floor_id,
-                                             user_id=request.user.id, point=0, congestion=congestion)
-                return Response(self.get_serializer(saved_object, read_only=True).data, status=status.HTTP_201_CREATED)
-            else:
-                # stack 하나 쌓기
-                stack_serializer = DailyActivityStackSerializer(
-                    data={"user": request.user.id, "cafe_floor": cafe_floor_id})
-                stack_serializer.is_valid(raise_exception=True)
-                stack_serializer.save()
-
-        # 데이터 많고 적음에 따라 포인트 다르게 책정
-        point = PointCalculator.calculate_reward_based_on_data(cafe_floor_id)
-
-        # occupancy_rate_update_log 작성
-        saved_object = self.save_log(occupancy_rate=occupancy_rate, cafe_floor_id=cafe_floor_id,
-                                     user_id=request.user.id, point=point, congestion=congestion)
-
-        # 얻은 포인트 부여
-        serializer = ProfileSerializer(request.user.profile, data={"point": request.user.profile.point + point}, partial=True)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        except Exception:
+            if quota != COOLDOWN:
+                SharingQuota.release(request.user.id, cafe_floor_id, now)
+            raise
 
         return Response(self.get_serializer(saved_object, read_only=True).data,
                         status=status.HTTP_201_CREATED)
@@ -413,7 +602,8 @@ class LocationViewSet(
         responses={200: LocationResponseSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return Response(data=self.get_serializer(self.queryset.filter(is_visible=True), many=True).data, status=status.HTTP_200_OK)
+        location_list = [location for location in ReferenceCache.location.get().object_list if location.is_visible]
+        return Response(data=self.get_serializer(location_list, many=True).data, status=status.HTTP_200_OK)
 
 
 class CATIViewSet(
@@ -465,20 +655,64 @@ class CATIViewSet(
         coffee = int(request.data.get("coffee"))
         workspace = int(request.data.get("workspace"))
         acidity = int(request.data.get("acidity"))
+        new_vote = {"openness": openness, "coffee": coffee, "workspace": workspace, "acidity": acidity}
+        with transaction.atomic():
+            # 같은 유저의 중복 투표가 동시에 들어와도 합계가 한번만 반영되도록 기존 투표를 잠금
+            cati_object = self.queryset.select_for_update().filter(user__id=request.user.id, cafe__id=cafe_id).first()
+            if cati_object:
+                previous_vote = {field: getattr(cati_object, field) for field in CATICalculator.CATI_FIELDS}
+                serializer = self.get_serializer(cati_object, partial=True, data=new_vote)
+            else:
+                previous_vote = None
+                serializer = self.get_serializer(data={"cafe": cafe_id, "user": request.user.id, **new_vote})
+            serializer.is_valid(raise_exception=True)
+            saved_object = serializer.save()
+            CATICalculator.apply_vote(cafe_id=cafe_id, previous_vote=previous_vote, new_vote=new_vote)
+            saved_object._is_cati_summary_updated = True
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+
+
+# 실시간 혼잡도 구독(Server-Sent Events), ASGI(cafejari.asgi)로 실행되는 서버에서만 사용
+# ?south=&west=&north=&east= 로 지도 범위를, ?cafe_id=1,2,3 으로 카페를 구독(둘 다 주면 둘 중 하나에 해당하면 전달)
+async def live_occupancy_stream(request):
+    # WSGI 워커에서는 응답이 끝나지 않아 워커 하나를 계속 점유하므로 받지 않음
+    if not isinstance(request, ASGIRequest):
+        return ServiceError.to_json_response(ServiceError.live_stream_not_supported_response())
+    try:
+        bound = tuple(float(request.GET[key]) for key in ("south", "west", "north", "east")) \
+            if "south" in request.GET else None
+        cafe_id_set = {int(cafe_id) for cafe_id in request.GET["cafe_id"].split(",") if cafe_id} \
+            if request.GET.get("cafe_id") else None
+    except (KeyError, ValueError):
+        bound, cafe_id_set = None, None
+    # DRF view가 아니므로 에러도 일반 JsonResponse로 응답
+    if bound is None and cafe_id_set is None:
+        return ServiceError.to_json_response(
+            ServiceError.no_request_value_response("south, west, north, east 또는 cafe_id")
+        )
+
+    subscription = LiveSubscription(bound=bound, cafe_id_set=cafe_id_set)
+    broker = LiveOccupancyChannel.get_broker()
+    broker.subscribe(subscription)
+
+    # Django ASGI는 클라이언트 연결이 끊겨도 응답을 멈추지 않으므로 최대 유지 시간이 지나면 끝내고 다시 연결하게 함(retry)
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LIVE_CHANNEL_MAX_LIFETIME
         try:
-            cati_object = self.queryset.get(user__id=request.user.id, cafe__id=cafe_id)
-            serializer = self.get_serializer(cati_object, partial=True, data={
-                "openness": openness, "coffee": coffee, "workspace": workspace, "acidity": acidity
-            })
-        except CATI.DoesNotExist:
-            serializer = self.get_serializer(data={
-                "cafe": cafe_id,
-                "user": request.user.id,
-                "openness": openness,
-                "coffee": coffee,
-                "workspace": workspace,
-                "acidity": acidity
-            })
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+            yield "retry: 3000\n\n"
+            while loop.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=min(LIVE_CHANNEL_HEARTBEAT, deadline - loop.time())
+                    )
+                    yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,5 +1,7 @@
 import os
+import sys
 import environ
+from django.core.exceptions import ImproperlyConfigured
 from datetime import timedelta
 from pathlib import Path
 
@@ -27,6 +29,9 @@ BASE_IMAGE_DOMAIN = "cafejariimage.co.kr"
 # 로컬환경 / 서버환경 설정
 LOCAL = False
 
+# manage.py test로 실행 중인지(프로세스 안에서만 동작하는 테스트용 구현 허용)
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # 허용 호스트
 ALLOWED_HOSTS = ["*"]
 
@@ -40,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sites',
     'django.contrib.gis',
+    'django.contrib.postgres',
 
     # rest_framework, jwt
     'rest_framework',
@@ -129,6 +135,7 @@ MIDDLEWARE = [
 
 # Cafejari 앱 설정
 RECENT_HOUR = 2  # 몇시간 전 업데이트 로그까지 가져올건지
+RECENT_LOG_LIMIT = 20  # 층별 실시간 상태에 보관할 최근 로그 수
 UPDATE_COOLTIME = 10  # 혼잡도 업데이트 쿨타입(분)
 UPDATE_POSSIBLE_TIME_FROM = 7  # 혼잡도 업데이트 가능 시작시간
 UPDATE_POSSIBLE_TIME_TO = 22  # 혼잡도 업데이트 가능 종료시간
@@ -140,6 +147,48 @@ NO_DATA_POINT = 50  # 데이터가 없는카페 포인트
 INSUFFICIENT_DATA_POINT = 20  # 데이터가 부족한 카페 포인트
 ENOUGH_DATA_POINT = 10  # 데이터가 많은 카페 포인트
 
+MAP_TILE_SIZE = 0.01  # 지도 캐시 타일 한 변의 크기(위경도)
+MAP_TILE_CACHE_TIMEOUT = 300  # 지도 캐시 타일 유지 시간(초)
+# 이 zoom_level부터 개별 카페 대신 격자별 묶음(cluster)으로 응답, 설정하지 않으면 cluster 응답을 쓰지 않음
+# 현재 앱은 zoom_level 1 ~ 3만 보내고 cluster 응답을 처리하지 못하므로 cluster를 처리하는 앱 배포 후 설정(예: 3)
+MAP_CLUSTER_ZOOM_LEVEL = env.int('MAP_CLUSTER_ZOOM_LEVEL', default=None)
+MAP_CLUSTER_GRID_COUNT = 8  # cluster 응답에서 화면 한 변을 나눌 격자 수
+MAP_SYNC_CURSOR_OVERLAP = 10  # 지도 delta 응답 cursor를 겹쳐서 돌려줄 시간(초)
+
+AUTOCOMPLETE_MAX_ENTRIES = 200000  # 워커별 자동완성 인덱스에 담을 최대 카페/브랜드 수
+AUTOCOMPLETE_SCAN_LIMIT = 2000  # 자동완성 한번에 확인할 최대 매칭 수
+AUTOCOMPLETE_VERSION_CHECK_INTERVAL = 5  # 다른 워커의 변경 여부(공유 버전)를 확인하는 간격(초)
+
+SPATIAL_INDEX_CELL_SIZE = 0.01  # 워커별 공간 인덱스 격자 한 변의 크기(위경도)
+SPATIAL_INDEX_MAX_AGE = 600  # 워커별 공간 인덱스를 변경이 없어도 새로 만드는 간격(초)
+SPATIAL_INDEX_VERSION_CHECK_INTERVAL = 5  # 다른 워커의 변경 여부(공유 버전)를 확인하는 간격(초)
+
+RECOMMENDATION_CELL_SIZE = 0.005  # 카페 추천 후보를 캐싱하는 격자 한 변의 크기(위경도)
+RECOMMENDATION_CACHE_TIMEOUT = 3600  # 카페 추천 후보 캐시 유지 시간(초)
+
+LIVE_CHANNEL_QUEUE_SIZE = 100  # 실시간 혼잡도 구독자별 밀린 메시지 최대 수(넘치면 버림)
+LIVE_CHANNEL_HEARTBEAT = 20  # 실시간 혼잡도 연결 유지용 빈 메시지 간격(초)
+LIVE_CHANNEL_MAX_LIFETIME = 600  # 실시간 혼잡도 연결 최대 유지 시간(초), 지나면 끊고 클라이언트가 다시 연결
+
+REFERENCE_CACHE_VERSION_CHECK_INTERVAL = 5  # 참조 테이블(등급, 브랜드 등) 캐시의 다른 워커 변경 여부 확인 간격(초)
+
+OCCUPANCY_LOG_PARTITION_MONTHS_AHEAD = 3  # 혼잡도 로그 월별 partition을 미리 만들어 둘 개월 수
+OCCUPANCY_ROLLUP_BATCH_SIZE = 5000  # 시간별 혼잡도 집계에 한번에 반영할 로그 수
+OCCUPANCY_ROLLUP_LAG = 60  # 작성 후 이 시간(초)이 지난 로그만 집계에 반영(늦게 commit되는 로그 대비)
+OCCUPANCY_PROFILE_SMOOTHING_RADIUS = 1  # 시간대별 혼잡도 분포 조회 시 함께 평균낼 앞뒤 10분 시간대 수
+OCCUPANCY_PREDICTION_ON_READ = False  # True면 예상 혼잡도를 카페 조회 시 필요한 카페만 계산(cron은 warm set만)
+OCCUPANCY_PREDICTION_INTERVAL = 10  # 예상 혼잡도 갱신 간격(분, predict_occupancy cron 주기와 맞춤)
+OCCUPANCY_PREDICTION_WARM_CAFE_COUNT = 200  # 조회 시 계산 모드에서 cron이 미리 계산할 인기 카페 수
+OCCUPANCY_PREDICTION_WARM_DAYS = 7  # 인기 카페를 고를 때 볼 최근 혼잡도 로그 기간(일)
+
+PUSH_SENDER = 'notification.push_worker.FirebaseSender'  # 푸쉬 알림 전송 방식(테스트에서는 FakeSender)
+PUSH_OUTBOX_BATCH_SIZE = 500  # FCM send_each 한번에 보낼 최대 메시지 수
+PUSH_OUTBOX_MAX_ATTEMPT = 5  # 푸쉬 알림 최대 전송 시도 횟수(넘으면 실패 처리)
+PUSH_OUTBOX_BACKOFF = 30  # 푸쉬 알림 재시도 대기 시간(초), 시도마다 두배
+PUSH_OUTBOX_BACKOFF_LIMIT = 1800  # 푸쉬 알림 재시도 최대 대기 시간(초)
+PUSH_OUTBOX_LEASE = 300  # 푸쉬 알림 전송 중 다른 worker가 다시 잡지 않도록 미뤄두는 시간(초)
+PUSH_OUTBOX_POLL_INTERVAL = 2  # push worker가 발송 대기열을 확인하는 간격(초)
+
 # 최초 routing 파일 설정
 ROOT_URLCONF = 'cafejari.urls'
 
@@ -199,13 +248,15 @@ SOCIALACCOUNT_PROVIDERS = {
 CRONJOBS = [
     ('*/20 * * * *', 'cron.congestion.update_congestion_area'), # 매일 20분마다 업데이트
     ('0 19 * * *', 'cron.item.update_item_list'), # 매일 새벽 4시 업데이트
-    ('5 15 * * *', 'cron.activity_stack.clear_activity_stack'), # 매일 자정 5분에 업데이트
     ('1 15 * * *', 'cron.occupancy_registration_challenge.check_occupancy_registration_challengers'), # 매일 자정 1분에 업데이트
+    ('10 15 * * *', 'cron.occupancy_log_partition.create_occupancy_log_partitions'), # 매일 자정 10분에 업데이트
     ('30 15 * * *', 'cron.cafe_vip.update_cafe_vip'), # 매일 자정 30분에 업데이트
     ('50 15 * * *', 'cron.leaderboard.update_leaders'), # 매일 자정 50분에 업데이트
     ('*/20 0-12 * * *', 'cron.occupancy_sharing.check_sharing_activity'), # 매일 9-21시동안 20분마다 업데이트
     ('*/10 * * * *', 'cron.cafe_opening.update_cafe_opening'), # 매일 10분마다 업데이트
     ('*/10 * * * *', 'cron.occupancy_prediction.predict_occupancy'), # 매일 10분마다 업데이트
+    ('*/10 * * * *', 'cron.occupancy_rollup.update_occupancy_rollup'), # 매일 10분마다 업데이트
+    ('*/10 * * * *', 'cron.occupancy_rollup.update_occupancy_profile'), # 매일 10분마다 업데이트
 ]
 
 # s3
@@ -245,6 +296,29 @@ DATABASES = {
     }
 }
 
+# cache 설정, 지도 타일/추천 캐시와 워커별 메모리 캐시의 공유 버전(SharedVersion)은 모든 워커, cron이 같은 cache를 봐야 함
+# 워커별 로컬 메모리 캐시로는 다른 프로세스의 변경을 알 수 없으므로 Redis 없이는 로컬 개발, 테스트에서만 실행
+REDIS_URL = env('REDIS_URL', default=None)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif not (LOCAL or TESTING):
+    raise ImproperlyConfigured("REDIS_URL 설정이 필요합니다(워커, cron이 함께 쓰는 cache, 실시간 혼잡도, 등록 제한)")
+
+# 실시간 혼잡도 broker, 로그(WSGI 워커), 예측(cron)과 구독(ASGI 서버)이 다른 프로세스라 Redis가 필요
+# Redis가 없으면(로컬 개발, 테스트) 프로세스 안에서만 전달
+LIVE_CHANNEL_BROKER = 'cafe.live_channel.RedisBroker' if REDIS_URL else 'cafe.live_channel.LocalBroker'
+
+# 혼잡도 등록 쿨타임, 하루 제한 저장소(Redis가 없으면(로컬 개발, 테스트) 프로세스 안에서만 공유)
+SHARING_QUOTA_STORE = 'cafe.quota.RedisQuotaStore' if REDIS_URL else 'cafe.quota.MemoryQuotaStore'
+
+# 예상 혼잡도 계산 방식(cafe.predictors, 방식별 비교는 backtest_occupancy_predictor 명령)
+OCCUPANCY_PREDICTOR = 'cafe.predictors.BaselinePredictor'
+
 # 비번 설정
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cafejari.settings')
 
 application = get_wsgi_application()
+
+# 워커 시작 시 카페 자동완성, 공간 인덱스를 미리 만들어 둠(실패해도 첫 요청 때 다시 만듦)
+try:
+    from cafe.autocomplete import CafeAutocomplete
+    from cafe.spatial_index import CafeSpatialIndex
+    CafeAutocomplete.build()
+    CafeSpatialIndex.build()
+except Exception as e:
+    import logging
+    logging.getLogger('my').error(e)
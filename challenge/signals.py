@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from challenge.models import Challenge
+from reference_cache import ReferenceCache
+
+
+# 챌린지가 바뀌면 워커별 참조 테이블 캐시를 모든 워커에서 다시 불러오도록 함
+@receiver(post_save, sender=Challenge)
+@receiver(post_delete, sender=Challenge)
+def on_reference_data_changed(sender, **kwargs):
+    transaction.on_commit(ReferenceCache.get_table(sender).invalidate)
@@ -1,5 +0,0 @@
-from cafe.models import DailyActivityStack
-
-
-def clear_activity_stack():
-    DailyActivityStack.objects.all().delete()
\ No newline at end of file
@@ -21,7 +21,7 @@ def get_is_cafe_opened(open_at, close_at):
 def update_cafe_opening():
     try:
         now = datetime.datetime.now()
-        for cafe_object in Cafe.objects.all():
+        for cafe_object in Cafe.objects.select_related("opening_hour"):
             # 연결된 영업시간 정보가 있으면 진행
             try:
                 if now.weekday() == 0:  # 월요일
@@ -45,11 +45,13 @@ def update_cafe_opening():
                 else:  # 일요일
                     is_opened = get_is_cafe_opened(cafe_object.opening_hour.sun_opening_time,
                                                    cafe_object.opening_hour.sun_closing_time)
-                serializer = CafeSerializer(cafe_object, data={"is_opened": is_opened}, partial=True)
             # 연결된 영업시간 정보가 없으면 그냥 영업중으로 표시
             except OpeningHour.DoesNotExist:
-                serializer = CafeSerializer(cafe_object, data={"is_opened": True}, partial=True)
-            # 오픈 정보 저장
+                is_opened = True
+            # 오픈 정보가 바뀐 카페만 저장(바뀐 카페의 지도 캐시만 지워짐)
+            if cafe_object.is_opened == is_opened:
+                continue
+            serializer = CafeSerializer(cafe_object, data={"is_opened": is_opened}, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
     except Exception as e:
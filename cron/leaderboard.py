@@ -1,7 +1,7 @@
 import datetime
 import logging
-from collections import defaultdict
 
+from django.db.models import Count
 from pytz import timezone
 
 from cafe.models import OccupancyRateUpdateLog
@@ -10,6 +10,10 @@ from leaderboard.serializers import TotalSharingRankerSerializer, MonthSharingRa
     WeekSharingRankerSerializer
 
 
+def get_user_count_dict(log_queryset):
+    return dict(log_queryset.values("user_id").annotate(count=Count("id")).order_by().values_list("user_id", "count"))
+
+
 def update_leaders():
     try:
         # ranker clear
@@ -34,16 +38,10 @@ def update_leaders():
         this_week_occupancy_rate_update_log_queryset = occupancy_rate_update_log_queryset.filter(
             update__gt=first_datetime_midnight_of_this_week
         )
-        # 랭커 dict 정리
-        total_ranker_dict = defaultdict(lambda: 0)
-        month_ranker_dict = defaultdict(lambda: 0)
-        week_ranker_dict = defaultdict(lambda: 0)
-        for log in occupancy_rate_update_log_queryset:
-            total_ranker_dict[log.user.id] += 1
-        for log in this_month_occupancy_rate_update_log_queryset:
-            month_ranker_dict[log.user.id] += 1
-        for log in this_week_occupancy_rate_update_log_queryset:
-            week_ranker_dict[log.user.id] += 1
+        # 랭커 dict 정리(유저별 로그 수는 DB에서 집계, 이번 달/주는 최근 partition만 읽음)
+        total_ranker_dict = get_user_count_dict(occupancy_rate_update_log_queryset)
+        month_ranker_dict = get_user_count_dict(this_month_occupancy_rate_update_log_queryset)
+        week_ranker_dict = get_user_count_dict(this_week_occupancy_rate_update_log_queryset)
         # 랭커 serializer 저장
         for user_id, count in total_ranker_dict.items():
             try:
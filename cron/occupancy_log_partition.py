@@ -0,0 +1,12 @@
+import logging
+
+from cafe.partition import OccupancyLogPartition
+from cafejari.settings import OCCUPANCY_LOG_PARTITION_MONTHS_AHEAD
+
+
+def create_occupancy_log_partitions():
+    try:
+        OccupancyLogPartition.create_future(OCCUPANCY_LOG_PARTITION_MONTHS_AHEAD)
+    except Exception as e:
+        logger = logging.getLogger('my')
+        logger.error(e)
@@ -0,0 +1,20 @@
+import logging
+
+from cafe.occupancy_profile import OccupancyProfiler
+from cafe.rollup import OccupancyRollup
+
+
+def update_occupancy_rollup():
+    try:
+        OccupancyRollup.update_all()
+    except Exception as e:
+        logger = logging.getLogger('my')
+        logger.error(e)
+
+
+def update_occupancy_profile():
+    try:
+        OccupancyProfiler.update_all()
+    except Exception as e:
+        logger = logging.getLogger('my')
+        logger.error(e)
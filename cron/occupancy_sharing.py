@@ -1,8 +1,9 @@
 import datetime
 import logging
 
+from django.db import transaction
+
 from cafe.models import OccupancyRateUpdateLog
-from cafe.serializers import OccupancyRateUpdateLogSerializer
 from cafe.utils import PointCalculator
 from notification.firebase_message import FirebaseMessage
 from notification.models import PushNotificationType
@@ -18,23 +19,26 @@ def check_sharing_activity():
             is_notified=False,
             cafe_floor__isnull=False,
             update__range=(before_30_minute, before_10_minute)
-        )
+        ).select_related("cafe_floor__cafe", "user__profile")
+        point_dict = PointCalculator.calculate_reward_based_on_data_list(
+            list({log.cafe_floor_id for log in between_10_30_logs}))
         for log in between_10_30_logs:
             if log.cafe_floor.floor < 0:
                 floor_text = f"B{abs(log.cafe_floor.floor)}"
             else:
                 floor_text = str(log.cafe_floor.floor)
-            if log.user.profile.occupancy_push_enabled:
-                FirebaseMessage.push_message(
-                    title=f"아직 {log.cafe_floor.cafe.name}에 계신가요?",
-                    body=f"지금 {log.cafe_floor.cafe.name} {floor_text}층에서 혼잡도를 등록하면 {PointCalculator.calculate_reward_based_on_data(log.cafe_floor.id)}P 획득 가능!",
-                    push_type=PushNotificationType.Activity.value,
-                    user_object=log.user,
-                    save_model=True
-                )
-            serializer = OccupancyRateUpdateLogSerializer(log, data={"is_notified": True}, partial=True)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
+            # 알림 대기열 추가와 알림 여부 표시를 함께 저장
+            with transaction.atomic():
+                if log.user.profile.occupancy_push_enabled:
+                    FirebaseMessage.push_message(
+                        title=f"아직 {log.cafe_floor.cafe.name}에 계신가요?",
+                        body=f"지금 {log.cafe_floor.cafe.name} {floor_text}층에서 혼잡도를 등록하면 {point_dict[log.cafe_floor_id]}P 획득 가능!",
+                        push_type=PushNotificationType.Activity.value,
+                        user_object=log.user,
+                        save_model=True
+                    )
+                # 혼잡도 변경이 아니므로 save 신호(지도 캐시, 실시간 상태 갱신) 없이 알림 여부만 바꿈
+                OccupancyRateUpdateLog.objects.filter(id=log.id).update(is_notified=True)
     except Exception as e:
         logger = logging.getLogger('my')
         logger.error(e)
@@ -27,6 +27,7 @@ from cron.occupancy_registration_challenge import check_occupancy_registration_c
 from data.models import DistrictDataUpdate, ItemDataUpdate, CongestionDataUpdate, BrandDataUpdate, \
     CongestionAreaDataUpdate, NicknameAdjectiveDataUpdate, NicknameNounDataUpdate, CafeDataUpdate, CafePointUpdate, \
     OpeningHoursUpdate, OccupancyPredictionUpdate, CafeOpeningUpdate, LeaderUpdate, OccupancyRegistrationChallengeUpdate
+from reference_cache import ReferenceCache
 from user.models import NicknameAdjective, NicknameNoun
 from user.serializers import NicknameAdjectiveSerializer, NicknameNounSerializer
 from utils import S3Manager
@@ -319,7 +320,7 @@ class CafeDataUpdateAdmin(CsvFileManageAdmin):
 
                 # brand 체크
                 brand_object = None
-                for brand in Brand.objects.all():
+                for brand in ReferenceCache.brand.get().object_list:
                     if brand.name in cafe_name:
                         brand_object = brand
                         break
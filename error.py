@@ -1,3 +1,4 @@
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -14,6 +15,11 @@ class ServiceError:
             dict_data["detail"] = detail
         return dict_data
 
+    # DRF view가 아닌 일반 Django view(실시간 구독 등)에서 같은 에러를 응답할 때 사용
+    @staticmethod
+    def to_json_response(response):
+        return JsonResponse(response.data, status=response.status_code, json_dumps_params={"ensure_ascii": False})
+
     # 600번대 - chore
     @classmethod
     def no_request_value_response(cls, *args):
@@ -31,6 +37,11 @@ class ServiceError:
         return Response(cls._error_dict(
             error_code=601, error_message="서버가 디버그 모드가 아닙니다"), status=status.HTTP_409_CONFLICT)
 
+    @classmethod
+    def live_stream_not_supported_response(cls):
+        return Response(cls._error_dict(
+            error_code=602, error_message="실시간 혼잡도 구독은 ASGI 서버에서만 가능합니다"), status=status.HTTP_404_NOT_FOUND)
+
     # 700번대 - user
     @classmethod
     def no_user_response(cls):
@@ -104,6 +115,11 @@ class ServiceError:
         return Response(cls._error_dict(
             error_code=805, error_message=f"혼잡도 등록은 {UPDATE_POSSIBLE_TIME_FROM}시 ~ {UPDATE_POSSIBLE_TIME_TO}시에만 가능합니다"), status=status.HTTP_409_CONFLICT)
 
+    @classmethod
+    def invalid_sync_cursor_response(cls):
+        return Response(cls._error_dict(
+            error_code=806, error_message="since 값이 올바르지 않습니다"), status=status.HTTP_409_CONFLICT)
+
 
     # 900번대 request
     @classmethod
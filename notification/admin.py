@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 
 from notification.firebase_message import FirebaseMessage
-from notification.models import PushNotification, PopUpNotification
+from notification.models import PushNotification, PopUpNotification, PushOutbox
 from utils import replace_image_domain
 
 
@@ -33,6 +33,17 @@ class PushNotificationAdmin(admin.ModelAdmin):
     user_name.short_description = "수신자"
 
 
+@admin.register(PushOutbox)
+class PushOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "status", "attempt_count", "next_attempt_at", "created_at", "last_error")
+    list_filter = ("status",)
+    autocomplete_fields = ("user",)
+    search_fields = ("title", "body")
+    ordering = ("id",)
+    date_hierarchy = "created_at"
+    preserve_filters = True
+
+
 @admin.register(PopUpNotification)
 class PopUpNotificationAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "order", "image_tag", "visible", "datetime",)
@@ -1,10 +1,11 @@
 from django.core.exceptions import ObjectDoesNotExist
-from firebase_admin import messaging
-from firebase_admin.messaging import UnregisteredError
 
+from notification.models import PushOutbox
 from notification.serializers import PushNotificationSerializer
 
 
+# FCM 전송은 push worker(notification.push_worker)가 하고, 여기서는 알림 저장과 발송 대기열(outbox) 추가만 함
+# 호출한 쪽의 transaction 안에서 실행되면 비즈니스 변경과 함께 commit/rollback됨
 class FirebaseMessage:
 
     @staticmethod
@@ -21,26 +22,14 @@ class FirebaseMessage:
                 serializer.is_valid(raise_exception=True)
                 serializer.save()
             if token:
-                message = messaging.Message(
-                    notification=messaging.Notification(
-                        title=title,
-                        body=body,
-                    ),
-                    token=user_object.profile.fcm_token
-                )
-                try:
-                    messaging.send(message)
-                except UnregisteredError:
-                    pass
+                PushOutbox.objects.create(title=title, body=body, token=token, user=user_object)
         except ObjectDoesNotExist:
             pass
 
     @staticmethod
     def push_messages(title, body, push_type, user_object_list, save_model):
-        message_list = []
-        user_id_list = []
+        outbox_list = []
         for user_object in user_object_list:
-            user_id_list.append(user_object.id)
             if save_model:
                 serializer = PushNotificationSerializer(data={
                     "title": title,
@@ -53,19 +42,8 @@ class FirebaseMessage:
             try:
                 token = user_object.profile.fcm_token
                 if token:
-                    message_list.append(
-                        messaging.Message(
-                            notification=messaging.Notification(
-                                title=title,
-                                body=body,
-                            ),
-                            token=token,
-                        )
-                    )
+                    outbox_list.append(PushOutbox(title=title, body=body, token=token, user=user_object))
             except ObjectDoesNotExist:
                 continue
-        if message_list:
-            try:
-                messaging.send_each(message_list)
-            except UnregisteredError:
-                pass
+        if outbox_list:
+            PushOutbox.objects.bulk_create(outbox_list)
@@ -0,0 +1,30 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from cafejari.settings import PUSH_OUTBOX_POLL_INTERVAL
+from notification.push_worker import PushWorker
+
+
+class Command(BaseCommand):
+    help = '푸쉬 알림 발송 대기열(outbox)을 FCM으로 보내는 worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기열을 한번만 비우고 종료')
+
+    def handle(self, *args, **options):
+        worker = PushWorker()
+        while True:
+            try:
+                count = worker.drain()
+            except Exception as e:
+                logging.getLogger('my').error(e)
+                # DB 연결이 끊긴 경우 다음 시도에서 새로 연결
+                close_old_connections()
+                count = 0
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS(f'푸쉬 알림 {count}건 발송 시도 완료'))
+                return
+            time.sleep(PUSH_OUTBOX_POLL_INTERVAL)
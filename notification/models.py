@@ -1,6 +1,7 @@
 from enum import Enum
 
 from django.db import models
+from django.utils import timezone
 
 
 class PushNotificationType(Enum):
@@ -34,6 +35,42 @@ class PushNotification(models.Model):
         ordering = ['-pushed_at']
 
 
+class PushOutboxStatus(Enum):
+    Pending = '대기'
+    Dead = '실패'
+
+
+# 보낼 FCM 메시지, 비즈니스 변경과 같은 transaction에서 쌓고 push worker가 보낸 뒤 지움
+class PushOutbox(models.Model):
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    token = models.CharField(max_length=255)
+    status = models.CharField(
+        default=PushOutboxStatus.Pending.value,
+        choices=((outbox_status.value, outbox_status.value) for outbox_status in PushOutboxStatus)
+    )
+    attempt_count = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(null=True, default=None, blank=True)
+    user = models.ForeignKey(
+        'user.User',
+        on_delete=models.CASCADE,
+        related_name="push_outbox",
+        db_column="user",
+        null=True,
+        blank=True,
+        default=None
+    )
+
+    class Meta:
+        db_table = 'notification_push_outbox'
+        db_table_comment = '푸쉬 알림 발송 대기열'
+        app_label = 'notification'
+        ordering = ['id']
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="push_outbox_status_next_idx")]
+
+
 class InAppRouteTarget(Enum):
     Map = '지도'
     MyCafe = '활동'
@@ -0,0 +1,120 @@
+import datetime
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from firebase_admin import exceptions, messaging
+
+from cafejari.settings import PUSH_SENDER, PUSH_OUTBOX_BATCH_SIZE, PUSH_OUTBOX_MAX_ATTEMPT, PUSH_OUTBOX_BACKOFF, \
+    PUSH_OUTBOX_BACKOFF_LIMIT, PUSH_OUTBOX_LEASE
+from notification.models import PushOutbox, PushOutboxStatus
+
+# 다시 보내도 성공할 수 없는 에러(삭제된 토큰, 다른 프로젝트 토큰, 잘못된 메시지)
+PERMANENT_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError, exceptions.InvalidArgumentError)
+
+
+# outbox 목록을 FCM send_each 한번으로 보내고, 메시지별 에러(성공은 None) 목록을 돌려줌
+class FirebaseSender:
+
+    @staticmethod
+    def send_each(outbox_list):
+        batch_response = messaging.send_each([
+            messaging.Message(
+                notification=messaging.Notification(
+                    title=outbox.title,
+                    body=outbox.body,
+                ),
+                token=outbox.token
+            ) for outbox in outbox_list
+        ])
+        return [None if response.success else response.exception for response in batch_response.responses]
+
+
+# 테스트, 로컬용 sender, 실제로 보내지 않고 기록만 하며 failing_token_dict의 토큰은 해당 에러로 실패 처리
+class FakeSender:
+
+    def __init__(self, failing_token_dict=None):
+        self.failing_token_dict = failing_token_dict or {}
+        self.sent_list = []
+
+    def send_each(self, outbox_list):
+        exception_list = []
+        for outbox in outbox_list:
+            exception = self.failing_token_dict.get(outbox.token)
+            if exception is None:
+                self.sent_list.append((outbox.token, outbox.title, outbox.body))
+            exception_list.append(exception)
+        return exception_list
+
+
+# 발송 대기열을 PUSH_OUTBOX_BATCH_SIZE개씩 가져와 보냄
+# 일시적 실패는 지수 backoff로 재시도하고, 영구 실패나 재시도 초과는 실패(dead) 상태로 남겨 둠
+class PushWorker:
+
+    def __init__(self, sender=None):
+        self.sender = sender if sender is not None else import_string(PUSH_SENDER)()
+
+    @staticmethod
+    def claim(batch_size):
+        # 여러 worker가 같은 메시지를 잡지 않도록 잠긴 row는 건너뛰고, 보내는 동안은 lease 시간만큼 뒤로 미뤄 둠
+        # 보내는 중 worker가 죽으면 lease가 지난 뒤 다시 보냄(최소 한번 전송)
+        now = timezone.now()
+        with transaction.atomic():
+            outbox_list = list(PushOutbox.objects.select_for_update(skip_locked=True).filter(
+                status=PushOutboxStatus.Pending.value, next_attempt_at__lte=now
+            ).order_by("id")[:batch_size])
+            PushOutbox.objects.filter(id__in=[outbox.id for outbox in outbox_list]).update(
+                attempt_count=F("attempt_count") + 1,
+                next_attempt_at=now + datetime.timedelta(seconds=PUSH_OUTBOX_LEASE)
+            )
+        for outbox in outbox_list:
+            outbox.attempt_count += 1
+        return outbox_list
+
+    @staticmethod
+    def get_backoff(attempt_count):
+        return datetime.timedelta(seconds=min(PUSH_OUTBOX_BACKOFF * 2 ** (attempt_count - 1), PUSH_OUTBOX_BACKOFF_LIMIT))
+
+    def send_batch(self):
+        # 한 묶음을 보내고 시도한 메시지 수를 돌려줌
+        outbox_list = self.claim(PUSH_OUTBOX_BATCH_SIZE)
+        if not outbox_list:
+            return 0
+        try:
+            exception_list = self.sender.send_each(outbox_list)
+        except Exception as e:
+            # 요청 자체의 실패(네트워크, 인증 등)는 묶음 전체를 재시도
+            exception_list = [e] * len(outbox_list)
+
+        sent_id_list, retry_list, dead_list = [], [], []
+        now = timezone.now()
+        for outbox, exception in zip(outbox_list, exception_list):
+            if exception is None:
+                sent_id_list.append(outbox.id)
+                continue
+            outbox.last_error = repr(exception)
+            if isinstance(exception, PERMANENT_ERRORS) or outbox.attempt_count >= PUSH_OUTBOX_MAX_ATTEMPT:
+                outbox.status = PushOutboxStatus.Dead.value
+                dead_list.append(outbox)
+            else:
+                outbox.next_attempt_at = now + self.get_backoff(outbox.attempt_count)
+                retry_list.append(outbox)
+
+        with transaction.atomic():
+            PushOutbox.objects.filter(id__in=sent_id_list).delete()
+            PushOutbox.objects.bulk_update(retry_list, ["next_attempt_at", "last_error"])
+            PushOutbox.objects.bulk_update(dead_list, ["status", "last_error"])
+        if dead_list:
+            logging.getLogger('my').warning(f"푸쉬 알림 {len(dead_list)}건 발송 실패")
+        return len(outbox_list)
+
+    def drain(self):
+        # 지금 보낼 수 있는 메시지가 없을 때까지 보내고, 시도한 메시지 수를 돌려줌
+        total_count = 0
+        while True:
+            count = self.send_batch()
+            total_count += count
+            if count < PUSH_OUTBOX_BATCH_SIZE:
+                return total_count
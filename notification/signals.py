@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from notification.models import PopUpNotification
+from reference_cache import ReferenceCache
+
+
+# 팝업 공지가 바뀌면 워커별 참조 테이블 캐시를 모든 워커에서 다시 불러오도록 함
+@receiver(post_save, sender=PopUpNotification)
+@receiver(post_delete, sender=PopUpNotification)
+def on_reference_data_changed(sender, **kwargs):
+    transaction.on_commit(ReferenceCache.get_table(sender).invalidate)
@@ -0,0 +1,84 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from firebase_admin import messaging
+
+from cafejari.settings import PUSH_OUTBOX_MAX_ATTEMPT, PUSH_OUTBOX_BACKOFF, PUSH_OUTBOX_BACKOFF_LIMIT
+from notification.models import PushOutbox, PushOutboxStatus
+from notification.push_worker import PushWorker, FakeSender
+
+
+class BrokenSender:
+
+    def send_each(self, outbox_list):
+        raise ConnectionError("FCM 연결 실패")
+
+
+# 발송 대기열은 FakeSender로 보내고 남은 row의 상태로 확인
+class PushWorkerTest(TestCase):
+
+    @staticmethod
+    def create_outbox(token, **kwargs):
+        return PushOutbox.objects.create(title="제목", body="내용", token=token, **kwargs)
+
+    def test_sent_outbox_is_deleted(self):
+        self.create_outbox("token1")
+        self.create_outbox("token2")
+        sender = FakeSender()
+
+        self.assertEqual(PushWorker(sender).drain(), 2)
+        self.assertEqual([sent[0] for sent in sender.sent_list], ["token1", "token2"])
+        self.assertFalse(PushOutbox.objects.exists())
+
+    def test_transient_error_is_retried_with_backoff(self):
+        outbox = self.create_outbox("token")
+        worker = PushWorker(FakeSender({"token": ConnectionError("timeout")}))
+
+        before = timezone.now()
+        self.assertEqual(worker.drain(), 1)
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, PushOutboxStatus.Pending.value)
+        self.assertEqual(outbox.attempt_count, 1)
+        self.assertIn("timeout", outbox.last_error)
+        self.assertGreaterEqual(outbox.next_attempt_at, before + datetime.timedelta(seconds=PUSH_OUTBOX_BACKOFF))
+
+        # backoff가 지나기 전에는 다시 보내지 않음
+        self.assertEqual(worker.drain(), 0)
+
+        # backoff가 지나면 다시 보내고 성공하면 지움
+        PushOutbox.objects.filter(id=outbox.id).update(next_attempt_at=timezone.now())
+        sender = FakeSender()
+        self.assertEqual(PushWorker(sender).drain(), 1)
+        self.assertEqual(len(sender.sent_list), 1)
+        self.assertFalse(PushOutbox.objects.exists())
+
+    def test_permanent_error_is_dead(self):
+        outbox = self.create_outbox("token")
+        PushWorker(FakeSender({"token": messaging.UnregisteredError("삭제된 토큰")})).drain()
+
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, PushOutboxStatus.Dead.value)
+        self.assertEqual(outbox.attempt_count, 1)
+
+    def test_max_attempt_is_dead(self):
+        outbox = self.create_outbox("token", attempt_count=PUSH_OUTBOX_MAX_ATTEMPT - 1)
+        PushWorker(FakeSender({"token": ConnectionError("timeout")})).drain()
+
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, PushOutboxStatus.Dead.value)
+        self.assertEqual(outbox.attempt_count, PUSH_OUTBOX_MAX_ATTEMPT)
+
+    def test_request_failure_retries_whole_batch(self):
+        self.create_outbox("token1")
+        self.create_outbox("token2")
+        PushWorker(BrokenSender()).drain()
+
+        self.assertEqual(PushOutbox.objects.filter(
+            status=PushOutboxStatus.Pending.value, attempt_count=1, next_attempt_at__gt=timezone.now()
+        ).count(), 2)
+
+    def test_backoff_doubles_up_to_limit(self):
+        self.assertEqual(PushWorker.get_backoff(1), datetime.timedelta(seconds=PUSH_OUTBOX_BACKOFF))
+        self.assertEqual(PushWorker.get_backoff(2), datetime.timedelta(seconds=PUSH_OUTBOX_BACKOFF * 2))
+        self.assertEqual(PushWorker.get_backoff(30), datetime.timedelta(seconds=PUSH_OUTBOX_BACKOFF_LIMIT))
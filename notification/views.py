@@ -7,6 +7,7 @@ from rest_framework.viewsets import GenericViewSet
 
 from notification.models import PushNotification, PopUpNotification
 from notification.serializers import PushNotificationSerializer, PopUpNotificationResponseSerializer
+from reference_cache import ReferenceCache
 from utils import UserListDestroyViewSet, AUTHORIZATION_MANUAL_PARAMETER
 
 
@@ -66,5 +67,8 @@ class PopUpNotificationViewSet(
         responses={200: PopUpNotificationResponseSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset.filter(visible=True).order_by('order')
-        return Response(data=self.get_serializer(queryset, many=True).data, status=status.HTTP_200_OK)
+        pop_up_notification_list = sorted(
+            (pop_up for pop_up in ReferenceCache.pop_up_notification.get().object_list if pop_up.visible),
+            key=lambda pop_up: (pop_up.order is None, pop_up.order)
+        )
+        return Response(data=self.get_serializer(pop_up_notification_list, many=True).data, status=status.HTTP_200_OK)
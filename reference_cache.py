@@ -0,0 +1,77 @@
+import threading
+import time
+from types import MappingProxyType
+
+from app_config.models import Version
+from cafe.models import Brand, Location
+from cafejari.settings import REFERENCE_CACHE_VERSION_CHECK_INTERVAL
+from challenge.models import Challenge
+from notification.models import PopUpNotification
+from user.models import Grade, ProfileImage
+from utils import SharedVersion
+
+
+# 참조 테이블 한번 읽은 결과, 만든 뒤에는 바꾸지 않고 변경 시 통째로 새로 만듦(객체도 읽기 전용으로 사용)
+class ReferenceSnapshot:
+    __slots__ = ("object_list", "id_dict", "name_dict")
+
+    def __init__(self, object_list, name_field=None):
+        self.object_list = tuple(object_list)
+        self.id_dict = MappingProxyType({obj.id: obj for obj in self.object_list})
+        self.name_dict = MappingProxyType(
+            {getattr(obj, name_field): obj for obj in reversed(self.object_list)} if name_field else {}
+        )
+
+
+# 작고 잘 바뀌지 않는 테이블 하나의 워커별 캐시, 처음 쓸 때 불러옴
+# 변경은 signal에서 invalidate(이 워커는 바로 버림 + 공유 버전으로 다른 워커에 알림)
+class ReferenceTable:
+
+    def __init__(self, name, get_queryset, name_field=None):
+        self.version = SharedVersion(f"reference:{name}")
+        self.get_queryset = get_queryset
+        self.name_field = name_field
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.built_version = None
+        self.last_version_check = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        snapshot = self.snapshot
+        if snapshot is not None and now - self.last_version_check < REFERENCE_CACHE_VERSION_CHECK_INTERVAL:
+            return snapshot
+        with self.lock:
+            self.last_version_check = now
+            version = self.version.get()
+            if self.snapshot is None or version != self.built_version:
+                self.snapshot = ReferenceSnapshot(self.get_queryset(), self.name_field)
+                self.built_version = version
+            return self.snapshot
+
+    def invalidate(self):
+        with self.lock:
+            self.snapshot = None
+        self.version.bump()
+
+
+class ReferenceCache:
+    grade = ReferenceTable("grade", lambda: Grade.objects.all())
+    challenge = ReferenceTable("challenge", lambda: Challenge.objects.all(), name_field="name")
+    brand = ReferenceTable("brand", lambda: Brand.objects.all(), name_field="name")
+    location = ReferenceTable("location", lambda: Location.objects.all())
+    profile_image = ReferenceTable("profile_image", lambda: ProfileImage.objects.all())
+    version = ReferenceTable("version", lambda: Version.objects.all())
+    pop_up_notification = ReferenceTable("pop_up_notification", lambda: PopUpNotification.objects.all())
+
+    @classmethod
+    def get_table(cls, model):
+        return {
+            Grade: cls.grade,
+            Challenge: cls.challenge,
+            Brand: cls.brand,
+            Location: cls.location,
+            ProfileImage: cls.profile_image,
+            Version: cls.version,
+            PopUpNotification: cls.pop_up_notification,
+        }.get(model)
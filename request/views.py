@@ -6,12 +6,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from cafe.models import Cafe, District, CongestionArea, Brand
+from cafe.models import Cafe, District, CongestionArea
 from cafe.serializers import CafeSerializer, CafeFloorSerializer, OpeningHourSerializer
 from cafejari.settings import BASE_DOMAIN
 from data.admin import OpeningHoursUpdateAdmin
 from error import ServiceError
 from notification.naver_sms import send_sms_to_admin
+from reference_cache import ReferenceCache
 from request.models import CafeAdditionRequest, WithdrawalRequest, UserMigrationRequest, CafeInformationSuggestion, \
     AppFeedback
 from request.serializers import CafeAdditionRequestResponseSerializer, CafeAdditionRequestSerializer, \
@@ -81,7 +82,7 @@ class CafeAdditionRequestViewSet(
 
             # brand 체크
             brand = None
-            for brand_object in Brand.objects.all():
+            for brand_object in ReferenceCache.brand.get().object_list:
                 if brand_object.name in cafe_name:
                     brand = brand_object
                     break
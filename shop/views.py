@@ -14,6 +14,7 @@ from cafe.models import Brand
 from cafejari.settings import BASE_DOMAIN
 from error import ServiceError
 from notification.naver_sms import send_sms_to_admin
+from reference_cache import ReferenceCache
 from shop.giftishow_biz import GiftishowBiz
 from shop.models import Item, Gifticon, Coupon, UserCoupon
 from cafe.serializers import BrandSerializer
@@ -32,8 +33,6 @@ class BrandViewSet(
     serializer_class = BrandSerializer
     permission_classes = [AllowAny]
 
-    def filter_queryset(self, queryset):
-        return queryset.filter(has_item=True)
 
     @swagger_auto_schema(
         operation_id='상점 브랜드',
@@ -42,7 +41,8 @@ class BrandViewSet(
         responses={200: BrandSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
-        return super(BrandViewSet, self).list(request, *args, **kwargs)
+        brand_list = [brand for brand in ReferenceCache.brand.get().object_list if brand.has_item]
+        return Response(self.get_serializer(brand_list, many=True).data, status=status.HTTP_200_OK)
 
 
 class ItemViewSet(
@@ -1,6 +1,7 @@
 
 from rest_framework import serializers
 
+from cafe.prediction_memo import OccupancyPredictionMemo
 from cafe.serializers import CafeResponseSerializer
 from user.models import User, Profile, Grade, ProfileImage, NicknameAdjective, NicknameNoun
 
@@ -99,6 +100,7 @@ class ProfileResponseSerializer(ProfileSerializer):
         self.fields['grade'] = GradeResponseSerializer(read_only=True)
         self.fields['profile_image'] = ProfileImageResponseSerializer(read_only=True)
         self.fields['favorite_cafe'] = CafeResponseSerializer(read_only=True, many=True)
+        OccupancyPredictionMemo.refresh_cafes(instance.favorite_cafe.values_list("id", flat=True))
         return super(ProfileResponseSerializer, self).to_representation(instance)
 
 
@@ -26,6 +26,7 @@ from cafejari import settings
 from cafejari.settings import KAKAO_REST_API_KEY, KAKAO_REDIRECT_URL, DEBUG, APPLE_REDIRECT_URL, TIME_ZONE
 from error import ServiceError
 from notification.naver_sms import send_sms_to_admin
+from reference_cache import ReferenceCache
 from user.models import User, Profile, Grade, NicknameAdjective, NicknameNoun, ProfileImage
 from user.swagger_serializers import SwaggerMakeNewProfileRequestSerializer, \
     SwaggerProfileUpdateRequestSerializer, SwaggerKakaoCallbackResponseSerializer, \
@@ -54,7 +55,7 @@ class GradeViewSet(
         responses={200: GradeResponseSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return super(GradeViewSet, self).list(request, *args, **kwargs)
+        return Response(self.get_serializer(ReferenceCache.grade.get().object_list, many=True).data, status=status.HTTP_200_OK)
 
 
 class UserViewSet(GenericViewSet):
@@ -119,7 +120,7 @@ class UserViewSet(GenericViewSet):
             social_account_object = user_object.socialaccount_set.first()
             if not social_account_object:
                 return ServiceError.no_social_account_response()
-            grade_object = Grade.objects.first()
+            grade_object = ReferenceCache.grade.get().object_list[0]
             profile_data = {"nickname": nickname, "grade": grade_object.id, "user": user_object.id}
             if fcm_token:
                 profile_data["fcm_token"] = fcm_token
@@ -316,8 +317,10 @@ class ProfileImageViewSet(
         responses={200: ProfileImageResponseSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
-        self.queryset.filter(is_default=True)
-        serializer = ProfileImageResponseSerializer(self.queryset.filter(is_default=True), many=True)
+        profile_image_list = [
+            profile_image for profile_image in ReferenceCache.profile_image.get().object_list if profile_image.is_default
+        ]
+        serializer = ProfileImageResponseSerializer(profile_image_list, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
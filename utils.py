@@ -4,6 +4,7 @@ from enum import Enum
 
 import boto3
 from django.contrib import admin
+from django.core.cache import cache
 from drf_yasg import openapi
 from rest_framework import mixins, status, serializers
 from rest_framework.response import Response
@@ -113,4 +114,25 @@ class CATIScore(Enum):
     rarely = -1
     neutral = 0
     somtimes = 1
-    always = 2
\ No newline at end of file
+    always = 2
+
+
+# 워커별 메모리 인덱스가 다른 워커(프로세스)의 변경을 알 수 있도록 공유 캐시에 두는 버전 번호
+class SharedVersion:
+
+    def __init__(self, key):
+        self.key = f"shared_version:{key}"
+
+    def get(self):
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, 1, timeout=None)
+            version = cache.get(self.key, 1)
+        return version
+
+    def bump(self):
+        try:
+            return cache.incr(self.key)
+        except ValueError:
+            cache.add(self.key, 1, timeout=None)
+            return cache.incr(self.key)